@@ -3,13 +3,17 @@ import MetaTrader5 as mt5
 import requests
 import pandas as pd
 import numpy as np
-from datetime import datetime, time
+from datetime import datetime, time, timedelta
 import time as time_module
 import yaml
 import json
 import os
+import asyncio
+import copy
 from pathlib import Path
 from telegram_notifier import TelegramNotifier
+from trading_system.core.scheduler import BarClock, SymbolScheduler
+from trading_system.features.technical_indicators import WindowedBarIndicators
 from analytics import TradingAnalytics
 from live_analytics import LivePerformanceTracker
 
@@ -67,6 +71,12 @@ class BotConfig:
     SERVER = os.getenv('MT5_SERVER') or main_cfg.get('trading', {}).get('server', 'InstaForex-Server')
     SYMBOL = os.getenv('MT5_SYMBOL') or main_cfg.get('trading', {}).get('symbol', 'GOLD.ls')
 
+    # Multi-symbol engine: symbols traded in one session, and per-symbol
+    # cycle intervals in seconds (CHECK_INTERVAL when not listed)
+    SYMBOLS = ([s.strip() for s in os.getenv('MT5_SYMBOLS', '').split(',') if s.strip()]
+               or main_cfg.get('trading', {}).get('symbols') or [SYMBOL])
+    SYMBOL_INTERVALS = main_cfg.get('trading', {}).get('symbol_intervals') or {}
+
     # Strategy Parameters (from config)
     SMA_FAST = trade_cfg.get('strategy', {}).get('sma_fast', 5)
     SMA_SLOW = trade_cfg.get('strategy', {}).get('sma_slow', 50)
@@ -100,6 +110,13 @@ class BotConfig:
     CHECK_INTERVAL = 1
     DATA_BARS = 100
     TIMEFRAME = mt5.TIMEFRAME_M1
+    BAR_SECONDS = 60  # length of a TIMEFRAME bar
+
+    # Bar-close triggering: indicators and signals run once per closed bar
+    # (woken at the close or by the first tick of the next bar); in between
+    # only the cheap tick-level position path runs every CHECK_INTERVAL.
+    # False restores fixed-interval full cycles on the forming bar.
+    BAR_CLOSE_TRIGGER = True
     
     # Logging
     LOG_FILE = 'bot_trades.csv'
@@ -162,6 +179,15 @@ def is_trading_allowed():
     else:  
         return False
 
+def warmup_predictor():
+    """Load and warm up the ML model once, before the first signal check"""
+    try:
+        from inference import get_predictor
+        get_predictor(model_dir=Path('models'))
+        print(f"[STARTUP] ML model loaded and warmed up")
+    except Exception as e:
+        print(f"[STARTUP] ML model not available, using TA signals only ({e})")
+
 def log_trade(trade_data):
     """Log trade to CSV file"""
     df = pd.DataFrame([trade_data])
@@ -193,6 +219,19 @@ def load_bot_state():
 # TRADING BOT CLASS
 # ============================================================================
 
+class MT5Snapshot:
+    """Terminal state read once at the start of a bot cycle.
+
+    Every check in a cycle (margin, risk, manual trades, closed trades,
+    spread, execution) reads this object instead of querying the terminal
+    again, so they all see one consistent view of the account.
+    """
+
+    def __init__(self, symbol):
+        self.account = mt5.account_info()
+        self.positions = tuple(mt5.positions_get(symbol=symbol) or ())
+        self.symbol_info = mt5.symbol_info(symbol)
+
 class AutoTradingBot: 
 
     def format_title(self, title):
@@ -213,18 +252,55 @@ class AutoTradingBot:
             self.live_tracker.update(info)
             self.live_tracker.print_live_stats(info)
     
-    def __init__(self):
-        self.config = BotConfig()
-        self.state = load_bot_state()
+    def __init__(self, symbol=None, parent=None):
+        """Create a bot for `symbol` (BotConfig.SYMBOL if None).
+
+        With `parent`, the bot is one pipeline of a multi-symbol engine: it
+        copies the parent's config and shares its state, performance
+        tracker and Telegram notifier instead of creating its own.
+        """
+        self.config = copy.copy(parent.config) if parent else BotConfig()
+        if symbol:
+            self.config.SYMBOL = symbol
         self.running = False
         self.mt5_connected = False
         
-        # Initialize performance tracker
-        self.live_tracker = LivePerformanceTracker()
-        
         # Track bot's own orders and notified deals
         self.bot_order_ids = set()  # ← This starts empty, but...
         self.notified_deals = set()
+
+        # Per-cycle terminal snapshot and incremental deal history cursor
+        self.snapshot = None
+        self.symbol_selected = False
+        self.open_tickets = set()
+        self.deals_from = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+        # Regular seconds between cycles (the engine sets per-symbol intervals)
+        self.interval = self.config.CHECK_INTERVAL
+
+        # Bar-close triggering state
+        self.bar_clock = BarClock(self.config.BAR_SECONDS)
+        self.last_bar_time = None
+        self.signal_pending = False
+        self.market_data = None
+        self.market_data_bar = None
+        # SMA/ATR columns carried across re-fetched windows (RSI is recomputed:
+        # its Wilder seed depends on where the window starts)
+        self.indicators = WindowedBarIndicators(
+            {'sma_fast': self.config.SMA_FAST, 'sma_slow': self.config.SMA_SLOW},
+            atr_period=self.config.ATR_PERIOD
+        )
+
+        if parent:
+            self.state = parent.state
+            self.live_tracker = parent.live_tracker
+            self.telegram = parent.telegram
+            return
+
+        self.state = load_bot_state()
+        
+        # Initialize performance tracker
+        self.live_tracker = LivePerformanceTracker()
         
         # Initialize Telegram notifier
         if self.config.TELEGRAM_ENABLED:
@@ -333,6 +409,16 @@ class AutoTradingBot:
             self.mt5_connected = False
             print(f"\n[DISCONNECT] MT5 connection closed")
     
+    def refresh_snapshot(self):
+        """Read account, positions and symbol info once for this cycle"""
+        self.snapshot = MT5Snapshot(self.config.SYMBOL)
+        self.open_tickets = {pos.ticket for pos in self.snapshot.positions}
+        return self.snapshot
+
+    def current_snapshot(self):
+        """Snapshot of the current cycle (read now if no cycle has run yet)"""
+        return self.snapshot or self.refresh_snapshot()
+
     def reset_daily_stats(self):
         """Reset daily statistics"""
         today = datetime.now().date().isoformat()
@@ -357,7 +443,7 @@ class AutoTradingBot:
             return False, f"Max daily loss reached (${self.state['daily_pnl']:.2f}), threshold -${max_daily_loss:.2f}"
         
         # Check max positions
-        positions = mt5.positions_get(symbol=self.config.SYMBOL)
+        positions = self.current_snapshot().positions
         if positions and len(positions) >= self.config.MAX_POSITIONS: 
             return False, f"Max positions reached ({len(positions)})"
         
@@ -367,17 +453,19 @@ class AutoTradingBot:
         """Fetch and process market data"""
         # Ensure symbol is available in Market Watch
 
-        # Attempt to ensure the symbol is visible in Market Watch and print debug info
-        try:
-            selected = mt5.symbol_select(self.config.SYMBOL, True)
-            print(f"[DEBUG] mt5.symbol_select('{self.config.SYMBOL}') -> {selected}")
-            # Do not print full symbol_info to avoid verbose logs
-            _ = mt5.symbol_info(self.config.SYMBOL)
-        except Exception as e:
-            print(f"[DEBUG] symbol_select/info error: {e}")
-
+        # Attempt to ensure the symbol is visible in Market Watch (once per session)
+        if not self.symbol_selected:
+            try:
+                selected = mt5.symbol_select(self.config.SYMBOL, True)
+                print(f"[DEBUG] mt5.symbol_select('{self.config.SYMBOL}') -> {selected}")
+                self.symbol_selected = bool(selected)
+            except Exception as e:
+                print(f"[DEBUG] symbol_select/info error: {e}")
+
+        # With bar-close triggering only closed bars are used (position 1 on)
+        start_pos = 1 if self.config.BAR_CLOSE_TRIGGER else 0
         rates = mt5.copy_rates_from_pos(self.config.SYMBOL, self.config.TIMEFRAME,
-                                        0, self.config.DATA_BARS)
+                                        start_pos, self.config.DATA_BARS)
 
         if rates is None or len(rates) == 0:
             # Provide MT5 error info to help troubleshooting
@@ -388,27 +476,30 @@ class AutoTradingBot:
                 print(f"[WARN] Failed to fetch rates for {self.config.SYMBOL}: unknown error")
             return None
         
+        # Same last closed bar as before: reuse the computed indicators
+        if (self.config.BAR_CLOSE_TRIGGER and self.market_data is not None
+                and rates['time'][-1] == self.market_data_bar):
+            return self.market_data
+
         df = pd.DataFrame(rates)
         df['time'] = pd.to_datetime(df['time'], unit='s')
         
-        # Calculate indicators
-        df['sma_fast'] = df['close'].rolling(window=self.config.SMA_FAST).mean()
-        df['sma_slow'] = df['close'].rolling(window=self.config.SMA_SLOW).mean()
+        # Calculate indicators: SMAs and ATR (rolling mean of true range) only
+        # for the bars added since the last fetch
+        columns = self.indicators.update(rates['time'], rates['close'], rates['high'], rates['low'])
+        df['sma_fast'] = columns['sma_fast']
+        df['sma_slow'] = columns['sma_slow']
         df['rsi'] = calculate_rsi(df['close'].values, self.config.RSI_PERIOD)
-        
-        # Calculate ATR
-        df['high_low'] = df['high'] - df['low']
-        df['high_close'] = np.abs(df['high'] - df['close'].shift())
-        df['low_close'] = np.abs(df['low'] - df['close'].shift())
-        df['tr'] = df[['high_low', 'high_close', 'low_close']].max(axis=1)
-        df['atr'] = df['tr'].rolling(window=self.config.ATR_PERIOD).mean()
+        df['atr'] = columns['atr']
         
         df = df.dropna()
+        self.market_data = df
+        self.market_data_bar = rates['time'][-1]
         return df
     
     def check_spread(self):
         """Check if current spread is acceptable"""
-        symbol_info = mt5.symbol_info(self.config.SYMBOL)
+        symbol_info = self.current_snapshot().symbol_info
         if symbol_info is None:
             return False, 999
         
@@ -430,16 +521,15 @@ class AutoTradingBot:
         ml_prediction = None
         ml_score_available = False
         try:
-            from inference import ModelPredictor
-            from pathlib import Path
+            from inference import get_predictor
             
             model_dir = Path('models')
-            if model_dir.exists() and any(model_dir.glob('*.pkl')) or any(model_dir.glob('*.pt')):
-                predictor = ModelPredictor(model_dir=str(model_dir))
-                result = predictor.predict(df.tail(10))  # Use last 10 bars for prediction
-                if result and 'predictions' in result and len(result['predictions']) > 0:
-                    ml_prediction = result['predictions'][-1]  # Last prediction
-                    ml_score_available = True
+            if (model_dir / 'rf_baseline.pkl').exists():
+                # Shared registry: loaded once, reloaded only when models/*.pkl change
+                predictor = get_predictor(model_dir=model_dir)
+                # Incremental features: only the bars since the last call are folded in
+                ml_prediction = predictor.predict_latest(df, stream=self.config.SYMBOL)
+                ml_score_available = True
         except ImportError:
             pass  # inference.py not available, continue with TA only
         except Exception as e:
@@ -489,7 +579,7 @@ class AutoTradingBot:
     
     def execute_trade(self, signal):
         """Execute trade on MT5"""
-        symbol_info = mt5.symbol_info(self.config.SYMBOL)
+        symbol_info = self.current_snapshot().symbol_info
         if symbol_info is None:
             print(f"❌ Symbol {self.config.SYMBOL} not found")
             return False
@@ -551,6 +641,7 @@ class AutoTradingBot:
         time_module.sleep(0.5)  # Small delay for MT5
         positions = mt5.positions_get(symbol=self.config.SYMBOL)
         if positions:
+            self.current_snapshot().positions = tuple(positions)
             for pos in positions:
                 # Track ALL current position tickets (including this new one)
                 self.bot_order_ids.add(pos.ticket)
@@ -591,7 +682,7 @@ class AutoTradingBot:
     
     def monitor_positions(self):
         """Monitor open positions"""
-        positions = mt5.positions_get(symbol=self.config.SYMBOL)
+        positions = self.current_snapshot().positions
         
         if not positions:
             return
@@ -616,13 +707,14 @@ class AutoTradingBot:
     def detect_manual_trades(self):
         """Detect manual vs other auto-bot trades"""
 
-        info = mt5.account_info()
+        snapshot = self.current_snapshot()
+        info = snapshot.account
         if info is None or info.margin_level is None:
             return
 
         margin = info.margin_level
 
-        positions = mt5.positions_get(symbol=self.config.SYMBOL)
+        positions = snapshot.positions
         if not positions:
             return
 
@@ -772,18 +864,22 @@ class AutoTradingBot:
     def monitor_closed_trades(self):
         """Notify ALL closed positions (bot / other bot / manual)"""
         
-        info = mt5.account_info()
+        info = self.current_snapshot().account
         if info is None or info.margin_level is None:
             return
 
         margin = info.margin_level
 
-        from_date = datetime.now().replace(hour=0, minute=0, second=0)
-        deals = mt5.history_deals_get(from_date, datetime.now())
+        # Only deals from the last seen deal time on (start of day at first);
+        # the bound is inclusive, notified_deals drops the repeats. The end
+        # leaves a day of slack for servers running ahead of local time.
+        deals = mt5.history_deals_get(self.deals_from, datetime.now() + timedelta(days=1))
 
         if not deals:
             return
 
+        self.deals_from = max(deal.time for deal in deals)
+
         for deal in deals:
             if deal.symbol != self.config.SYMBOL:
                 continue
@@ -850,8 +946,8 @@ class AutoTradingBot:
     """
             self.telegram.send_message(message)
     
-    def run(self):
-        """Main bot loop"""
+    def print_banner(self):
+        """Print strategy and risk settings"""
         print(f"\n{'='*80}")
         print(f"🤖 BOT STARTING")
         print(f"{'='*80}")
@@ -865,16 +961,9 @@ class AutoTradingBot:
         print(f"Sessions:        London:   {self.config.TRADE_LONDON}, "
             f"NY:  {self.config.TRADE_NY}, Asian: {self.config.TRADE_ASIAN}")
         print(f"{'='*80}")
-        
-        # Connect to MT5
-        if not self.connect_mt5():
-            return
-        
-        self.running = True
-        print(f"\n✅ Bot is LIVE! Monitoring {self.config.SYMBOL} for signals...")
-        print(f"Press Ctrl+C to stop\n")
 
-        # Track existing positions on startup
+    def scan_startup_positions(self):
+        """Track the bot's own positions that are already open"""
         print(f"[STARTUP] Scanning for existing positions...")
         startup_positions = mt5.positions_get(symbol=self.config.SYMBOL)
 
@@ -898,92 +987,190 @@ class AutoTradingBot:
 
         print(f"[STARTUP] Bot order IDs after startup: {self.bot_order_ids}")
 
+    def run_cycle(self):
+        """Run one wake-up of the bot.
+
+        With bar-close triggering the full pipeline runs when a new bar has
+        formed (the tick time, or the wall clock without a tick, is past the
+        last computed bar) and on every wake-up after that until the bar's
+        signal has been evaluated (a cycle can exit early: spread, session,
+        risk halt, no data); otherwise only the tick-level position path
+        runs. The next wake-up is the regular cycle interval, or the bar
+        close when that comes first.
+
+        Returns None to keep the regular interval, or the seconds to wait
+        instead (an earlier bar close, or a back-off after a halt or error).
+        """
+        if not self.config.BAR_CLOSE_TRIGGER:
+            return self.run_full_cycle()
+
+        try:
+            tick = mt5.symbol_info_tick(self.config.SYMBOL)
+            stamp = tick.time if tick is not None else time_module.time()
+            if self.bar_clock.is_new_bar(stamp):
+                self.bar_clock.mark(stamp)
+                self.signal_pending = True
+            if self.signal_pending:
+                delay = self.run_full_cycle()
+                if delay is not None:
+                    return delay
+            else:
+                self.monitor_ticks()
+        except Exception as e:
+            print(f"\n❌ Error in main loop: {e}")
+            return 10
+
+        # Small margin so the wake-up lands just after the boundary
+        to_close = self.bar_clock.seconds_to_close() + 0.05
+        return to_close if to_close < self.interval else None
+
+    def monitor_ticks(self):
+        """Cheap path between bar closes: watch positions for SL/TP and manual changes"""
+        positions = tuple(mt5.positions_get(symbol=self.config.SYMBOL) or ())
+        tickets = {pos.ticket for pos in positions}
+
+        if tickets != self.open_tickets:
+            # A position opened or closed (SL/TP hit, manual action): full refresh
+            self.refresh_snapshot()
+            self.detect_manual_trades()
+            self.monitor_closed_trades()
+        else:
+            snapshot = self.current_snapshot()
+            snapshot.positions = positions
+            if positions:
+                # Margin moves with price: keep warnings tick-timely
+                snapshot.account = mt5.account_info()
+
+        if positions:
+            self.check_margin_level()
+            self.monitor_positions()
+
+    def run_full_cycle(self):
+        """Run one pipeline cycle: data, indicators, signal, risk check, execution.
+
+        Returns None to keep the regular cycle interval, or a back-off delay
+        in seconds (trading halted, error).
+        """
+        try:
+            # One consistent terminal read shared by every check below
+            self.refresh_snapshot()
+
+            self.check_margin_level()  # ← TAMBAHKAN DI SINI
+            # Check session
+            session = get_current_session()
+            trading_allowed = is_trading_allowed()
+            
+            # Check risk limits
+            risk_ok, risk_msg = self.check_risk_limits()
+            
+            # Get market data
+            df = self.get_market_data()
+            if df is None:  
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] ⚠️ Failed to get market data")
+                return None
+
+            # Signals are evaluated once per closed bar
+            bar_time = df['time'].iloc[-1]
+            new_bar = bar_time != self.last_bar_time
+            
+            # Check for manual trades and closed trades (once per cycle)
+            self.detect_manual_trades()
+            self.monitor_closed_trades()
+            
+            # Check for existing positions
+            positions = self.snapshot.positions
+            has_position = positions is not None and len(positions) > 0
+            
+            # Monitor existing positions
+            if has_position: 
+                self.monitor_positions()
+                return None
+            
+            # Check if trading allowed
+            if not trading_allowed: 
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] "
+                    f"Session:   {session} (Trading disabled)        ", end='\r')
+                return None
+            
+            # Check risk limits
+            if not risk_ok:
+                print(f"\n[{datetime.now().strftime('%H:%M:%S')}] "
+                    f"⚠️ Trading halted:   {risk_msg}")
+                return 1
+            
+            # Check spread
+            spread_ok, spread = self.check_spread()
+            if not spread_ok:  
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] "
+                    f"⚠️ Spread too wide: {spread} points        ", end='\r')
+                return None
+            
+            # Detect signal (bar unchanged since last evaluation: nothing new)
+            if self.config.BAR_CLOSE_TRIGGER and not new_bar:
+                return None
+            signal = self.detect_signal(df)
+            self.last_bar_time = bar_time
+            self.signal_pending = False
+            
+            if signal:  
+                print(f"\n[{datetime.now().strftime('%H:%M:%S')}] "
+                    f"🎯 {signal['type']} SIGNAL DETECTED!")
+                print(f"   Session: {session} | Spread: {spread} points")
+                
+                # Execute trade
+                if self.execute_trade(signal):
+                    print(f"✅ Trade executed successfully!")
+                else:
+                    print(f"❌ Trade execution failed!")
+            else:
+                # Status update
+                current = df.iloc[-1]
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] "
+                    f"Session: {session} | Price: {current['close']:.2f} | "
+                    f"RSI: {current['rsi']:.1f} | Spread: {spread} | "
+                    f"Trades: {self.state['daily_trades']}/{self.config.MAX_DAILY_TRADES} | "
+                    f"P&L: ${self.state['daily_pnl']:.2f}        ", end='\r')
+            
+            return None
+            
+        except Exception as e:  
+            print(f"\n❌ Error in main loop: {e}")
+            return 10
+
+    def print_final_statistics(self):
+        """Print daily and all-time trade statistics"""
+        print(f"\n📊 Final Statistics:")
+        print(f"   Total Trades Today: {self.state['daily_trades']}")
+        print(f"   Daily P&L: ${self.state['daily_pnl']:.2f}")
+        print(f"   Total Trades (All Time): {self.state['total_trades']}")
+        print(f"\n✅ Bot shutdown complete")
+
+    def run(self):
+        """Main bot loop"""
+        self.print_banner()
+        
+        # Connect to MT5
+        if not self.connect_mt5():
+            return
+        
+        self.running = True
+        print(f"\n✅ Bot is LIVE! Monitoring {self.config.SYMBOL} for signals...")
+        print(f"Press Ctrl+C to stop\n")
+
+        # Track existing positions on startup
+        self.scan_startup_positions()
+
+        # Load and warm up the ML model once, before the first signal check
+        warmup_predictor()
+
         # Send startup notification
         if self.telegram:
             self.telegram.send_startup()
         
         try:
             while self.running:
-                try:
-                    self.check_margin_level()  # ← TAMBAHKAN DI SINI
-                    # Check session
-                    session = get_current_session()
-                    trading_allowed = is_trading_allowed()
-                    
-                    # Check risk limits
-                    risk_ok, risk_msg = self.check_risk_limits()
-                    
-                    # Get market data
-                    df = self.get_market_data()
-                    if df is None:  
-                        print(f"[{datetime.now().strftime('%H:%M:%S')}] ⚠️ Failed to get market data")
-                        time_module.sleep(self.config.CHECK_INTERVAL)
-                        continue
-                    
-                    # Check for manual trades and closed trades (once per cycle)
-                    self.detect_manual_trades()
-                    self.monitor_closed_trades()
-                    
-                    # Check for existing positions
-                    positions = mt5.positions_get(symbol=self.config.SYMBOL)
-                    has_position = positions is not None and len(positions) > 0
-                    
-                    # Monitor existing positions
-                    if has_position: 
-                        self.monitor_positions()
-                        time_module.sleep(self.config.CHECK_INTERVAL)
-                        continue
-                    
-                    # Check if trading allowed
-                    if not trading_allowed: 
-                        print(f"[{datetime.now().strftime('%H:%M:%S')}] "
-                            f"Session:   {session} (Trading disabled)        ", end='\r')
-                        time_module.sleep(self.config.CHECK_INTERVAL)
-                        continue
-                    
-                    # Check risk limits
-                    if not risk_ok:
-                        print(f"\n[{datetime.now().strftime('%H:%M:%S')}] "
-                            f"⚠️ Trading halted:   {risk_msg}")
-                        time_module.sleep(1)
-                        continue
-                    
-                    # Check spread
-                    spread_ok, spread = self.check_spread()
-                    if not spread_ok:  
-                        print(f"[{datetime.now().strftime('%H:%M:%S')}] "
-                            f"⚠️ Spread too wide: {spread} points        ", end='\r')
-                        time_module.sleep(self.config.CHECK_INTERVAL)
-                        continue
-                    
-                    # Detect signal
-                    signal = self.detect_signal(df)
-                    
-                    if signal:  
-                        print(f"\n[{datetime.now().strftime('%H:%M:%S')}] "
-                            f"🎯 {signal['type']} SIGNAL DETECTED!")
-                        print(f"   Session: {session} | Spread: {spread} points")
-                        
-                        # Execute trade
-                        if self.execute_trade(signal):
-                            print(f"✅ Trade executed successfully!")
-                        else:
-                            print(f"❌ Trade execution failed!")
-                    else:
-                        # Status update
-                        current = df.iloc[-1]
-                        print(f"[{datetime.now().strftime('%H:%M:%S')}] "
-                            f"Session: {session} | Price: {current['close']:.2f} | "
-                            f"RSI: {current['rsi']:.1f} | Spread: {spread} | "
-                            f"Trades: {self.state['daily_trades']}/{self.config.MAX_DAILY_TRADES} | "
-                            f"P&L: ${self.state['daily_pnl']:.2f}        ", end='\r')
-                    
-                    time_module.sleep(self.config.CHECK_INTERVAL)
-                    
-                except Exception as e:  
-                    print(f"\n❌ Error in main loop: {e}")
-                    time_module.sleep(10)
-                    continue
+                delay = self.run_cycle()
+                time_module.sleep(self.interval if delay is None else delay)
         
         except KeyboardInterrupt:  
             print(f"\n\n{'='*80}")
@@ -993,16 +1180,12 @@ class AutoTradingBot:
         finally:
             self.disconnect_mt5()
             save_bot_state(self.state)
-            print(f"\n📊 Final Statistics:")
-            print(f"   Total Trades Today: {self.state['daily_trades']}")
-            print(f"   Daily P&L: ${self.state['daily_pnl']:.2f}")
-            print(f"   Total Trades (All Time): {self.state['total_trades']}")
-            print(f"\n✅ Bot shutdown complete")
+            self.print_final_statistics()
 
     def check_margin_level(self):
         """Monitor margin level and send warning notifications"""
 
-        info = mt5.account_info()
+        info = self.current_snapshot().account
         if info is None or info.margin_level is None:
             return
 
@@ -1063,6 +1246,103 @@ class AutoTradingBot:
         print(f"[MARGIN] {label} - {margin:.2f}%")
 
 
+# ============================================================================
+# MULTI-SYMBOL ENGINE
+# ============================================================================
+
+class MultiSymbolEngine:
+    """Trade several symbols from one process over one MT5 session.
+
+    Every symbol gets its own AutoTradingBot pipeline (data fetch,
+    indicators, signal, risk check, execution). The pipelines run as
+    asyncio tasks on a SymbolScheduler, each with its own cadence, and all
+    terminal calls go through the scheduler's single worker so the shared
+    MT5 session is never used concurrently. Daily risk state and the
+    Telegram notifier are shared by all symbols.
+    """
+
+    def __init__(self, symbols=None, intervals=None, config=None):
+        self.primary = AutoTradingBot()
+        if config is not None:
+            self.primary.config = config
+        symbols = list(symbols or self.primary.config.SYMBOLS)
+        self.primary.config.SYMBOL = symbols[0]
+
+        self.bots = [self.primary] + [AutoTradingBot(symbol=s, parent=self.primary) for s in symbols[1:]]
+        self.intervals = dict(self.primary.config.SYMBOL_INTERVALS)
+        self.intervals.update(intervals or {})
+        self.scheduler = SymbolScheduler()
+        self._loop = None
+
+    def connect(self):
+        """Connect once and resolve every symbol name on the shared session"""
+        if not self.primary.connect_mt5():
+            return False
+
+        for bot in self.bots[1:]:
+            resolved = bot.resolve_symbol(bot.config.SYMBOL)
+            if resolved and resolved != bot.config.SYMBOL:
+                print(f"[DEBUG] Resolved symbol '{bot.config.SYMBOL}' -> '{resolved}'")
+                bot.config.SYMBOL = resolved
+            elif not resolved:
+                print(f"[WARN] Could not resolve '{bot.config.SYMBOL}'")
+            bot.mt5_connected = True
+        return True
+
+    def run(self):
+        """Run all symbol pipelines until stopped"""
+        self.primary.print_banner()
+        print(f"Symbols:         {', '.join(bot.config.SYMBOL for bot in self.bots)}")
+
+        if not self.connect():
+            return
+
+        for bot in self.bots:
+            bot.running = True
+            bot.scan_startup_positions()
+            bot.interval = self.intervals.get(bot.config.SYMBOL, bot.config.CHECK_INTERVAL)
+            self.scheduler.add(bot.config.SYMBOL, bot.run_cycle, bot.interval)
+
+        warmup_predictor()
+
+        if self.primary.telegram:
+            self.primary.telegram.send_startup()
+
+        print(f"\n✅ Engine is LIVE! Monitoring {len(self.bots)} symbol(s) for signals...")
+        print(f"Press Ctrl+C to stop\n")
+
+        try:
+            asyncio.run(self._run())
+
+        except KeyboardInterrupt:
+            print(f"\n\n{'='*80}")
+            print(f"🛑 Bot stopped by user")
+            print(f"{'='*80}")
+
+        finally:
+            self.primary.disconnect_mt5()
+            save_bot_state(self.primary.state)
+            for symbol, stats in self.scheduler.get_stats().items():
+                print(f"[ENGINE] {symbol}: {stats['cycles']} cycles, {stats['overruns']} overruns, "
+                      f"{stats['errors']} errors, interval {stats['interval']}s")
+            self.primary.print_final_statistics()
+
+    async def _run(self):
+        self._loop = asyncio.get_running_loop()
+        try:
+            await self.scheduler.run()
+        finally:
+            self._loop = None
+
+    def stop(self):
+        """Stop all pipelines (safe to call from another thread)"""
+        for bot in self.bots:
+            bot.running = False
+        loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self.scheduler.stop)
+
+
 # ============================================================================
 # MAIN EXECUTION
 # ============================================================================
@@ -1081,6 +1361,6 @@ if __name__ == "__main__":
         print("Bot not started.Exiting...")
         exit()
     
-    # Start bot
-    bot = AutoTradingBot()
-    bot.run()
\ No newline at end of file
+    # Start bot (one pipeline per configured symbol, shared MT5 session)
+    engine = MultiSymbolEngine()
+    engine.run()
\ No newline at end of file
@@ -0,0 +1,335 @@
+"""
+Event-driven bar backtest engine with a compiled core loop.
+
+Front-ends build a signal array (+1 buy, -1 sell, 0 none) from whatever
+strategy they run and pass it with columnar bar arrays. The engine handles
+position state, stop-loss/take-profit exits (on closes or intrabar
+highs/lows), spread cost, trade records and the realized equity curve.
+
+Bar prices are treated as bid prices. Buys fill at ask (bid + spread) and
+shorts are closed at ask, so a per-bar spread array in price units models
+the cost of crossing it.
+"""
+from dataclasses import dataclass
+from typing import Dict, Optional, Union
+
+import numba
+import numpy as np
+import pandas as pd
+
+
+EXIT_STOP_LOSS = 0
+EXIT_TAKE_PROFIT = 1
+EXIT_SIGNAL = 2
+EXIT_END_OF_DATA = 3
+
+EXIT_REASONS = {
+    EXIT_STOP_LOSS: 'Stop Loss',
+    EXIT_TAKE_PROFIT: 'Take Profit',
+    EXIT_SIGNAL: 'Signal',
+    EXIT_END_OF_DATA: 'End of Data',
+}
+
+ArrayLike = Union[np.ndarray, pd.Series, float]
+
+
+@numba.jit(nopython=True, cache=True)
+def _backtest_kernel(open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                     spread: np.ndarray, signals: np.ndarray, sl_distance: np.ndarray,
+                     tp_distance: np.ndarray, lot_size: float, contract_size: float,
+                     initial_balance: float, intrabar: bool, exit_on_signal: bool,
+                     reverse: bool, allow_short: bool, close_at_end: bool):
+    """
+    Simulate one position at a time over all bars.
+
+    Entries fill at the signal bar's close. A bar that closes a position on
+    SL/TP does not open a new one; a signal exit opens the opposite position
+    on the same bar when ``reverse`` is set.
+
+    Returns:
+        Trade arrays (entry index, exit index, direction, entry price, exit
+        price, PnL, exit reason), trade count, equity per bar, and the
+        direction of a position still open at the end
+    """
+    n = len(close)
+    # At most one exit per bar (signal reversals can close on every bar) plus the end-of-data close
+    max_trades = n + 1
+    entry_idx = np.empty(max_trades, dtype=np.int64)
+    exit_idx = np.empty(max_trades, dtype=np.int64)
+    direction = np.empty(max_trades, dtype=np.int8)
+    entry_px = np.empty(max_trades)
+    exit_px = np.empty(max_trades)
+    pnl_out = np.empty(max_trades)
+    reason_out = np.empty(max_trades, dtype=np.int8)
+    equity = np.empty(n)
+
+    balance = initial_balance
+    n_trades = 0
+    position = 0
+    entry_bar = 0
+    entry_price = 0.0
+    stop_loss = np.nan
+    take_profit = np.nan
+
+    for i in range(n):
+        signal = signals[i]
+        exited = False
+        exit_price = 0.0
+        reason = -1
+
+        if position != 0:
+            if position == 1:
+                # Long closes at bid
+                if intrabar:
+                    if low[i] <= stop_loss:
+                        exit_price = min(open_[i], stop_loss)
+                        reason = EXIT_STOP_LOSS
+                    elif high[i] >= take_profit:
+                        exit_price = max(open_[i], take_profit)
+                        reason = EXIT_TAKE_PROFIT
+                else:
+                    price = close[i]
+                    hit_sl = price <= stop_loss
+                    if hit_sl or price >= take_profit:
+                        exit_price = price
+                        reason = EXIT_STOP_LOSS if hit_sl else EXIT_TAKE_PROFIT
+            else:
+                # Short closes at ask
+                if intrabar:
+                    if high[i] + spread[i] >= stop_loss:
+                        exit_price = max(open_[i] + spread[i], stop_loss)
+                        reason = EXIT_STOP_LOSS
+                    elif low[i] + spread[i] <= take_profit:
+                        exit_price = min(open_[i] + spread[i], take_profit)
+                        reason = EXIT_TAKE_PROFIT
+                else:
+                    price = close[i] + spread[i]
+                    hit_sl = price >= stop_loss
+                    if hit_sl or price <= take_profit:
+                        exit_price = price
+                        reason = EXIT_STOP_LOSS if hit_sl else EXIT_TAKE_PROFIT
+
+            if reason < 0 and exit_on_signal and signal == -position:
+                exit_price = close[i] if position == 1 else close[i] + spread[i]
+                reason = EXIT_SIGNAL
+
+            if reason >= 0:
+                if position == 1:
+                    pnl = (exit_price - entry_price) * lot_size * contract_size
+                else:
+                    pnl = (entry_price - exit_price) * lot_size * contract_size
+                balance += pnl
+                entry_idx[n_trades] = entry_bar
+                exit_idx[n_trades] = i
+                direction[n_trades] = position
+                entry_px[n_trades] = entry_price
+                exit_px[n_trades] = exit_price
+                pnl_out[n_trades] = pnl
+                reason_out[n_trades] = reason
+                n_trades += 1
+                position = 0
+                exited = True
+
+        can_enter = not exited or (reason == EXIT_SIGNAL and reverse)
+        if position == 0 and can_enter and (signal == 1 or (signal == -1 and allow_short)):
+            position = signal
+            entry_bar = i
+            if position == 1:
+                entry_price = close[i] + spread[i]
+                stop_loss = entry_price - sl_distance[i]
+                take_profit = entry_price + tp_distance[i]
+            else:
+                entry_price = close[i]
+                stop_loss = entry_price + sl_distance[i]
+                take_profit = entry_price - tp_distance[i]
+
+        equity[i] = balance
+
+    if close_at_end and position != 0 and n > 0:
+        last = n - 1
+        exit_price = close[last] if position == 1 else close[last] + spread[last]
+        if position == 1:
+            pnl = (exit_price - entry_price) * lot_size * contract_size
+        else:
+            pnl = (entry_price - exit_price) * lot_size * contract_size
+        balance += pnl
+        entry_idx[n_trades] = entry_bar
+        exit_idx[n_trades] = last
+        direction[n_trades] = position
+        entry_px[n_trades] = entry_price
+        exit_px[n_trades] = exit_price
+        pnl_out[n_trades] = pnl
+        reason_out[n_trades] = EXIT_END_OF_DATA
+        n_trades += 1
+        equity[last] = balance
+        position = 0
+
+    return (entry_idx, exit_idx, direction, entry_px, exit_px, pnl_out, reason_out,
+            n_trades, equity, position)
+
+
+@dataclass
+class BacktestResult:
+    """Trades, equity curve and final state of one backtest run."""
+    trades: pd.DataFrame
+    equity: np.ndarray
+    initial_balance: float
+    final_balance: float
+    open_position: int
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Standard performance metrics.
+
+        Returns:
+            Dictionary with trade counts, PnL, win rate, profit factor,
+            return and max drawdown (percent of running peak)
+        """
+        pnl = self.trades['pnl'].to_numpy() if len(self.trades) else np.empty(0)
+        wins = pnl[pnl > 0]
+        losses = pnl[pnl < 0]
+        gross_profit = float(wins.sum())
+        gross_loss = float(abs(losses.sum()))
+
+        equity = np.concatenate([[self.initial_balance], self.equity])
+        peak = np.maximum.accumulate(equity)
+        drawdown = (equity - peak) / peak * 100
+
+        return {
+            'total_trades': int(len(pnl)),
+            'winning_trades': int(len(wins)),
+            'losing_trades': int(len(losses)),
+            'total_pnl': float(pnl.sum()),
+            'gross_profit': gross_profit,
+            'gross_loss': gross_loss,
+            'win_rate': len(wins) / len(pnl) * 100 if len(pnl) else 0.0,
+            'profit_factor': gross_profit / gross_loss if gross_loss > 0 else 0.0,
+            'total_return': (self.final_balance - self.initial_balance) / self.initial_balance * 100,
+            'max_drawdown': float(drawdown.min()),
+        }
+
+
+def _as_array(values: Optional[ArrayLike], n: int, fill: float) -> np.ndarray:
+    """Broadcast a scalar, Series or array to a contiguous float64 array of length n."""
+    if values is None:
+        return np.full(n, fill)
+    arr = np.asarray(values, dtype=np.float64)
+    if arr.ndim == 0:
+        return np.full(n, float(arr))
+    if len(arr) != n:
+        raise ValueError(f"Expected {n} values, got {len(arr)}")
+    return np.ascontiguousarray(arr)
+
+
+def run_backtest(close: ArrayLike, signals: ArrayLike, high: Optional[ArrayLike] = None,
+                 low: Optional[ArrayLike] = None, open_: Optional[ArrayLike] = None,
+                 times: Optional[ArrayLike] = None, sl_distance: Optional[ArrayLike] = None,
+                 tp_distance: Optional[ArrayLike] = None, lot_size: float = 0.01,
+                 contract_size: float = 100.0, spread: ArrayLike = 0.0,
+                 initial_balance: float = 1000.0, intrabar: bool = False,
+                 exit_on_signal: bool = False, reverse: bool = False,
+                 allow_short: bool = True, close_at_end: bool = False) -> BacktestResult:
+    """
+    Run a backtest over bar arrays.
+
+    Args:
+        close: Close (bid) prices
+        signals: +1 to buy, -1 to sell, 0 for no signal, per bar
+        high: High prices (required for intrabar stops)
+        low: Low prices (required for intrabar stops)
+        open_: Open prices, used for gap fills on intrabar stops (close if None)
+        times: Bar times for the trade log (bar indices if None)
+        sl_distance: Stop-loss distance in price units at each entry bar (None/NaN: no stop)
+        tp_distance: Take-profit distance in price units at each entry bar (None/NaN: no target)
+        lot_size: Position size in lots
+        contract_size: Units per lot
+        spread: Spread in price units, scalar or per bar
+        initial_balance: Starting balance
+        intrabar: Check stops against bar high/low instead of the close
+        exit_on_signal: Close a position on an opposite signal
+        reverse: Open the opposite position on a signal exit
+        allow_short: Open shorts on sell signals (otherwise sells only exit longs)
+        close_at_end: Close a position still open on the last bar
+
+    Returns:
+        BacktestResult with trade log and realized equity per bar
+    """
+    close = _as_array(close, len(close), np.nan)
+    n = len(close)
+    signals = np.ascontiguousarray(np.nan_to_num(np.asarray(signals, dtype=np.float64))).astype(np.int8)
+    if len(signals) != n:
+        raise ValueError(f"Expected {n} signals, got {len(signals)}")
+
+    if intrabar and (high is None or low is None):
+        raise ValueError("Intrabar stop checks require high and low prices")
+    high = _as_array(high, n, np.nan) if high is not None else close
+    low = _as_array(low, n, np.nan) if low is not None else close
+    open_ = _as_array(open_, n, np.nan) if open_ is not None else close
+    spread = _as_array(spread, n, 0.0)
+    sl_distance = _as_array(sl_distance, n, np.nan)
+    tp_distance = _as_array(tp_distance, n, np.nan)
+
+    (entry_idx, exit_idx, direction, entry_px, exit_px, pnl, reason,
+     n_trades, equity, open_position) = _backtest_kernel(
+        open_, high, low, close, spread, signals, sl_distance, tp_distance,
+        float(lot_size), float(contract_size), float(initial_balance),
+        intrabar, exit_on_signal, reverse, allow_short, close_at_end,
+    )
+
+    times = np.arange(n) if times is None else np.asarray(times)
+    entry_idx = entry_idx[:n_trades]
+    exit_idx = exit_idx[:n_trades]
+    trades = pd.DataFrame({
+        'entry_time': times[entry_idx],
+        'exit_time': times[exit_idx],
+        'direction': np.where(direction[:n_trades] == 1, 'LONG', 'SHORT'),
+        'entry_price': entry_px[:n_trades],
+        'exit_price': exit_px[:n_trades],
+        'pnl': pnl[:n_trades],
+        'exit_reason': [EXIT_REASONS[r] for r in reason[:n_trades]],
+        'entry_index': entry_idx,
+        'exit_index': exit_idx,
+    })
+
+    return BacktestResult(
+        trades=trades,
+        equity=equity,
+        initial_balance=float(initial_balance),
+        final_balance=float(equity[-1]) if n else float(initial_balance),
+        open_position=int(open_position),
+    )
+
+
+def crossover_signals(sma_fast: ArrayLike, sma_slow: ArrayLike, rsi: ArrayLike,
+                      rsi_overbought: float = 70, rsi_oversold: float = 30) -> np.ndarray:
+    """
+    SMA crossover entries filtered by RSI.
+
+    Buy when the fast SMA crosses above the slow SMA with RSI below
+    ``rsi_overbought``; sell on the opposite cross with RSI above
+    ``rsi_oversold``. The first bar never signals.
+
+    Args:
+        sma_fast: Fast SMA
+        sma_slow: Slow SMA
+        rsi: RSI
+        rsi_overbought: Upper RSI filter for buys
+        rsi_oversold: Lower RSI filter for sells
+
+    Returns:
+        Signal array (+1, -1, 0)
+    """
+    fast = np.asarray(sma_fast, dtype=np.float64)
+    slow = np.asarray(sma_slow, dtype=np.float64)
+    rsi = np.asarray(rsi, dtype=np.float64)
+
+    signals = np.zeros(len(fast), dtype=np.int8)
+    if len(fast) < 2:
+        return signals
+
+    prev_fast, prev_slow = fast[:-1], slow[:-1]
+    cur_fast, cur_slow, cur_rsi = fast[1:], slow[1:], rsi[1:]
+    buy = (prev_fast <= prev_slow) & (cur_fast > cur_slow) & (cur_rsi < rsi_overbought)
+    sell = (prev_fast >= prev_slow) & (cur_fast < cur_slow) & (cur_rsi > rsi_oversold)
+    signals[1:] = np.where(buy, 1, np.where(sell, -1, 0))
+    return signals
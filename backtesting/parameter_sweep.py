@@ -0,0 +1,441 @@
+"""
+Parameter sweep engine for the SMA crossover / RSI / ATR SL-TP strategy.
+
+Each distinct SMA, RSI and ATR series is computed once with pandas (so values
+match the per-combination computation exactly). The bar-by-bar SL/TP state
+machine runs in a numba kernel that evaluates all SL/TP multiplier pairs of
+one (sma_fast, sma_slow, rsi_period) signal set in one call. Signal sets are
+fanned out over a process pool whose workers read the indicator matrix from
+shared memory instead of receiving a pickled copy per task.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numba
+import numpy as np
+import pandas as pd
+
+
+RESULT_COLUMNS = [
+    'sma_fast', 'sma_slow', 'rsi_period', 'atr_sl_mult', 'atr_tp_mult',
+    'total_return', 'win_rate', 'profit_factor', 'total_trades',
+]
+
+
+def calculate_rsi(close: pd.Series, period: int = 14) -> pd.Series:
+    """
+    RSI from simple rolling means of gains and losses.
+
+    Args:
+        close: Close prices
+        period: RSI period
+
+    Returns:
+        RSI series (NaN during warm-up and where gains and losses are both zero)
+    """
+    delta = close.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+
+def calculate_atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
+    """
+    ATR as the simple rolling mean of true range.
+
+    Args:
+        df: DataFrame with high, low, close columns
+        period: ATR period
+
+    Returns:
+        ATR series
+    """
+    prev_close = df['close'].shift(1)
+    tr = np.maximum(
+        df['high'] - df['low'],
+        np.maximum(abs(df['high'] - prev_close), abs(df['low'] - prev_close))
+    )
+    return tr.rolling(window=period).mean()
+
+
+@numba.jit(nopython=True, cache=True)
+def _simulate_sltp(close: np.ndarray, sma_fast: np.ndarray, sma_slow: np.ndarray,
+                   rsi: np.ndarray, atr: np.ndarray, valid: np.ndarray,
+                   sl_mults: np.ndarray, tp_mults: np.ndarray,
+                   initial_balance: float, lot_size: float, contract_size: float,
+                   close_at_end: bool) -> np.ndarray:
+    """
+    Run the crossover entry / SL-TP exit state machine for each multiplier pair.
+
+    Bars where ``valid`` is False are skipped entirely, so the previous bar
+    of a crossover is the previous valid bar. With ``close_at_end`` a
+    position still open after the last valid bar is closed at its close;
+    otherwise it is dropped.
+
+    Returns:
+        Array (n_pairs, 5): final balance, trades, winning trades,
+        sum of winning PnL, sum of losing PnL
+    """
+    n_pairs = len(sl_mults)
+    out = np.zeros((n_pairs, 5))
+
+    for k in range(n_pairs):
+        sl_mult = sl_mults[k]
+        tp_mult = tp_mults[k]
+        balance = initial_balance
+        n_trades = 0
+        n_wins = 0
+        gross_profit = 0.0
+        gross_loss = 0.0
+        position = 0
+        entry_price = 0.0
+        stop_loss = 0.0
+        take_profit = 0.0
+        prev = -1
+
+        for i in range(len(close)):
+            if not valid[i]:
+                continue
+            if prev < 0:
+                prev = i
+                continue
+
+            price = close[i]
+            closed = False
+            pnl = 0.0
+
+            if position == 0:
+                if sma_fast[prev] <= sma_slow[prev] and sma_fast[i] > sma_slow[i] and rsi[i] < 70:
+                    position = 1
+                    entry_price = price
+                    stop_loss = entry_price - (atr[i] * sl_mult)
+                    take_profit = entry_price + (atr[i] * tp_mult)
+                elif sma_fast[prev] >= sma_slow[prev] and sma_fast[i] < sma_slow[i] and rsi[i] > 30:
+                    position = -1
+                    entry_price = price
+                    stop_loss = entry_price + (atr[i] * sl_mult)
+                    take_profit = entry_price - (atr[i] * tp_mult)
+            elif position == 1:
+                if price <= stop_loss or price >= take_profit:
+                    pnl = (price - entry_price) * lot_size * contract_size
+                    closed = True
+            else:
+                if price >= stop_loss or price <= take_profit:
+                    pnl = (entry_price - price) * lot_size * contract_size
+                    closed = True
+
+            if closed:
+                balance += pnl
+                n_trades += 1
+                if pnl > 0:
+                    n_wins += 1
+                    gross_profit += pnl
+                elif pnl < 0:
+                    gross_loss += pnl
+                position = 0
+
+            prev = i
+
+        if close_at_end and position != 0:
+            if position == 1:
+                pnl = (close[prev] - entry_price) * lot_size * contract_size
+            else:
+                pnl = (entry_price - close[prev]) * lot_size * contract_size
+            balance += pnl
+            n_trades += 1
+            if pnl > 0:
+                n_wins += 1
+                gross_profit += pnl
+            elif pnl < 0:
+                gross_loss += pnl
+
+        out[k, 0] = balance
+        out[k, 1] = n_trades
+        out[k, 2] = n_wins
+        out[k, 3] = gross_profit
+        out[k, 4] = gross_loss
+
+    return out
+
+
+# Worker-side view of the shared indicator matrix
+_shared: Dict[str, object] = {}
+
+
+def _attach_shared(name: str, shape: Tuple[int, int]) -> None:
+    """Process pool initializer: map the shared indicator matrix."""
+    shm = shared_memory.SharedMemory(name=name)
+    _shared['shm'] = shm
+    _shared['matrix'] = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+
+def run_signal_set(task: Dict[str, object], matrix: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+    """
+    Evaluate all SL/TP pairs of one signal set over a bar range.
+
+    Args:
+        task: Task built by ``ParameterSweep.signal_task``
+        matrix: Indicator matrix (the shared one when None)
+
+    Returns:
+        Kernel output, or None when fewer than the minimum bars are valid
+    """
+    if matrix is None:
+        matrix = _shared['matrix']
+
+    start, end = task['bounds']
+    close, fast, slow, rsi, atr = (matrix[r, start:end] for r in task['rows'])
+    valid = ~(np.isnan(close) | np.isnan(fast) | np.isnan(slow) | np.isnan(rsi) | np.isnan(atr))
+    if valid.sum() < task['min_bars']:
+        return None
+
+    return _simulate_sltp(close, fast, slow, rsi, atr, valid, task['sl_mults'], task['tp_mults'],
+                          task['initial_balance'], task['lot_size'], task['contract_size'],
+                          task['close_at_end'])
+
+
+def summarize_stats(stats: np.ndarray, initial_balance: float) -> Optional[Dict[str, float]]:
+    """
+    Convert kernel output for one combination to the metrics record.
+
+    Args:
+        stats: One row of ``_simulate_sltp`` output
+        initial_balance: Starting balance
+
+    Returns:
+        total_return, win_rate, profit_factor and total_trades, or None without trades
+    """
+    balance, n_trades, n_wins, gross_profit, gross_loss = stats
+    n_trades = int(n_trades)
+    if n_trades == 0:
+        return None
+
+    return {
+        'total_return': ((balance - initial_balance) / initial_balance) * 100,
+        'win_rate': n_wins / n_trades * 100,
+        'profit_factor': abs(gross_profit / gross_loss) if gross_loss != 0 else 0,
+        'total_trades': n_trades,
+    }
+
+
+def map_shared(fn: Callable, tasks: List, matrix: np.ndarray, workers: Optional[int] = None) -> List:
+    """
+    Apply ``fn(task, matrix)`` to every task, in a process pool sharing ``matrix``.
+
+    Workers get the matrix through shared memory and call ``fn(task)``,
+    which must then read it from the worker's shared view.
+
+    Args:
+        fn: Module-level task function
+        tasks: Picklable tasks
+        matrix: Indicator matrix
+        workers: Worker processes (CPU count if None, 1 runs in-process)
+
+    Returns:
+        Results in task order
+    """
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(tasks)) if tasks else 1
+    if workers <= 1:
+        return [fn(task, matrix) for task in tasks]
+
+    shm = shared_memory.SharedMemory(create=True, size=matrix.nbytes)
+    shared = None
+    try:
+        shared = np.ndarray(matrix.shape, dtype=np.float64, buffer=shm.buf)
+        shared[:] = matrix
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_attach_shared,
+            initargs=(shm.name, matrix.shape),
+        ) as pool:
+            chunksize = max(1, len(tasks) // (workers * 4))
+            return list(pool.map(fn, tasks, chunksize=chunksize))
+    finally:
+        del shared
+        shm.close()
+        shm.unlink()
+
+
+class ParameterSweep:
+    """Grid search over SMA/RSI periods and ATR SL/TP multipliers."""
+
+    def __init__(self, df: pd.DataFrame, atr_period: int = 14, initial_balance: float = 1000.0,
+                 lot_size: float = 0.01, contract_size: float = 100.0, min_bars: int = 100):
+        """
+        Initialize sweep.
+
+        Args:
+            df: OHLC DataFrame (high, low, close required)
+            atr_period: ATR period used for SL/TP distances
+            initial_balance: Starting balance
+            lot_size: Position size in lots
+            contract_size: Units per lot
+            min_bars: Minimum number of fully warmed-up bars per combination
+        """
+        self.df = df
+        self.atr_period = atr_period
+        self.initial_balance = initial_balance
+        self.lot_size = lot_size
+        self.contract_size = contract_size
+        self.min_bars = min_bars
+
+        self._rows: Dict[Tuple[str, int], int] = {}
+        self._matrix: Optional[np.ndarray] = None
+
+    def precompute(self, sma_periods: Sequence[int], rsi_periods: Sequence[int]) -> np.ndarray:
+        """
+        Compute each distinct indicator series once.
+
+        Rows of the returned matrix are close, ATR, then one row per SMA and
+        RSI period. Bars with missing values in any input column are set to
+        NaN in the close row so that every combination drops them.
+
+        Args:
+            sma_periods: SMA periods needed by the grid
+            rsi_periods: RSI periods needed by the grid
+
+        Returns:
+            Indicator matrix (n_series, n_bars)
+        """
+        df = self.df
+        close = df['close'].astype(float)
+
+        series: List[np.ndarray] = []
+        rows: Dict[Tuple[str, int], int] = {}
+
+        base = close.to_numpy(copy=True)
+        base[df.isna().any(axis=1).to_numpy()] = np.nan
+        rows[('close', 0)] = len(series)
+        series.append(base)
+        rows[('atr', self.atr_period)] = len(series)
+        series.append(calculate_atr(df, self.atr_period).to_numpy(dtype=float))
+
+        for period in sorted(set(sma_periods)):
+            rows[('sma', period)] = len(series)
+            series.append(close.rolling(window=period).mean().to_numpy())
+        for period in sorted(set(rsi_periods)):
+            rows[('rsi', period)] = len(series)
+            series.append(calculate_rsi(close, period).to_numpy())
+
+        self._rows = rows
+        self._matrix = np.ascontiguousarray(np.vstack(series))
+        return self._matrix
+
+    @property
+    def matrix(self) -> Optional[np.ndarray]:
+        """Indicator matrix from the last ``precompute``."""
+        return self._matrix
+
+    def signal_task(self, sma_fast: int, sma_slow: int, rsi_period: int,
+                    sl_mults: np.ndarray, tp_mults: np.ndarray,
+                    bounds: Optional[Tuple[int, int]] = None,
+                    close_at_end: bool = False) -> Dict[str, object]:
+        """
+        Build the task evaluating one signal set with several SL/TP pairs.
+
+        Args:
+            sma_fast: Fast SMA period
+            sma_slow: Slow SMA period
+            rsi_period: RSI period
+            sl_mults: ATR stop-loss multipliers, one per pair
+            tp_mults: ATR take-profit multipliers, one per pair
+            bounds: Bar range [start, end) to simulate (all bars if None)
+            close_at_end: Close a position still open on the last bar of ``bounds``
+
+        Returns:
+            Task for ``run_signal_set``
+        """
+        rows = self._rows
+        return {
+            'rows': (rows[('close', 0)], rows[('sma', sma_fast)], rows[('sma', sma_slow)],
+                     rows[('rsi', rsi_period)], rows[('atr', self.atr_period)]),
+            'bounds': bounds or (0, self._matrix.shape[1]),
+            'sl_mults': np.asarray(sl_mults, dtype=float),
+            'tp_mults': np.asarray(tp_mults, dtype=float),
+            'initial_balance': self.initial_balance,
+            'lot_size': self.lot_size,
+            'contract_size': self.contract_size,
+            'min_bars': self.min_bars,
+            'close_at_end': close_at_end,
+        }
+
+    def run(self, sma_fast_range: Sequence[int], sma_slow_range: Sequence[int],
+            rsi_period_range: Sequence[int], atr_sl_range: Sequence[float],
+            atr_tp_range: Sequence[float], workers: Optional[int] = None) -> pd.DataFrame:
+        """
+        Evaluate every combination with ``sma_fast < sma_slow``.
+
+        Args:
+            sma_fast_range: Fast SMA periods
+            sma_slow_range: Slow SMA periods
+            rsi_period_range: RSI periods
+            atr_sl_range: ATR stop-loss multipliers
+            atr_tp_range: ATR take-profit multipliers
+            workers: Worker processes (CPU count if None, 1 runs in-process)
+
+        Returns:
+            Metrics per combination with trades, in grid order
+            (columns as in ``RESULT_COLUMNS``)
+        """
+        self.precompute(list(sma_fast_range) + list(sma_slow_range), rsi_period_range)
+
+        pairs = list(product(atr_sl_range, atr_tp_range))
+        sl_mults = np.array([p[0] for p in pairs], dtype=float)
+        tp_mults = np.array([p[1] for p in pairs], dtype=float)
+
+        signal_sets = [
+            (fast, slow, rsi)
+            for fast, slow, rsi in product(sma_fast_range, sma_slow_range, rsi_period_range)
+            if fast < slow
+        ]
+        tasks = [self.signal_task(fast, slow, rsi, sl_mults, tp_mults) for fast, slow, rsi in signal_sets]
+        outputs = map_shared(run_signal_set, tasks, self._matrix, workers)
+
+        records = []
+        for (fast, slow, rsi), stats in zip(signal_sets, outputs):
+            if stats is None:
+                continue
+            for (sl_mult, tp_mult), row in zip(pairs, stats):
+                record = summarize_stats(row, self.initial_balance)
+                if record is not None:
+                    records.append({
+                        'sma_fast': fast,
+                        'sma_slow': slow,
+                        'rsi_period': rsi,
+                        'atr_sl_mult': sl_mult,
+                        'atr_tp_mult': tp_mult,
+                        **record,
+                    })
+
+        return pd.DataFrame(records, columns=RESULT_COLUMNS)
+
+
+def run_parameter_sweep(df: pd.DataFrame, sma_fast_range: Sequence[int], sma_slow_range: Sequence[int],
+                        rsi_period_range: Sequence[int], atr_sl_range: Sequence[float],
+                        atr_tp_range: Sequence[float], workers: Optional[int] = None,
+                        **kwargs) -> pd.DataFrame:
+    """
+    Run a full grid and sort by total return, best first.
+
+    Args:
+        df: OHLC DataFrame
+        sma_fast_range: Fast SMA periods
+        sma_slow_range: Slow SMA periods
+        rsi_period_range: RSI periods
+        atr_sl_range: ATR stop-loss multipliers
+        atr_tp_range: ATR take-profit multipliers
+        workers: Worker processes (CPU count if None)
+        **kwargs: Passed to ``ParameterSweep``
+
+    Returns:
+        Results table as written to optimization_results.csv
+    """
+    sweep = ParameterSweep(df, **kwargs)
+    results = sweep.run(sma_fast_range, sma_slow_range, rsi_period_range,
+                        atr_sl_range, atr_tp_range, workers=workers)
+    return results.sort_values('total_return', ascending=False)
@@ -0,0 +1,227 @@
+"""
+Walk-forward optimization on the parameter sweep grid.
+
+The data is cut into rolling folds of ``train_days`` trading days followed by
+``test_days`` out-of-sample days. In each fold the full grid is evaluated on
+the train window, the best combination is picked by ``objective`` and then
+scored on the test window only. Test windows do not overlap, and a position
+still open at the end of a window is closed on its last bar.
+
+Indicators are computed once over the whole history and shared by every
+fold (overlapping windows reuse the same arrays), so the test window starts
+with warmed-up indicators as it would in live trading. Folds run
+concurrently in a process pool that maps the indicator matrix from shared
+memory.
+"""
+from itertools import product
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backtesting.parameter_sweep import ParameterSweep, map_shared, run_signal_set, summarize_stats
+
+
+FOLD_COLUMNS = [
+    'fold', 'train_start', 'train_end', 'test_start', 'test_end',
+    'sma_fast', 'sma_slow', 'rsi_period', 'atr_sl_mult', 'atr_tp_mult',
+    'train_return', 'train_trades',
+    'total_return', 'win_rate', 'profit_factor', 'total_trades',
+]
+
+
+def run_fold(task: Dict[str, object], matrix: Optional[np.ndarray] = None) -> Dict[str, object]:
+    """
+    Optimize on one train window and evaluate the winner on its test window.
+
+    Args:
+        task: Fold task built by ``WalkForwardOptimizer``
+        matrix: Indicator matrix (the shared one when None)
+
+    Returns:
+        Chosen parameters, train metrics, test metrics and raw test stats
+    """
+    initial_balance = task['initial_balance']
+    objective = task['objective']
+    pairs = task['pairs']
+
+    best = None
+    for params, signal_task in zip(task['signal_sets'], task['train_tasks']):
+        stats = run_signal_set(signal_task, matrix)
+        if stats is None:
+            continue
+        for pair_index, row in enumerate(stats):
+            record = summarize_stats(row, initial_balance)
+            if record is None or record['total_trades'] < task['min_trades']:
+                continue
+            if best is None or record[objective] > best[2][objective]:
+                best = (params, pair_index, record, signal_task)
+
+    result = {'fold': task['fold']}
+    if best is None:
+        return result
+
+    (fast, slow, rsi), pair_index, train_record, signal_task = best
+    sl_mult, tp_mult = pairs[pair_index]
+    result.update({
+        'sma_fast': fast,
+        'sma_slow': slow,
+        'rsi_period': rsi,
+        'atr_sl_mult': sl_mult,
+        'atr_tp_mult': tp_mult,
+        'train_return': train_record['total_return'],
+        'train_trades': train_record['total_trades'],
+    })
+
+    test_task = dict(signal_task, bounds=task['test_bounds'],
+                     sl_mults=np.array([sl_mult]), tp_mults=np.array([tp_mult]), min_bars=1)
+    stats = run_signal_set(test_task, matrix)
+    if stats is not None:
+        result['stats'] = stats[0]
+        result.update(summarize_stats(stats[0], initial_balance) or {'total_trades': 0})
+    return result
+
+
+class WalkForwardOptimizer:
+    """Rolling train/test optimization of the SMA/RSI/ATR strategy grid."""
+
+    def __init__(self, df: pd.DataFrame, train_days: int = 14, test_days: int = 7,
+                 step_days: Optional[int] = None, objective: str = 'total_return',
+                 min_trades: int = 10, **sweep_kwargs):
+        """
+        Initialize walk-forward optimizer.
+
+        Args:
+            df: OHLC DataFrame with a time column
+            train_days: Trading days per train window
+            test_days: Trading days per test window
+            step_days: Days between fold starts (``test_days`` if None); at least
+                ``test_days`` so that test windows do not overlap
+            objective: Train metric to maximize (total_return, profit_factor or win_rate)
+            min_trades: Minimum train trades for a combination to be eligible
+            **sweep_kwargs: Passed to ``ParameterSweep``
+        """
+        if 'time' not in df.columns:
+            raise ValueError("Walk-forward optimization requires a time column")
+        if objective not in ('total_return', 'profit_factor', 'win_rate'):
+            raise ValueError(f"Unknown objective: {objective}")
+        if step_days is not None and step_days < test_days:
+            # Overlapping test windows would count the same trades in several folds
+            raise ValueError(f"step_days ({step_days}) must be at least test_days ({test_days})")
+
+        self.df = df
+        self.train_days = train_days
+        self.test_days = test_days
+        self.step_days = step_days or test_days
+        self.objective = objective
+        self.min_trades = min_trades
+        self.sweep = ParameterSweep(df, **sweep_kwargs)
+
+        times = pd.to_datetime(df['time'])
+        self._times = times.to_numpy()
+        self._day_starts = np.flatnonzero(np.r_[True, np.diff(times.dt.normalize().to_numpy()) != np.timedelta64(0)])
+
+    def folds(self) -> List[Tuple[int, int, int, int]]:
+        """
+        Bar index bounds of every complete fold.
+
+        Returns:
+            List of (train_start, train_end, test_start, test_end) with exclusive ends
+        """
+        starts = self._day_starts
+        n_days = len(starts)
+        bounds = np.r_[starts, len(self.df)]
+
+        folds = []
+        first = 0
+        while first + self.train_days + self.test_days <= n_days:
+            split = first + self.train_days
+            last = split + self.test_days
+            folds.append((int(bounds[first]), int(bounds[split]), int(bounds[split]), int(bounds[last])))
+            first += self.step_days
+        return folds
+
+    def run(self, sma_fast_range: Sequence[int], sma_slow_range: Sequence[int],
+            rsi_period_range: Sequence[int], atr_sl_range: Sequence[float],
+            atr_tp_range: Sequence[float], workers: Optional[int] = None) -> Tuple[pd.DataFrame, Dict[str, float]]:
+        """
+        Run all folds.
+
+        Args:
+            sma_fast_range: Fast SMA periods
+            sma_slow_range: Slow SMA periods
+            rsi_period_range: RSI periods
+            atr_sl_range: ATR stop-loss multipliers
+            atr_tp_range: ATR take-profit multipliers
+            workers: Worker processes (CPU count if None, 1 runs in-process)
+
+        Returns:
+            Per-fold table (columns as in ``FOLD_COLUMNS``) and aggregate
+            out-of-sample metrics
+        """
+        sweep = self.sweep
+        sweep.precompute(list(sma_fast_range) + list(sma_slow_range), rsi_period_range)
+
+        pairs = list(product(atr_sl_range, atr_tp_range))
+        sl_mults = np.array([p[0] for p in pairs], dtype=float)
+        tp_mults = np.array([p[1] for p in pairs], dtype=float)
+        signal_sets = [
+            (fast, slow, rsi)
+            for fast, slow, rsi in product(sma_fast_range, sma_slow_range, rsi_period_range)
+            if fast < slow
+        ]
+
+        folds = self.folds()
+        tasks = [
+            {
+                'fold': index,
+                'signal_sets': signal_sets,
+                'train_tasks': [
+                    sweep.signal_task(fast, slow, rsi, sl_mults, tp_mults,
+                                      bounds=(train_start, train_end), close_at_end=True)
+                    for fast, slow, rsi in signal_sets
+                ],
+                'test_bounds': (test_start, test_end),
+                'pairs': pairs,
+                'objective': self.objective,
+                'min_trades': self.min_trades,
+                'initial_balance': sweep.initial_balance,
+            }
+            for index, (train_start, train_end, test_start, test_end) in enumerate(folds)
+        ]
+
+        results = map_shared(run_fold, tasks, sweep.matrix, workers)
+
+        rows = []
+        for (train_start, train_end, test_start, test_end), result in zip(folds, results):
+            row = {key: value for key, value in result.items() if key != 'stats'}
+            row.update({
+                'train_start': self._times[train_start],
+                'train_end': self._times[train_end - 1],
+                'test_start': self._times[test_start],
+                'test_end': self._times[test_end - 1],
+            })
+            rows.append(row)
+
+        fold_df = pd.DataFrame(rows, columns=FOLD_COLUMNS)
+        return fold_df, self._aggregate(results)
+
+    def _aggregate(self, results: List[Dict[str, object]]) -> Dict[str, float]:
+        """Combine out-of-sample stats of all folds."""
+        initial = self.sweep.initial_balance
+        stats = np.array([r['stats'] for r in results if 'stats' in r]).reshape(-1, 5)
+        fold_returns = (stats[:, 0] - initial) / initial * 100
+
+        n_trades = int(stats[:, 1].sum())
+        gross_profit = stats[:, 3].sum()
+        gross_loss = stats[:, 4].sum()
+        return {
+            'folds': len(results),
+            'evaluated_folds': len(stats),
+            'oos_total_return': float(fold_returns.sum()),
+            'oos_mean_fold_return': float(fold_returns.mean()) if len(stats) else 0.0,
+            'oos_profitable_folds': float((fold_returns > 0).mean() * 100) if len(stats) else 0.0,
+            'oos_total_trades': n_trades,
+            'oos_win_rate': float(stats[:, 2].sum() / n_trades * 100) if n_trades else 0.0,
+            'oos_profit_factor': float(abs(gross_profit / gross_loss)) if gross_loss != 0 else 0.0,
+        }
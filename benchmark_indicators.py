@@ -0,0 +1,149 @@
+"""Benchmark compiled indicator kernels against the previous pure-Python loops."""
+import glob
+import time
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from trading_system.features.technical_indicators import TechnicalIndicators, warmup_indicators
+
+
+# Reference implementations: the interpreted loops the kernels replaced
+
+def legacy_bollinger_bands(prices, period=20, std_dev=2.0):
+    n = len(prices)
+    middle_band = np.zeros(n)
+    upper_band = np.zeros(n)
+    lower_band = np.zeros(n)
+    for i in range(period - 1, n):
+        window = prices[i - period + 1:i + 1]
+        middle = np.mean(window)
+        std = np.std(window)
+        middle_band[i] = middle
+        upper_band[i] = middle + std_dev * std
+        lower_band[i] = middle - std_dev * std
+    return upper_band, middle_band, lower_band
+
+
+def legacy_adaptive_ma(prices, volatility, base_period=20, min_period=5, max_period=50):
+    n = len(prices)
+    ama = np.zeros(n)
+    vol_norm = volatility / np.max(volatility) if np.max(volatility) > 0 else volatility
+    for i in range(max_period, n):
+        period = int(base_period - (vol_norm[i] * (base_period - min_period)))
+        period = max(min_period, min(period, max_period))
+        ama[i] = np.mean(prices[i - period + 1:i + 1])
+    return ama
+
+
+def legacy_volume_profile(prices, volumes, n_bins=50):
+    bins = np.linspace(np.min(prices), np.max(prices), n_bins + 1)
+    volume_profile = np.zeros(n_bins)
+    for i in range(len(prices)):
+        bin_idx = np.searchsorted(bins, prices[i]) - 1
+        bin_idx = max(0, min(bin_idx, n_bins - 1))
+        volume_profile[bin_idx] += volumes[i]
+    return volume_profile
+
+
+def legacy_momentum(prices, period=10):
+    n = len(prices)
+    momentum = np.zeros(n)
+    for i in range(period, n):
+        momentum[i] = prices[i] - prices[i - period]
+    return momentum
+
+
+def legacy_zscore(prices, window=20):
+    n = len(prices)
+    zscore = np.zeros(n)
+    for i in range(window, n):
+        window_data = prices[i - window + 1:i + 1]
+        mean = np.mean(window_data)
+        std = np.std(window_data)
+        zscore[i] = (prices[i] - mean) / std if std > 0 else 0.0
+    return zscore
+
+
+def _time(fn: Callable, repeat: int) -> Tuple[float, object]:
+    """Return best wall-clock time over `repeat` runs and the last result."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _max_diff(a, b) -> float:
+    a = np.concatenate([np.ravel(x) for x in a]) if isinstance(a, tuple) else np.ravel(a)
+    b = np.concatenate([np.ravel(x) for x in b]) if isinstance(b, tuple) else np.ravel(b)
+    return float(np.max(np.abs(a - b)))
+
+
+def benchmark_file(path: str, repeat: int = 3) -> List[Dict[str, object]]:
+    """Benchmark every kernel on one M1 CSV file."""
+    df = pd.read_csv(path)
+    close = df['close'].to_numpy(dtype=np.float64)
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
+    volume = df['tick_volume'].to_numpy(dtype=np.float64)
+    atr = TechnicalIndicators.atr(high, low, close, 14)
+
+    cases = [
+        ('bollinger_bands',
+         lambda: legacy_bollinger_bands(close),
+         lambda: TechnicalIndicators.bollinger_bands(close)),
+        ('adaptive_ma',
+         lambda: legacy_adaptive_ma(close, atr),
+         lambda: TechnicalIndicators.adaptive_ma(close, atr)),
+        ('volume_profile',
+         lambda: legacy_volume_profile(close, volume),
+         lambda: TechnicalIndicators.volume_profile(close, volume)[0]),
+        ('momentum',
+         lambda: legacy_momentum(close),
+         lambda: TechnicalIndicators.momentum(close)),
+        ('zscore',
+         lambda: legacy_zscore(close),
+         lambda: TechnicalIndicators.zscore(close)),
+    ]
+
+    rows = []
+    for name, legacy, fast in cases:
+        legacy_time, expected = _time(legacy, 1)
+        fast_time, actual = _time(fast, repeat)
+        rows.append({
+            'file': path,
+            'rows': len(df),
+            'indicator': name,
+            'legacy_ms': legacy_time * 1000,
+            'compiled_ms': fast_time * 1000,
+            'speedup': legacy_time / fast_time if fast_time > 0 else float('inf'),
+            'max_abs_diff': _max_diff(expected, actual),
+        })
+    return rows
+
+
+if __name__ == '__main__':
+    import argparse
+
+    p = argparse.ArgumentParser()
+    p.add_argument('--pattern', default='data/*_M1_*.csv')
+    p.add_argument('--repeat', type=int, default=3)
+    args = p.parse_args()
+
+    start = time.perf_counter()
+    warmup_indicators()
+    print(f"Warm-up: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    results = []
+    for path in sorted(glob.glob(args.pattern)):
+        results.extend(benchmark_file(path, args.repeat))
+
+    if not results:
+        print(f"No files match {args.pattern}")
+    else:
+        pd.set_option('display.width', 160)
+        print(pd.DataFrame(results).to_string(index=False, float_format=lambda x: f"{x:.4g}"))
@@ -8,6 +8,7 @@ import pandas as pd
 from dataclasses import dataclass
 from enum import Enum
 
+from trading_system.core.tick_data import TickData
 from trading_system.utils.logger import get_logger
 from trading_system.utils.config_loader import get_config_loader
 
@@ -22,19 +23,6 @@ class OrderType(Enum):
     SELL_STOP = mt5.ORDER_TYPE_SELL_STOP
 
 
-@dataclass
-class TickData:
-    """Tick data structure."""
-    timestamp: float
-    bid: float
-    ask: float
-    last: float
-    volume: int
-    time_msc: int
-    flags: int
-    volume_real: float
-
-
 @dataclass
 class AccountInfo:
     """Account information structure."""
@@ -251,6 +239,36 @@ class MT5Connector:
             for tick in ticks
         ]
         
+    async def get_ticks_array(
+        self,
+        symbol: str,
+        from_time_msc: int,
+        count: int = 10000
+    ) -> Optional[np.ndarray]:
+        """
+        Get raw ticks starting at a millisecond timestamp.
+        
+        Unlike ``get_ticks`` this returns the MT5 structured array as is,
+        without building a TickData object per tick.
+        
+        Args:
+            symbol: Trading symbol
+            from_time_msc: Start time in milliseconds (second resolution)
+            count: Maximum number of ticks to retrieve
+            
+        Returns:
+            Structured tick array or None
+        """
+        if not await self.ensure_connected():
+            return None
+            
+        ticks = mt5.copy_ticks_from(symbol, from_time_msc // 1000, count, mt5.COPY_TICKS_ALL)
+        
+        if ticks is None or len(ticks) == 0:
+            return None
+            
+        return ticks
+        
     async def get_bars(
         self,
         symbol: str,
@@ -0,0 +1,180 @@
+"""Per-symbol asyncio scheduling over one shared, blocking terminal connection, and bar-close detection."""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from trading_system.utils.logger import get_logger
+
+
+@dataclass
+class SymbolJob:
+    """Pipeline of one symbol and its scheduling statistics."""
+    symbol: str
+    job: Callable[[], Optional[float]]
+    interval: float
+    cycles: int = 0
+    errors: int = 0
+    overruns: int = 0
+    last_duration: float = 0.0
+    next_run: float = field(default=0.0, repr=False)
+
+
+class SymbolScheduler:
+    """
+    Run one pipeline per symbol as asyncio tasks sharing one connection.
+
+    The MetaTrader5 API is a single blocking, non-thread-safe session, so
+    every pipeline cycle is executed on one dedicated worker thread. The
+    event loop stays free for timers while that worker is busy, and the
+    worker's FIFO queue gives fair scheduling: each symbol has at most one
+    cycle queued, so a slow or fast-cadence symbol can never starve the
+    others.
+
+    Each symbol runs on its own cadence with fixed-rate deadlines (no drift
+    from cycle duration). Symbols sharing an interval are staggered across
+    it so their cycles do not all fire at once.
+    """
+
+    def __init__(self):
+        """Initialize scheduler."""
+        self.logger = get_logger()
+        self.jobs: Dict[str, SymbolJob] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stop: Optional[asyncio.Event] = None
+
+    def add(self, symbol: str, job: Callable[[], Optional[float]], interval: float) -> None:
+        """
+        Register a symbol pipeline.
+
+        Args:
+            symbol: Symbol name
+            job: Blocking callable running one cycle; it may return a delay
+                in seconds that overrides the interval for the next cycle
+            interval: Seconds between cycle starts
+        """
+        self.jobs[symbol] = SymbolJob(symbol=symbol, job=job, interval=float(interval))
+
+    async def call(self, fn: Callable[..., Any], *args) -> Any:
+        """Run a blocking terminal call on the shared worker."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def _run_symbol(self, job: SymbolJob, offset: float) -> None:
+        """Cycle loop of one symbol."""
+        loop = asyncio.get_running_loop()
+        job.next_run = loop.time() + offset
+
+        while not self._stop.is_set():
+            delay = job.next_run - loop.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=delay)
+                    break
+                except asyncio.TimeoutError:
+                    pass
+
+            started = time.perf_counter()
+            override = None
+            try:
+                override = await self.call(job.job)
+            except Exception as e:
+                job.errors += 1
+                self.logger.error("Symbol cycle failed", symbol=job.symbol, error=str(e))
+            job.cycles += 1
+            job.last_duration = time.perf_counter() - started
+
+            now = loop.time()
+            if override is not None:
+                job.next_run = now + override
+            else:
+                job.next_run += job.interval
+                if job.next_run < now:
+                    # Missed deadlines are skipped, not replayed in a burst
+                    job.overruns += 1
+                    job.next_run = now
+
+    async def run(self) -> None:
+        """Run all pipelines until ``stop`` is called."""
+        self._stop = asyncio.Event()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='mt5')
+
+        by_interval: Dict[float, list] = {}
+        for job in self.jobs.values():
+            by_interval.setdefault(job.interval, []).append(job)
+
+        tasks = []
+        for interval, jobs in by_interval.items():
+            for index, job in enumerate(jobs):
+                offset = interval * index / len(jobs)
+                tasks.append(asyncio.create_task(self._run_symbol(job, offset), name=f"symbol-{job.symbol}"))
+
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stop(self) -> None:
+        """Ask all pipelines to finish after their current cycle."""
+        if self._stop is not None:
+            self._stop.set()
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get per-symbol scheduling statistics.
+
+        Returns:
+            Mapping of symbol to cycles, errors, overruns and last duration
+        """
+        return {
+            symbol: {
+                'interval': job.interval,
+                'cycles': job.cycles,
+                'errors': job.errors,
+                'overruns': job.overruns,
+                'last_duration': job.last_duration,
+            }
+            for symbol, job in self.jobs.items()
+        }
+
+
+class BarClock:
+    """
+    Detect bar closes of one timeframe.
+
+    A new bar is reported when a timestamp (a tick time, or the wall clock
+    when no tick is available) falls into a later bar than the one marked
+    at the last full computation. Bar boundaries are multiples of the
+    period since the epoch, which matches MT5 bar times for any server
+    offset of whole minutes.
+    """
+
+    def __init__(self, period_seconds: float = 60):
+        """
+        Initialize bar clock.
+
+        Args:
+            period_seconds: Bar length in seconds
+        """
+        self.period = period_seconds
+        self.current_bar: Optional[float] = None
+
+    def bar_start(self, timestamp: float) -> float:
+        """Start time of the bar containing ``timestamp``."""
+        return timestamp - timestamp % self.period
+
+    def is_new_bar(self, timestamp: float) -> bool:
+        """Check whether ``timestamp`` lies past the marked bar."""
+        return self.current_bar is None or self.bar_start(timestamp) > self.current_bar
+
+    def mark(self, timestamp: float) -> None:
+        """Record the bar containing ``timestamp`` as computed."""
+        self.current_bar = self.bar_start(timestamp)
+
+    def seconds_to_close(self, now: Optional[float] = None) -> float:
+        """Seconds until the bar in progress closes (wall clock if ``now`` is None)."""
+        now = time.time() if now is None else now
+        return self.period - now % self.period
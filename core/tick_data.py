@@ -0,0 +1,15 @@
+"""Tick data structure shared by the connector, processor and journal (no MetaTrader5 dependency)."""
+from dataclasses import dataclass
+
+
+@dataclass
+class TickData:
+    """Tick data structure."""
+    timestamp: float
+    bid: float
+    ask: float
+    last: float
+    volume: int
+    time_msc: int
+    flags: int
+    volume_real: float
@@ -0,0 +1,298 @@
+"""Append-only, memory-mapped tick journal with one file per symbol and day."""
+import numpy as np
+from datetime import datetime, timezone, date
+from pathlib import Path
+from typing import Optional, List, Union
+
+from trading_system.core.tick_data import TickData
+
+
+# On-disk tick record. Field names follow the MT5 tick structure so that
+# arrays returned by copy_ticks_from can be converted field by field.
+JOURNAL_DTYPE = np.dtype([
+    ('time_msc', '<i8'),
+    ('bid', '<f8'),
+    ('ask', '<f8'),
+    ('last', '<f8'),
+    ('volume_real', '<f8'),
+    ('volume', '<i8'),
+    ('flags', '<i8'),
+])
+
+# Fixed 64-byte file header: magic, format version, record size, committed count
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('version', '<u4'),
+    ('record_size', '<u4'),
+    ('count', '<i8'),
+    ('reserved', 'V40'),
+])
+
+JOURNAL_MAGIC = b'AVTICKJ1'
+JOURNAL_VERSION = 1
+JOURNAL_SUFFIX = '.ticks'
+MS_PER_DAY = 86_400_000
+
+
+def day_key(time_msc: int) -> str:
+    """
+    Get the UTC day key used as journal file name.
+    
+    Args:
+        time_msc: Tick time in milliseconds since epoch
+        
+    Returns:
+        Day key formatted as YYYYMMDD
+    """
+    return datetime.fromtimestamp(time_msc / 1000.0, tz=timezone.utc).strftime('%Y%m%d')
+
+
+def ticks_to_records(ticks: np.ndarray) -> np.ndarray:
+    """
+    Convert an MT5 tick array to journal records.
+    
+    Args:
+        ticks: Structured array as returned by ``mt5.copy_ticks_from``
+        
+    Returns:
+        Array with ``JOURNAL_DTYPE`` records
+    """
+    records = np.empty(len(ticks), dtype=JOURNAL_DTYPE)
+    for name in JOURNAL_DTYPE.names:
+        records[name] = ticks[name]
+    return records
+
+
+class TickJournalFile:
+    """Single fixed-record journal file backed by ``numpy.memmap``."""
+    
+    def __init__(self, path: Path, readonly: bool = True, grow_records: int = 65536):
+        """
+        Open (or create) a journal file.
+        
+        Args:
+            path: Journal file path
+            readonly: Open without write access
+            grow_records: Number of records to preallocate when the file grows
+        """
+        self.path = Path(path)
+        self.readonly = readonly
+        self.grow_records = grow_records
+        
+        if not self.path.exists():
+            if readonly:
+                raise FileNotFoundError(f"Tick journal not found: {self.path}")
+            self._create()
+            
+        self._map()
+        
+    def _create(self) -> None:
+        """Create an empty journal file with a preallocated record area."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header['magic'] = JOURNAL_MAGIC
+        header['version'] = JOURNAL_VERSION
+        header['record_size'] = JOURNAL_DTYPE.itemsize
+        with open(self.path, 'wb') as f:
+            f.write(header.tobytes())
+            f.truncate(HEADER_DTYPE.itemsize + self.grow_records * JOURNAL_DTYPE.itemsize)
+            
+    def _map(self) -> None:
+        """Map header and record area into memory."""
+        mode = 'r' if self.readonly else 'r+'
+        self._header = np.memmap(self.path, dtype=HEADER_DTYPE, mode=mode, shape=(1,))
+        
+        if self._header['magic'][0] != JOURNAL_MAGIC:
+            raise ValueError(f"Not a tick journal: {self.path}")
+        if self._header['record_size'][0] != JOURNAL_DTYPE.itemsize:
+            raise ValueError(f"Unsupported tick journal record size: {self.path}")
+            
+        capacity = (self.path.stat().st_size - HEADER_DTYPE.itemsize) // JOURNAL_DTYPE.itemsize
+        self._records = np.memmap(
+            self.path,
+            dtype=JOURNAL_DTYPE,
+            mode=mode,
+            offset=HEADER_DTYPE.itemsize,
+            shape=(capacity,),
+        )
+        
+    def _grow(self, required: int) -> None:
+        """Extend the file so that it can hold at least ``required`` records."""
+        capacity = len(self._records)
+        new_capacity = capacity + max(self.grow_records, required - capacity)
+        self.flush()
+        del self._records
+        with open(self.path, 'r+b') as f:
+            f.truncate(HEADER_DTYPE.itemsize + new_capacity * JOURNAL_DTYPE.itemsize)
+        self._map()
+        
+    @property
+    def count(self) -> int:
+        """Number of committed records."""
+        return int(self._header['count'][0])
+        
+    @property
+    def records(self) -> np.ndarray:
+        """Zero-copy view of all committed records."""
+        return self._records[:self.count]
+        
+    def append(self, records: np.ndarray) -> None:
+        """
+        Append records to the journal.
+        
+        Records are written before the committed count is advanced, so a
+        crash never exposes a partially written record.
+        
+        Args:
+            records: Array with ``JOURNAL_DTYPE`` records
+        """
+        if self.readonly:
+            raise PermissionError(f"Tick journal opened read-only: {self.path}")
+            
+        n = len(records)
+        if n == 0:
+            return
+            
+        count = self.count
+        if count + n > len(self._records):
+            self._grow(count + n)
+            
+        self._records[count:count + n] = records
+        self._header['count'] = count + n
+        
+    def flush(self) -> None:
+        """Flush mapped pages to disk."""
+        if not self.readonly:
+            self._records.flush()
+            self._header.flush()
+            
+    def close(self) -> None:
+        """Flush and release the memory maps."""
+        self.flush()
+        self._records = None
+        self._header = None
+
+
+class TickJournal:
+    """Per-symbol tick journal partitioned into one file per UTC day."""
+    
+    def __init__(self, root: Union[str, Path], symbol: str, grow_records: int = 65536):
+        """
+        Initialize tick journal.
+        
+        Args:
+            root: Journal root directory
+            symbol: Trading symbol
+            grow_records: Number of records to preallocate when a file grows
+        """
+        self.root = Path(root)
+        self.symbol = symbol
+        self.grow_records = grow_records
+        self.directory = self.root / symbol
+        
+        self._writer: Optional[TickJournalFile] = None
+        self._writer_day: Optional[str] = None
+        
+    def path_for_day(self, day: Union[str, date]) -> Path:
+        """Get the journal file path for a day (date or YYYYMMDD key)."""
+        if isinstance(day, date):
+            day = day.strftime('%Y%m%d')
+        return self.directory / f"{day}{JOURNAL_SUFFIX}"
+        
+    def days(self) -> List[str]:
+        """List journaled days in ascending order."""
+        if not self.directory.exists():
+            return []
+        return sorted(p.stem for p in self.directory.glob(f"*{JOURNAL_SUFFIX}"))
+        
+    def _get_writer(self, day: str) -> TickJournalFile:
+        """Get the writer for a day, rolling over from the previous day."""
+        if self._writer_day != day:
+            if self._writer is not None:
+                self._writer.close()
+            self._writer = TickJournalFile(
+                self.path_for_day(day), readonly=False, grow_records=self.grow_records
+            )
+            self._writer_day = day
+        return self._writer
+        
+    def append(self, records: np.ndarray) -> None:
+        """
+        Append records, splitting them across day files as needed.
+        
+        Args:
+            records: Array with ``JOURNAL_DTYPE`` records sorted by time
+        """
+        if len(records) == 0:
+            return
+            
+        day_numbers = records['time_msc'] // MS_PER_DAY
+        boundaries = np.flatnonzero(np.diff(day_numbers)) + 1
+        for chunk in np.split(records, boundaries):
+            self._get_writer(day_key(int(chunk['time_msc'][0]))).append(chunk)
+            
+    def append_tick(self, tick: TickData) -> None:
+        """
+        Append a single tick.
+        
+        Args:
+            tick: Tick to journal
+        """
+        record = np.zeros(1, dtype=JOURNAL_DTYPE)
+        record['time_msc'] = tick.time_msc
+        record['bid'] = tick.bid
+        record['ask'] = tick.ask
+        record['last'] = tick.last
+        record['volume_real'] = tick.volume_real
+        record['volume'] = tick.volume
+        record['flags'] = tick.flags
+        self._get_writer(day_key(tick.time_msc)).append(record)
+        
+    def read_day(self, day: Union[str, date]) -> np.ndarray:
+        """
+        Open one day of ticks read-only without copying.
+        
+        Args:
+            day: Date or YYYYMMDD key
+            
+        Returns:
+            Memory-mapped view of the day's records
+        """
+        return TickJournalFile(self.path_for_day(day), readonly=True).records
+        
+    def tail(self, n: int) -> np.ndarray:
+        """
+        Get the newest n journaled ticks.
+        
+        Args:
+            n: Number of ticks
+            
+        Returns:
+            Array with up to n records in time order
+        """
+        chunks = []
+        remaining = n
+        for day in reversed(self.days()):
+            if remaining <= 0:
+                break
+            records = self.read_day(day)
+            if len(records) == 0:
+                continue
+            chunks.append(records[-remaining:])
+            remaining -= len(chunks[-1])
+            
+        if not chunks:
+            return np.empty(0, dtype=JOURNAL_DTYPE)
+        return np.concatenate(chunks[::-1])
+        
+    def flush(self) -> None:
+        """Flush the active day file."""
+        if self._writer is not None:
+            self._writer.flush()
+            
+    def close(self) -> None:
+        """Close the active day file."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self._writer_day = None
@@ -1,46 +1,137 @@
 """Real-time tick data processing with buffers."""
 import asyncio
 import numpy as np
-from collections import deque
-from typing import Deque, Optional, List, Dict, Any
-from dataclasses import dataclass
+from typing import Optional, List, Dict, Any, Tuple
 import time
+from pathlib import Path
 
-from trading_system.core.mt5_connector import get_mt5_connector, TickData
+from trading_system.core.tick_data import TickData
+from trading_system.core.tick_journal import TickJournal, ticks_to_records
 from trading_system.utils.logger import get_logger
 
 
-@dataclass
+# Record layout of the tick ring buffer. Spread and mid price are derived
+# once at insert time so that readers never recompute them.
+TICK_DTYPE = np.dtype([
+    ('timestamp', np.float64),
+    ('bid', np.float64),
+    ('ask', np.float64),
+    ('spread', np.float64),
+    ('mid_price', np.float64),
+    ('volume', np.int64),
+])
+
+
 class TickBuffer:
-    """Tick buffer with statistical calculations."""
-    timestamps: Deque[float]
-    bids: Deque[float]
-    asks: Deque[float]
-    spreads: Deque[float]
-    mid_prices: Deque[float]
-    volumes: Deque[int]
-    max_size: int
+    """
+    Tick buffer with statistical calculations.
+    
+    Ticks are stored in one preallocated structured NumPy array of twice the
+    buffer capacity. New records are written at the tail index; when the tail
+    reaches the end of the storage, the live window is moved back to the front
+    in a single copy (amortized O(1) per tick). The live window
+    ``[head, tail)`` is therefore always contiguous, and every read is a
+    zero-copy view.
+    
+    Arrays returned by the read methods are views into the buffer. Copy them
+    if they must outlive subsequent inserts.
+    """
     
     def __init__(self, max_size: int = 10000):
         """Initialize tick buffer."""
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+            
         self.max_size = max_size
-        self.timestamps = deque(maxlen=max_size)
-        self.bids = deque(maxlen=max_size)
-        self.asks = deque(maxlen=max_size)
-        self.spreads = deque(maxlen=max_size)
-        self.mid_prices = deque(maxlen=max_size)
-        self.volumes = deque(maxlen=max_size)
+        self._data = np.zeros(2 * max_size, dtype=TICK_DTYPE)
+        self._head = 0
+        self._tail = 0
+        
+    def _reserve(self, count: int) -> None:
+        """Make room for ``count`` new records at the tail."""
+        capacity = len(self._data)
+        if self._tail + count <= capacity:
+            return
+            
+        # Keep only the records that stay inside the window after the insert
+        keep = min(self.size, max(self.max_size - count, 0))
+        if keep:
+            self._data[:keep] = self._data[self._tail - keep:self._tail]
+        self._head = 0
+        self._tail = keep
+        
+    def _trim(self) -> None:
+        """Advance the head so that the window never exceeds ``max_size``."""
+        if self._tail - self._head > self.max_size:
+            self._head = self._tail - self.max_size
         
     def add_tick(self, tick: TickData) -> None:
         """Add tick to buffer."""
-        self.timestamps.append(tick.timestamp)
-        self.bids.append(tick.bid)
-        self.asks.append(tick.ask)
-        spread = tick.ask - tick.bid
-        self.spreads.append(spread)
-        mid_price = (tick.bid + tick.ask) / 2
-        self.mid_prices.append(mid_price)
-        self.volumes.append(tick.volume)
+        self._reserve(1)
+        record = self._data[self._tail]
+        record['timestamp'] = tick.timestamp
+        record['bid'] = tick.bid
+        record['ask'] = tick.ask
+        record['spread'] = tick.ask - tick.bid
+        record['mid_price'] = (tick.bid + tick.ask) / 2
+        record['volume'] = tick.volume
+        self._tail += 1
+        self._trim()
+        
+    def add_ticks(
+        self,
+        timestamps: np.ndarray,
+        bids: np.ndarray,
+        asks: np.ndarray,
+        volumes: np.ndarray,
+    ) -> None:
+        """
+        Add a batch of ticks to the buffer.
+        
+        Spreads and mid prices are computed vectorized for the whole batch.
+        
+        Args:
+            timestamps: Tick timestamps in seconds
+            bids: Bid prices
+            asks: Ask prices
+            volumes: Tick volumes
+        """
+        count = len(timestamps)
+        if count == 0:
+            return
+            
+        # Only the newest max_size ticks can survive the insert
+        if count > self.max_size:
+            timestamps = timestamps[-self.max_size:]
+            bids = bids[-self.max_size:]
+            asks = asks[-self.max_size:]
+            volumes = volumes[-self.max_size:]
+            count = self.max_size
+            
+        self._reserve(count)
+        block = self._data[self._tail:self._tail + count]
+        block['timestamp'] = timestamps
+        block['bid'] = bids
+        block['ask'] = asks
+        block['spread'] = block['ask'] - block['bid']
+        block['mid_price'] = (block['bid'] + block['ask']) / 2
+        block['volume'] = volumes
+        self._tail += count
+        self._trim()
+        
+    def get_records(self, n: Optional[int] = None) -> np.ndarray:
+        """
+        Get recent n ticks as a structured array view.
+        
+        Args:
+            n: Number of recent ticks (all buffered ticks if None)
+            
+        Returns:
+            Structured array with ``TICK_DTYPE`` records
+        """
+        size = self.size
+        n = size if n is None else max(0, min(n, size))
+        return self._data[self._tail - n:self._tail]
         
     def get_recent_ticks(self, n: int) -> Dict[str, np.ndarray]:
         """
@@ -52,20 +143,50 @@ class TickBuffer:
         Returns:
             Dictionary with tick data arrays
         """
-        n = min(n, len(self.timestamps))
+        records = self.get_records(n)
         return {
-            'timestamps': np.array(list(self.timestamps)[-n:]),
-            'bids': np.array(list(self.bids)[-n:]),
-            'asks': np.array(list(self.asks)[-n:]),
-            'spreads': np.array(list(self.spreads)[-n:]),
-            'mid_prices': np.array(list(self.mid_prices)[-n:]),
-            'volumes': np.array(list(self.volumes)[-n:]),
+            'timestamps': records['timestamp'],
+            'bids': records['bid'],
+            'asks': records['ask'],
+            'spreads': records['spread'],
+            'mid_prices': records['mid_price'],
+            'volumes': records['volume'],
         }
         
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Timestamps of all buffered ticks."""
+        return self.get_records()['timestamp']
+        
+    @property
+    def bids(self) -> np.ndarray:
+        """Bid prices of all buffered ticks."""
+        return self.get_records()['bid']
+        
+    @property
+    def asks(self) -> np.ndarray:
+        """Ask prices of all buffered ticks."""
+        return self.get_records()['ask']
+        
+    @property
+    def spreads(self) -> np.ndarray:
+        """Spreads of all buffered ticks."""
+        return self.get_records()['spread']
+        
+    @property
+    def mid_prices(self) -> np.ndarray:
+        """Mid prices of all buffered ticks."""
+        return self.get_records()['mid_price']
+        
+    @property
+    def volumes(self) -> np.ndarray:
+        """Volumes of all buffered ticks."""
+        return self.get_records()['volume']
+        
     @property
     def size(self) -> int:
         """Get current buffer size."""
-        return len(self.timestamps)
+        return self._tail - self._head
         
     @property
     def is_empty(self) -> bool:
@@ -76,13 +197,14 @@ class TickBuffer:
         """Get the latest tick."""
         if self.is_empty:
             return None
+        record = self._data[self._tail - 1]
         return {
-            'timestamp': self.timestamps[-1],
-            'bid': self.bids[-1],
-            'ask': self.asks[-1],
-            'spread': self.spreads[-1],
-            'mid_price': self.mid_prices[-1],
-            'volume': self.volumes[-1],
+            'timestamp': float(record['timestamp']),
+            'bid': float(record['bid']),
+            'ask': float(record['ask']),
+            'spread': float(record['spread']),
+            'mid_price': float(record['mid_price']),
+            'volume': int(record['volume']),
         }
         
     def get_spread_stats(self) -> Dict[str, float]:
@@ -90,7 +212,7 @@ class TickBuffer:
         if self.is_empty:
             return {'mean': 0.0, 'std': 0.0, 'min': 0.0, 'max': 0.0}
             
-        spreads = np.array(list(self.spreads))
+        spreads = self.spreads
         return {
             'mean': float(np.mean(spreads)),
             'std': float(np.std(spreads)),
@@ -102,14 +224,23 @@ class TickBuffer:
 class TickProcessor:
     """Real-time tick data processor with memory-mapped buffers."""
     
-    def __init__(self, symbol: str, buffer_size: int = 10000):
+    def __init__(
+        self,
+        symbol: str,
+        buffer_size: int = 10000,
+        journal_dir: Optional[Path] = None,
+    ):
         """
         Initialize tick processor.
         
         Args:
             symbol: Trading symbol
             buffer_size: Maximum buffer size
+            journal_dir: Root directory of the tick journal (disabled if None)
         """
+        # Imported here so TickBuffer and the journal work without MetaTrader5
+        from trading_system.core.mt5_connector import get_mt5_connector
+
         self.symbol = symbol
         self.buffer_size = buffer_size
         self.connector = get_mt5_connector()
@@ -123,24 +254,57 @@ class TickProcessor:
         self._update_task: Optional[asyncio.Task] = None
         self._last_tick_time = 0.0
         
+        # Batch ingestion cursor: newest time_msc seen and how many ticks
+        # sharing that exact time_msc were already ingested
+        self._last_time_msc = 0
+        self._last_msc_count = 0
+        
         # Callbacks for tick events
         self._tick_callbacks: List[callable] = []
+        self._batch_callbacks: List[callable] = []
+        
+        # Optional persistent tick journal
+        self.journal: Optional[TickJournal] = None
+        if journal_dir is not None:
+            self.journal = TickJournal(journal_dir, symbol)
+            self._warm_start()
+            
+    def _warm_start(self) -> None:
+        """Fill the buffer from the newest journaled ticks."""
+        records = self.journal.tail(self.buffer_size)
+        if len(records) == 0:
+            return
+            
+        timestamps = records['time_msc'] / 1000.0
+        self.buffer.add_ticks(timestamps, records['bid'], records['ask'], records['volume'])
+        self._last_tick_time = float(records['time_msc'][-1] // 1000)
+        self._advance_cursor(records['time_msc'])
+        
+        self.logger.info(
+            "Tick buffer warm-started from journal",
+            symbol=self.symbol,
+            ticks=len(records)
+        )
         
-    async def start(self, update_interval_ms: int = 100) -> None:
+    async def start(self, update_interval_ms: int = 100, batch_ingest: bool = False) -> None:
         """
         Start tick processing.
         
         Args:
             update_interval_ms: Update interval in milliseconds
+            batch_ingest: Pull every tick since the last one with copy_ticks_from
+                instead of polling only the latest tick
         """
         if self._running:
             return
             
         self._running = True
-        self._update_task = asyncio.create_task(
-            self._update_loop(update_interval_ms / 1000.0)
+        loop = self._batch_update_loop if batch_ingest else self._update_loop
+        self._update_task = asyncio.create_task(loop(update_interval_ms / 1000.0))
+        self.logger.info(
+            f"Tick processor started for {self.symbol}",
+            batch_ingest=batch_ingest
         )
-        self.logger.info(f"Tick processor started for {self.symbol}")
         
     async def stop(self) -> None:
         """Stop tick processing."""
@@ -155,6 +319,9 @@ class TickProcessor:
             except asyncio.CancelledError:
                 pass
                 
+        if self.journal is not None:
+            self.journal.close()
+            
         self.logger.info(f"Tick processor stopped for {self.symbol}")
         
     async def _update_loop(self, interval: float) -> None:
@@ -169,20 +336,12 @@ class TickProcessor:
                     
                     # Add to buffer
                     self.buffer.add_tick(tick)
+                    if self.journal is not None:
+                        self.journal.append_tick(tick)
                     
                     # Notify callbacks
-                    for callback in self._tick_callbacks:
-                        try:
-                            if asyncio.iscoroutinefunction(callback):
-                                await callback(tick)
-                            else:
-                                callback(tick)
-                        except Exception as e:
-                            self.logger.error(
-                                "Error in tick callback",
-                                error=str(e)
-                            )
-                            
+                    await self._notify(self._tick_callbacks, tick)
+                    
                 await asyncio.sleep(interval)
                 
             except asyncio.CancelledError:
@@ -195,6 +354,123 @@ class TickProcessor:
                 )
                 await asyncio.sleep(interval)
                 
+    async def _batch_update_loop(self, interval: float, max_batch: int = 10000) -> None:
+        """Update loop that ingests all ticks since the last one in one call."""
+        if self._last_time_msc == 0:
+            # Start from the current tick when there is no journal to resume from
+            tick = await self.connector.get_tick(self.symbol)
+            if tick:
+                self._last_time_msc = tick.time_msc
+                
+        while self._running:
+            try:
+                ticks, full = await self._fetch_new(max_batch)
+                new_ticks = len(ticks)
+                
+                if new_ticks:
+                    self._ingest_batch(ticks)
+                    await self._notify(self._batch_callbacks, ticks)
+                    
+                    # Per-tick callbacks see the newest tick, as in polling mode
+                    if self._tick_callbacks:
+                        await self._notify(self._tick_callbacks, self._to_tick_data(ticks[-1]))
+                        
+                # A full batch with new ticks means we are still catching up
+                if not full or not new_ticks:
+                    await asyncio.sleep(interval)
+                    
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self.logger.error(
+                    "Error in batch tick update loop",
+                    symbol=self.symbol,
+                    error=str(e)
+                )
+                await asyncio.sleep(interval)
+                
+    async def _fetch_new(self, max_batch: int) -> Tuple[np.ndarray, bool]:
+        """
+        Fetch the ticks after the ingestion cursor.
+        
+        The terminal pages by whole seconds, so a fetch starts with ticks of
+        the cursor's second that were already ingested. When a full batch
+        holds nothing new, the request grows until it reaches past them.
+        
+        Args:
+            max_batch: Ticks requested per fetch
+            
+        Returns:
+            New ticks (possibly empty) and whether the fetch was full
+        """
+        count = max_batch
+        while True:
+            ticks = await self.connector.get_ticks_array(self.symbol, self._last_time_msc, count)
+            if ticks is None:
+                return np.empty(0), False
+                
+            fetched = len(ticks)
+            ticks = self._drop_seen(ticks)
+            if len(ticks) or fetched < count:
+                return ticks, fetched == count
+            count *= 2
+            
+    def _drop_seen(self, ticks: np.ndarray) -> np.ndarray:
+        """Drop ticks that were ingested by a previous batch."""
+        time_msc = ticks['time_msc']
+        start = int(np.searchsorted(time_msc, self._last_time_msc, side='left'))
+        seen_end = int(np.searchsorted(time_msc, self._last_time_msc, side='right'))
+        skip = min(seen_end - start, self._last_msc_count)
+        return ticks[start + skip:]
+        
+    def _advance_cursor(self, time_msc: np.ndarray) -> None:
+        """Move the ingestion cursor past a sorted batch of tick times."""
+        newest = int(time_msc[-1])
+        count = len(time_msc) - int(np.searchsorted(time_msc, newest, side='left'))
+        if newest == self._last_time_msc:
+            self._last_msc_count += count
+        else:
+            self._last_time_msc = newest
+            self._last_msc_count = count
+            
+    def _ingest_batch(self, ticks: np.ndarray) -> None:
+        """Push a raw MT5 tick array into buffer and journal."""
+        time_msc = ticks['time_msc']
+        self.buffer.add_ticks(time_msc / 1000.0, ticks['bid'], ticks['ask'], ticks['volume'])
+        if self.journal is not None:
+            self.journal.append(ticks_to_records(ticks))
+            
+        self._advance_cursor(time_msc)
+        self._last_tick_time = float(ticks['time'][-1])
+        
+    @staticmethod
+    def _to_tick_data(tick: np.void) -> TickData:
+        """Convert one raw MT5 tick record to TickData."""
+        return TickData(
+            timestamp=float(tick['time']),
+            bid=float(tick['bid']),
+            ask=float(tick['ask']),
+            last=float(tick['last']),
+            volume=int(tick['volume']),
+            time_msc=int(tick['time_msc']),
+            flags=int(tick['flags']),
+            volume_real=float(tick['volume_real']),
+        )
+        
+    async def _notify(self, callbacks: List[callable], payload: Any) -> None:
+        """Invoke callbacks, isolating their errors from the update loop."""
+        for callback in callbacks:
+            try:
+                if asyncio.iscoroutinefunction(callback):
+                    await callback(payload)
+                else:
+                    callback(payload)
+            except Exception as e:
+                self.logger.error(
+                    "Error in tick callback",
+                    error=str(e)
+                )
+                
     def register_callback(self, callback: callable) -> None:
         """
         Register a callback for tick events.
@@ -214,6 +490,28 @@ class TickProcessor:
         if callback in self._tick_callbacks:
             self._tick_callbacks.remove(callback)
             
+    def register_batch_callback(self, callback: callable) -> None:
+        """
+        Register a callback for batches of ticks.
+        
+        In batch ingestion mode the callback receives the raw MT5 structured
+        tick array of every ingested batch.
+        
+        Args:
+            callback: Function to call on each batch
+        """
+        self._batch_callbacks.append(callback)
+        
+    def unregister_batch_callback(self, callback: callable) -> None:
+        """
+        Unregister a batch callback.
+        
+        Args:
+            callback: Function to remove
+        """
+        if callback in self._batch_callbacks:
+            self._batch_callbacks.remove(callback)
+            
     def get_latest_tick(self) -> Optional[Dict[str, Any]]:
         """Get the latest tick from buffer."""
         return self.buffer.get_latest_tick()
@@ -247,7 +545,7 @@ class TickProcessor:
         if self.buffer.is_empty:
             return 0.0
             
-        timestamps = np.array(list(self.buffer.timestamps))
+        timestamps = self.buffer.timestamps
         current_time = time.time()
         cutoff_time = current_time - window_seconds
         
@@ -268,17 +566,22 @@ class TickProcessor:
 _tick_processors: Dict[str, TickProcessor] = {}
 
 
-def get_tick_processor(symbol: str, buffer_size: int = 10000) -> TickProcessor:
+def get_tick_processor(
+    symbol: str,
+    buffer_size: int = 10000,
+    journal_dir: Optional[Path] = None,
+) -> TickProcessor:
     """
     Get or create a tick processor for a symbol.
     
     Args:
         symbol: Trading symbol
         buffer_size: Buffer size
+        journal_dir: Root directory of the tick journal (disabled if None)
         
     Returns:
         TickProcessor instance
     """
     if symbol not in _tick_processors:
-        _tick_processors[symbol] = TickProcessor(symbol, buffer_size)
+        _tick_processors[symbol] = TickProcessor(symbol, buffer_size, journal_dir)
     return _tick_processors[symbol]
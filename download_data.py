@@ -1,33 +1,207 @@
 import MetaTrader5 as mt5
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+import logging
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Sequence, Tuple
+
+from trading_system.utils.market_store import MarketDataStore, canonical_csv_path, store_root, ARROW_AVAILABLE
+
+logger = logging.getLogger(__name__)
 
 # Default connection settings (can be overridden by caller)
 DEFAULT_ACCOUNT = None
 DEFAULT_PASSWORD = None
 DEFAULT_SERVER = None
 
+TIMEFRAMES = {
+    'M1': mt5.TIMEFRAME_M1,
+    'M5': mt5.TIMEFRAME_M5,
+    'M15': mt5.TIMEFRAME_M15,
+    'H1': mt5.TIMEFRAME_H1,
+    'D1': mt5.TIMEFRAME_D1,
+}
 
-def download_symbol(symbol: str = 'GOLD.ls', mt5_path: Optional[str] = None, account: Optional[int] = None,
-                    password: Optional[str] = None, server: Optional[str] = None, timeframe: str = 'M1',
-                    output_dir: str = 'data', strategies: Optional[list] = None) -> str:
-    """Download historical bars from MT5 for `symbol` and save to CSV in `output_dir`.
+# Full-history strategies, tried in order until one returns bars
+DEFAULT_STRATEGIES = [
+    {"days": 90, "method": "range"},
+    {"days": 60, "method": "range"},
+    {"days": 30, "method": "range"},
+    {"count": 100000, "method": "count"},
+    {"count": 50000, "method": "count"},
+]
+
+
+def _fetch_full(symbol: str, tf: int, strategies: list):
+    """Pull a full history window using the first strategy that returns bars."""
+    rates = None
+    for strategy in strategies:
+        if strategy.get("method") == "range":
+            days = strategy.get("days", 30)
+            end_date = datetime.now()
+            start_date = end_date - timedelta(days=days)
+            rates = mt5.copy_rates_range(symbol, tf, start_date, end_date)
+        elif strategy.get("method") == "count":
+            count = strategy.get("count", 50000)
+            rates = mt5.copy_rates_from_pos(symbol, tf, 0, count)
+
+        if rates is not None and len(rates) > 0:
+            return rates
+
+    raise RuntimeError(f"Failed to download data for {symbol}: {mt5.last_error()}")
+
+
+def _fetch_since(symbol: str, tf: int, since: pd.Timestamp):
+    """
+    Pull bars from the last stored bar onwards.
+
+    The stored last bar is requested again so a bar that was still forming
+    at the previous sync is replaced by its final values.
+    """
+    start = since.tz_localize(timezone.utc).to_pydatetime()
+    # Server time may run ahead of UTC; a day of slack keeps the newest bars
+    end = datetime.now(timezone.utc) + timedelta(days=1)
+    rates = mt5.copy_rates_range(symbol, tf, start, end)
+    if rates is None:
+        raise RuntimeError(f"Failed to download data for {symbol}: {mt5.last_error()}")
+    return rates
+
+
+def _rates_frame(rates) -> pd.DataFrame:
+    """Convert an MT5 rates array to a DataFrame with a parsed time column."""
+    df = pd.DataFrame(rates)
+    if len(df):
+        df['time'] = pd.to_datetime(df['time'], unit='s')
+    return df
+
+
+def _csv_tail_offset(f, time_index: int, data_start: int, before: Optional[pd.Timestamp]) -> Tuple[int, Optional[pd.Timestamp]]:
+    """
+    Scan a bar CSV backwards from its end.
+
+    Args:
+        f: CSV opened in binary mode
+        time_index: Position of the 'time' column
+        data_start: Offset of the first data row
+        before: Stop at the last row older than this (None: at the last row)
+
+    Returns:
+        Offset just past that row (``data_start`` if there is none) and its time
+    """
+    end = f.seek(0, os.SEEK_END)
+    pos, buffer = end, b''
+    while True:
+        read_from = max(data_start, pos - 65536)
+        f.seek(read_from)
+        buffer = f.read(pos - read_from) + buffer
+        pos = read_from
+        lines = buffer.split(b'\n')
+        # The first piece may be a partial line until the scan reaches the data start
+        complete = lines if pos == data_start else lines[1:]
+        offset = pos + len(buffer)
+        for line in reversed(complete):
+            line_end = offset
+            offset -= len(line) + 1
+            row = line.rstrip(b'\r')
+            if not row:
+                continue
+            time = pd.Timestamp(row.split(b',')[time_index].decode())
+            if before is None or time < before:
+                return min(line_end, end), time
+        if pos == data_start:
+            return data_start, None
+        buffer = lines[0]
+
+
+def _csv_last_time(csv_path: Path) -> Optional[pd.Timestamp]:
+    """Time of the last row of a bar CSV, read from its tail."""
+    with open(csv_path, 'rb') as f:
+        header = f.readline().decode().strip().split(',')
+        if 'time' not in header:
+            return None
+        _, time = _csv_tail_offset(f, header.index('time'), f.tell(), None)
+    return time
+
+
+def _append_csv(csv_path: Path, new: pd.DataFrame) -> None:
+    """
+    Append bars to a bar CSV without rewriting it.
 
-    Returns path to saved CSV file.
+    Trailing rows at or after the first new bar (the re-fetched last bar)
+    are cut off first, so they are replaced rather than duplicated.
     """
-    # Map timeframe string to MT5 constant
-    tf_map = {
-        'M1': mt5.TIMEFRAME_M1,
-        'M5': mt5.TIMEFRAME_M5,
-        'M15': mt5.TIMEFRAME_M15,
-        'H1': mt5.TIMEFRAME_H1,
-        'D1': mt5.TIMEFRAME_D1,
-    }
-    tf = tf_map.get(timeframe, mt5.TIMEFRAME_M1)
+    with open(csv_path, 'r+b') as f:
+        header = f.readline().decode().strip().split(',')
+        offset, _ = _csv_tail_offset(f, header.index('time'), f.tell(), new['time'].min())
+        f.truncate(offset)
+        f.seek(offset)
+        if offset > 0:
+            f.seek(offset - 1)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+        f.write(new.reindex(columns=header).to_csv(index=False, header=False, lineterminator='\n').encode())
 
+
+def sync_symbol(symbol: str, timeframe: str = 'M1', output_dir: str = 'data',
+                strategies: Optional[list] = None, incremental: bool = True,
+                store: Optional[MarketDataStore] = None) -> Tuple[str, int]:
+    """Bring the canonical dataset of one symbol/timeframe up to date.
+
+    Must be called inside an initialized MT5 session. With ``incremental``
+    and an existing dataset only bars newer than the last stored one are
+    fetched; otherwise a full window is pulled with ``strategies``. New
+    bars are merged (deduplicated by time) into the columnar store, which
+    loaders read, and appended to the canonical
+    ``{symbol}_{timeframe}_history.csv`` (only its re-fetched last bar is
+    replaced; a full download rewrites it).
+
+    Returns (path to canonical CSV, number of bars fetched).
+    """
+    tf = TIMEFRAMES.get(timeframe, mt5.TIMEFRAME_M1)
+    csv_path = canonical_csv_path(output_dir, symbol, timeframe)
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+
+    since = None
+    if incremental:
+        if store is not None:
+            since = store.last_time(symbol, timeframe)
+        elif csv_path.exists():
+            since = _csv_last_time(csv_path)
+
+    if since is not None:
+        new = _rates_frame(_fetch_since(symbol, tf, since))
+        logger.info(f"{symbol} {timeframe}: {len(new)} bars since {since}")
+        if len(new) == 0:
+            return str(csv_path), 0
+    else:
+        new = _rates_frame(_fetch_full(symbol, tf, strategies or DEFAULT_STRATEGIES))
+        logger.info(f"{symbol} {timeframe}: {len(new)} bars (full download)")
+
+    if store is not None:
+        store.write(symbol, timeframe, new)
+
+    if since is not None and csv_path.exists():
+        _append_csv(csv_path, new)
+    elif since is not None:
+        # Store without its CSV (e.g. deleted): write it once from the store
+        store.read(symbol, timeframe).to_csv(csv_path, index=False)
+    else:
+        new.to_csv(csv_path, index=False)
+    return str(csv_path), len(new)
+
+
+def download_symbols(symbols: Sequence[str], timeframes: Sequence[str] = ('M1',), mt5_path: Optional[str] = None,
+                     account: Optional[int] = None, password: Optional[str] = None, server: Optional[str] = None,
+                     output_dir: str = 'data', strategies: Optional[list] = None,
+                     incremental: bool = True) -> Dict[Tuple[str, str], str]:
+    """Sync several symbols and timeframes in one MT5 session.
+
+    A failure on one symbol/timeframe is logged and does not stop the
+    others; it is simply missing from the result.
+
+    Returns mapping of (symbol, timeframe) to canonical CSV path.
+    """
     # Use provided credentials or defaults
     account = account or DEFAULT_ACCOUNT
     password = password or DEFAULT_PASSWORD
@@ -48,45 +222,20 @@ def download_symbol(symbol: str = 'GOLD.ls', mt5_path: Optional[str] = None, acc
             mt5.shutdown()
             raise RuntimeError(f"MT5 login failed: {mt5.last_error()}")
 
-    # Default strategies
-    if strategies is None:
-        strategies = [
-            {"days": 90, "method": "range"},
-            {"days": 60, "method": "range"},
-            {"days": 30, "method": "range"},
-            {"count": 100000, "method": "count"},
-            {"count": 50000, "method": "count"},
-        ]
+    store = MarketDataStore(store_root(output_dir)) if ARROW_AVAILABLE else None
 
-    rates = None
+    results = {}
     try:
-        for strategy in strategies:
-            if strategy.get("method") == "range":
-                days = strategy.get("days", 30)
-                end_date = datetime.now()
-                start_date = end_date - timedelta(days=days)
-                rates = mt5.copy_rates_range(symbol, tf, start_date, end_date)
-            elif strategy.get("method") == "count":
-                count = strategy.get("count", 50000)
-                rates = mt5.copy_rates_from_pos(symbol, tf, 0, count)
-
-            if rates is not None and len(rates) > 0:
-                break
-
-        if rates is None or len(rates) == 0:
-            raise RuntimeError(f"Failed to download data for {symbol}: {mt5.last_error()}")
-
-        df = pd.DataFrame(rates)
-        df['time'] = pd.to_datetime(df['time'], unit='s')
-
-        Path(output_dir).mkdir(parents=True, exist_ok=True)
-
-        days_actual = (df['time'].max() - df['time'].min()).days
-        # Keep symbol as-is in filename (preserve dots for symbols like GOLD.ls)
-        filename = Path(output_dir) / f"{symbol}_M1_{days_actual}days.csv"
-        df.to_csv(filename, index=False)
-
-        return str(filename)
+        for symbol in symbols:
+            mt5.symbol_select(symbol, True)
+            for timeframe in timeframes:
+                try:
+                    path, _ = sync_symbol(symbol, timeframe, output_dir=output_dir, strategies=strategies,
+                                          incremental=incremental, store=store)
+                    results[(symbol, timeframe)] = path
+                except Exception as e:
+                    logger.error(f"Download of {symbol} {timeframe} failed: {e}")
+        return results
 
     finally:
         try:
@@ -95,19 +244,44 @@ def download_symbol(symbol: str = 'GOLD.ls', mt5_path: Optional[str] = None, acc
             pass
 
 
+def download_symbol(symbol: str = 'GOLD.ls', mt5_path: Optional[str] = None, account: Optional[int] = None,
+                    password: Optional[str] = None, server: Optional[str] = None, timeframe: str = 'M1',
+                    output_dir: str = 'data', strategies: Optional[list] = None, incremental: bool = True) -> str:
+    """Download historical bars from MT5 for `symbol` into its canonical dataset.
+
+    Repeated calls only fetch bars newer than the last stored one (see
+    ``sync_symbol``); pass ``incremental=False`` to pull the full window
+    again. The bars live in the columnar store under `output_dir`/store and
+    in `output_dir`/{symbol}_{timeframe}_history.csv.
+
+    Returns path to the canonical CSV file.
+    """
+    results = download_symbols([symbol], [timeframe], mt5_path=mt5_path, account=account, password=password,
+                               server=server, output_dir=output_dir, strategies=strategies, incremental=incremental)
+    if (symbol, timeframe) not in results:
+        raise RuntimeError(f"Failed to download data for {symbol}")
+    return results[(symbol, timeframe)]
+
+
 if __name__ == '__main__':
     # Simple CLI behavior when run standalone
     import argparse
 
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
     p = argparse.ArgumentParser()
-    p.add_argument('--symbol', default='GOLD.ls')
+    p.add_argument('--symbol', nargs='+', default=['GOLD.ls'])
+    p.add_argument('--timeframe', nargs='+', default=['M1'])
     p.add_argument('--mt5-path', default=None)
     p.add_argument('--output-dir', default='data')
+    p.add_argument('--full', action='store_true', help='Re-download the full window instead of syncing new bars')
     args = p.parse_args()
 
     print('Starting download...')
     try:
-        out = download_symbol(symbol=args.symbol, mt5_path=args.mt5_path, output_dir=args.output_dir)
-        print(f"Downloaded to: {out}")
+        out = download_symbols(args.symbol, args.timeframe, mt5_path=args.mt5_path,
+                               output_dir=args.output_dir, incremental=not args.full)
+        for (symbol, timeframe), path in out.items():
+            print(f"Downloaded {symbol} {timeframe} to: {path}")
     except Exception as e:
         print(f"Download failed: {e}")
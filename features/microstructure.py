@@ -49,11 +49,27 @@ class VPINCalculator:
         self.bucket_size = bucket_size
         self.window_size = window_size
         
-        # Volume buckets
+        # Completed volume buckets as (buy_volume, sell_volume) pairs
         self.buckets: deque = deque(maxlen=window_size)
-        self.current_bucket = {'buy_volume': 0.0, 'sell_volume': 0.0}
+        self.current_buy = 0.0
+        self.current_sell = 0.0
         self.tick_count = 0
         
+        # Running sums over the bucket window
+        self._total_imbalance = 0.0
+        self._total_volume = 0.0
+        
+    def _push_bucket(self, buy_volume: float, sell_volume: float) -> None:
+        """Append a completed bucket and update the running sums."""
+        if len(self.buckets) == self.window_size:
+            old_buy, old_sell = self.buckets[0]
+            self._total_imbalance -= abs(old_buy - old_sell)
+            self._total_volume -= old_buy + old_sell
+            
+        self.buckets.append((buy_volume, sell_volume))
+        self._total_imbalance += abs(buy_volume - sell_volume)
+        self._total_volume += buy_volume + sell_volume
+        
     def add_tick(self, price_change: float, volume: float) -> None:
         """
         Add tick to VPIN calculator.
@@ -64,22 +80,69 @@ class VPINCalculator:
         """
         # Classify as buy or sell based on price change
         if price_change > 0:
-            self.current_bucket['buy_volume'] += volume
+            self.current_buy += volume
         elif price_change < 0:
-            self.current_bucket['sell_volume'] += volume
+            self.current_sell += volume
         else:
             # Split neutral ticks
-            self.current_bucket['buy_volume'] += volume / 2
-            self.current_bucket['sell_volume'] += volume / 2
+            self.current_buy += volume / 2
+            self.current_sell += volume / 2
             
         self.tick_count += 1
         
         # Complete bucket when reaching bucket_size
         if self.tick_count >= self.bucket_size:
-            self.buckets.append(self.current_bucket.copy())
-            self.current_bucket = {'buy_volume': 0.0, 'sell_volume': 0.0}
+            self._push_bucket(self.current_buy, self.current_sell)
+            self.current_buy = 0.0
+            self.current_sell = 0.0
             self.tick_count = 0
             
+    def add_ticks(self, price_changes: np.ndarray, volumes: np.ndarray) -> None:
+        """
+        Add a batch of ticks to VPIN calculator.
+        
+        Args:
+            price_changes: Price changes from previous ticks
+            volumes: Tick volumes
+        """
+        n = len(price_changes)
+        if n == 0:
+            return
+            
+        volumes = np.asarray(volumes, dtype=np.float64)
+        # Neutral ticks are split evenly, as in add_tick
+        buy = np.where(price_changes > 0, volumes, np.where(price_changes < 0, 0.0, volumes / 2))
+        sell = volumes - buy
+        
+        # Top up the open bucket
+        fill = min(self.bucket_size - self.tick_count, n)
+        self.current_buy += float(np.sum(buy[:fill]))
+        self.current_sell += float(np.sum(sell[:fill]))
+        self.tick_count += fill
+        if self.tick_count < self.bucket_size:
+            return
+        self._push_bucket(self.current_buy, self.current_sell)
+        
+        # Complete whole buckets in one reduction
+        full = (n - fill) // self.bucket_size
+        end = fill + full * self.bucket_size
+        if full:
+            bucket_buy = buy[fill:end].reshape(full, self.bucket_size).sum(axis=1)
+            bucket_sell = sell[fill:end].reshape(full, self.bucket_size).sum(axis=1)
+            if full >= self.window_size:
+                self.buckets.clear()
+                self._total_imbalance = 0.0
+                self._total_volume = 0.0
+                bucket_buy = bucket_buy[-self.window_size:]
+                bucket_sell = bucket_sell[-self.window_size:]
+            for buy_volume, sell_volume in zip(bucket_buy.tolist(), bucket_sell.tolist()):
+                self._push_bucket(buy_volume, sell_volume)
+                
+        # Remaining ticks open a new bucket
+        self.current_buy = float(np.sum(buy[end:]))
+        self.current_sell = float(np.sum(sell[end:]))
+        self.tick_count = n - end
+        
     def calculate_vpin(self) -> float:
         """
         Calculate VPIN value.
@@ -90,21 +153,11 @@ class VPINCalculator:
         if len(self.buckets) < 2:
             return 0.0
             
-        total_imbalance = 0.0
-        total_volume = 0.0
-        
-        for bucket in self.buckets:
-            buy_vol = bucket['buy_volume']
-            sell_vol = bucket['sell_volume']
-            imbalance = abs(buy_vol - sell_vol)
-            total_imbalance += imbalance
-            total_volume += buy_vol + sell_vol
-            
-        if total_volume == 0:
+        if self._total_volume <= 0:
             return 0.0
             
-        vpin = total_imbalance / total_volume
-        return min(vpin, 1.0)  # Cap at 1.0
+        vpin = self._total_imbalance / self._total_volume
+        return min(max(vpin, 0.0), 1.0)  # Cap at 1.0
         
     def is_toxic_flow(self, threshold: float = 0.7) -> bool:
         """
@@ -133,12 +186,36 @@ class SpreadRegimeClassifier:
         self.tight_threshold = tight_threshold_pips * 0.01  # Convert to price
         self.wide_threshold = wide_threshold_pips * 0.01
         
-        # Spread history
+        # Spread history with running sums for mean/std
         self.spread_history: deque = deque(maxlen=1000)
+        self._spread_sum = 0.0
+        self._spread_sq_sum = 0.0
+        
+        # Order statistics are cached until the next observation
+        self._stats_cache: Optional[Dict[str, float]] = None
         
     def add_spread(self, spread: float) -> None:
         """Add spread observation."""
+        if len(self.spread_history) == self.spread_history.maxlen:
+            old = self.spread_history[0]
+            self._spread_sum -= old
+            self._spread_sq_sum -= old * old
+            
         self.spread_history.append(spread)
+        self._spread_sum += spread
+        self._spread_sq_sum += spread * spread
+        self._stats_cache = None
+        
+    def add_spreads(self, spreads: np.ndarray) -> None:
+        """Add a batch of spread observations."""
+        if len(spreads) == 0:
+            return
+            
+        self.spread_history.extend(spreads[-self.spread_history.maxlen:].tolist())
+        history = np.fromiter(self.spread_history, dtype=np.float64, count=len(self.spread_history))
+        self._spread_sum = float(np.sum(history))
+        self._spread_sq_sum = float(np.dot(history, history))
+        self._stats_cache = None
         
     def classify_regime(self, current_spread: float) -> str:
         """
@@ -162,13 +239,18 @@ class SpreadRegimeClassifier:
         if not self.spread_history:
             return {'mean': 0.0, 'std': 0.0, 'percentile_95': 0.0}
             
-        spreads = np.array(self.spread_history)
-        return {
-            'mean': float(np.mean(spreads)),
-            'std': float(np.std(spreads)),
-            'median': float(np.median(spreads)),
-            'percentile_95': float(np.percentile(spreads, 95)),
-        }
+        if self._stats_cache is None:
+            n = len(self.spread_history)
+            mean = self._spread_sum / n
+            variance = max(self._spread_sq_sum / n - mean * mean, 0.0)
+            median, percentile_95 = np.percentile(np.array(self.spread_history), [50, 95])
+            self._stats_cache = {
+                'mean': float(mean),
+                'std': float(np.sqrt(variance)),
+                'median': float(median),
+                'percentile_95': float(percentile_95),
+            }
+        return dict(self._stats_cache)
         
     def is_compressed(self, current_spread: float, percentile: float = 25) -> bool:
         """
@@ -202,9 +284,21 @@ class TickDirectionEntropyAnalyzer:
         self.window_size = window_size
         self.price_changes: deque = deque(maxlen=window_size)
         
+        # Entropy is cached until the next observation
+        self._entropy_cache: Optional[float] = None
+        
     def add_price_change(self, price_change: float) -> None:
         """Add price change observation."""
         self.price_changes.append(price_change)
+        self._entropy_cache = None
+        
+    def add_price_changes(self, price_changes: np.ndarray) -> None:
+        """Add a batch of price change observations."""
+        if len(price_changes) == 0:
+            return
+            
+        self.price_changes.extend(price_changes[-self.window_size:].tolist())
+        self._entropy_cache = None
         
     def calculate_entropy(self) -> float:
         """
@@ -216,8 +310,10 @@ class TickDirectionEntropyAnalyzer:
         if len(self.price_changes) < 10:
             return 0.0
             
-        price_changes = np.array(self.price_changes)
-        return calculate_entropy_fast(price_changes)
+        if self._entropy_cache is None:
+            price_changes = np.array(self.price_changes)
+            self._entropy_cache = float(calculate_entropy_fast(price_changes))
+        return self._entropy_cache
         
     def is_high_entropy(self, threshold: float = 0.8) -> bool:
         """
@@ -249,6 +345,10 @@ class OrderBookImbalanceDetector:
         self.bid_volumes: deque = deque(maxlen=window_size)
         self.ask_volumes: deque = deque(maxlen=window_size)
         
+        # Running sums over the window
+        self._total_bid = 0.0
+        self._total_ask = 0.0
+        
     def add_tick(self, bid: float, ask: float, last_price: Optional[float] = None) -> None:
         """
         Add tick data for imbalance calculation.
@@ -262,21 +362,54 @@ class OrderBookImbalanceDetector:
         if last_price:
             if last_price >= ask:
                 # Trade at ask - buying pressure
-                self.ask_volumes.append(1.0)
-                self.bid_volumes.append(0.0)
+                ask_volume, bid_volume = 1.0, 0.0
             elif last_price <= bid:
                 # Trade at bid - selling pressure
-                self.ask_volumes.append(0.0)
-                self.bid_volumes.append(1.0)
+                ask_volume, bid_volume = 0.0, 1.0
             else:
                 # Mid-market trade
-                self.ask_volumes.append(0.5)
-                self.bid_volumes.append(0.5)
+                ask_volume, bid_volume = 0.5, 0.5
         else:
             # No last price, assume balanced
-            self.ask_volumes.append(0.5)
-            self.bid_volumes.append(0.5)
+            ask_volume, bid_volume = 0.5, 0.5
+            
+        if len(self.bid_volumes) == self.window_size:
+            self._total_bid -= self.bid_volumes[0]
+            self._total_ask -= self.ask_volumes[0]
             
+        self.ask_volumes.append(ask_volume)
+        self.bid_volumes.append(bid_volume)
+        self._total_ask += ask_volume
+        self._total_bid += bid_volume
+        
+    def add_ticks(self, bids: np.ndarray, asks: np.ndarray, last_prices: np.ndarray) -> None:
+        """
+        Add a batch of ticks for imbalance calculation.
+        
+        Args:
+            bids: Bid prices
+            asks: Ask prices
+            last_prices: Last trade prices (NaN or 0 where unknown)
+        """
+        if len(bids) == 0:
+            return
+            
+        bids = bids[-self.window_size:]
+        asks = asks[-self.window_size:]
+        last_prices = last_prices[-self.window_size:]
+        
+        known = np.nan_to_num(last_prices) != 0
+        at_ask = known & (last_prices >= asks)
+        at_bid = known & ~at_ask & (last_prices <= bids)
+        ask_volume = np.where(at_ask, 1.0, np.where(at_bid, 0.0, 0.5))
+        bid_volume = np.where(at_bid, 1.0, np.where(at_ask, 0.0, 0.5))
+        
+        self.ask_volumes.extend(ask_volume.tolist())
+        self.bid_volumes.extend(bid_volume.tolist())
+        # The volumes are multiples of 0.5, so these sums are exact
+        self._total_ask = float(sum(self.ask_volumes))
+        self._total_bid = float(sum(self.bid_volumes))
+        
     def calculate_imbalance(self) -> float:
         """
         Calculate order book imbalance.
@@ -287,8 +420,8 @@ class OrderBookImbalanceDetector:
         if not self.bid_volumes or not self.ask_volumes:
             return 0.0
             
-        total_bid = sum(self.bid_volumes)
-        total_ask = sum(self.ask_volumes)
+        total_bid = self._total_bid
+        total_ask = self._total_ask
         total = total_bid + total_ask
         
         if total == 0:
@@ -366,6 +499,53 @@ class MicrostructureAnalyzer:
         
         self.last_price = mid_price
         
+    def update_batch(
+        self,
+        bids: np.ndarray,
+        asks: np.ndarray,
+        volumes: Optional[np.ndarray] = None,
+    ) -> None:
+        """
+        Update all microstructure indicators with a batch of ticks.
+        
+        Produces the same state as calling ``update`` once per tick, but
+        each sub-analyzer consumes the whole batch in vectorized form.
+        
+        Args:
+            bids: Bid prices
+            asks: Ask prices
+            volumes: Tick volumes (1.0 per tick if None)
+        """
+        bids = np.asarray(bids, dtype=np.float64)
+        asks = np.asarray(asks, dtype=np.float64)
+        if len(bids) == 0:
+            return
+        if volumes is None:
+            volumes = np.ones(len(bids))
+        else:
+            volumes = np.asarray(volumes, dtype=np.float64)
+            
+        mid_prices = (bids + asks) / 2
+        spreads = asks - bids
+        
+        # Update spread classifier
+        self.spread_classifier.add_spreads(spreads)
+        
+        # Previous mid price of every tick (NaN for the very first one)
+        first = np.nan if self.last_price is None else self.last_price
+        prev_prices = np.concatenate(([first], mid_prices[:-1]))
+        
+        # Update VPIN and entropy for ticks that have a predecessor
+        offset = 1 if self.last_price is None else 0
+        price_changes = mid_prices[offset:] - prev_prices[offset:]
+        self.vpin.add_ticks(price_changes, volumes[offset:])
+        self.entropy_analyzer.add_price_changes(price_changes)
+        
+        # Update imbalance detector
+        self.imbalance_detector.add_ticks(bids, asks, prev_prices)
+        
+        self.last_price = float(mid_prices[-1])
+        
     def get_analysis(self) -> Dict[str, Any]:
         """
         Get complete microstructure analysis.
@@ -1,11 +1,14 @@
 """Hidden Markov Model regime detection."""
 import numpy as np
+from collections import deque
 from typing import List, Dict, Any, Optional
 from hmmlearn import hmm
 from sklearn.preprocessing import StandardScaler
 import pickle
 from pathlib import Path
 
+from trading_system.features.technical_indicators import TechnicalIndicators
+
 
 class RegimeDetector:
     """HMM-based market regime detector."""
@@ -35,6 +38,15 @@ class RegimeDetector:
         self.scaler = StandardScaler()
         self.is_fitted = False
         
+        # Rolling feature windows span the current bar and the previous
+        # feature_window bars
+        self.feature_window = 20
+        self.reset_feature_state()
+        
+        # Streaming forward-filter state
+        self._emission_cache: Optional[Dict[str, np.ndarray]] = None
+        self.reset_filter()
+        
         # Regime labels
         self.regime_names = {
             0: "trending",
@@ -54,38 +66,30 @@ class RegimeDetector:
             Feature matrix
         """
         features = []
+        window = self.feature_window + 1
         
         # Returns
         if 'close' in data:
-            returns = np.diff(data['close']) / data['close'][:-1]
+            close_all = np.asarray(data['close'], dtype=np.float64)
+            returns = np.diff(close_all) / close_all[:-1]
             features.append(returns)
             
         # Volatility (rolling std of returns)
         if len(features) > 0:
-            window = 20
-            volatility = np.array([
-                np.std(returns[max(0, i-window):i+1])
-                for i in range(len(returns))
-            ])
+            volatility = TechnicalIndicators.rolling_std(returns, window)
             features.append(volatility)
             
         # Volume ratio
         if 'volume' in data and len(data['volume']) > 1:
-            volume = data['volume'][1:]  # Match returns length
-            volume_ma = np.array([
-                np.mean(volume[max(0, i-20):i+1])
-                for i in range(len(volume))
-            ])
+            volume = np.asarray(data['volume'], dtype=np.float64)[1:]  # Match returns length
+            volume_ma = TechnicalIndicators.rolling_mean(volume, window)
             volume_ratio = volume / (volume_ma + 1e-8)
             features.append(volume_ratio)
             
         # Trend strength (difference from MA)
         if 'close' in data:
-            close = data['close'][1:]
-            ma = np.array([
-                np.mean(close[max(0, i-20):i+1])
-                for i in range(len(close))
-            ])
+            close = close_all[1:]
+            ma = TechnicalIndicators.rolling_mean(close, window)
             trend_strength = (close - ma) / (ma + 1e-8)
             features.append(trend_strength)
             
@@ -93,6 +97,73 @@ class RegimeDetector:
         feature_matrix = np.column_stack(features)
         return feature_matrix
         
+    def reset_feature_state(self) -> None:
+        """Reset the incremental feature state."""
+        window = self.feature_window + 1
+        self._last_close: Optional[float] = None
+        self._returns_window: deque = deque(maxlen=window)
+        self._volume_window: deque = deque(maxlen=window)
+        self._close_window: deque = deque(maxlen=window)
+        
+    def update_features(self, close: float, volume: Optional[float] = None) -> Optional[np.ndarray]:
+        """
+        Append one bar to the incremental feature state.
+        
+        Produces the same row that ``prepare_features`` returns for the
+        newest bar, at constant cost per bar.
+        
+        Args:
+            close: Bar close price
+            volume: Bar volume (omit if the model was fitted without volume)
+            
+        Returns:
+            Newest feature row, or None for the very first bar
+        """
+        prev_close = self._last_close
+        self._last_close = close
+        if prev_close is None:
+            return None
+            
+        ret = (close - prev_close) / prev_close
+        self._returns_window.append(ret)
+        self._close_window.append(close)
+        
+        row = [ret, float(np.std(self._returns_window))]
+        
+        if volume is not None:
+            self._volume_window.append(volume)
+            volume_ma = float(np.mean(self._volume_window))
+            row.append(volume / (volume_ma + 1e-8))
+            
+        ma = float(np.mean(self._close_window))
+        row.append((close - ma) / (ma + 1e-8))
+        
+        return np.array(row)
+        
+    def seed_features(self, data: Dict[str, np.ndarray]) -> Optional[np.ndarray]:
+        """
+        Seed the incremental feature state from recent history.
+        
+        Args:
+            data: Dictionary with price and volume data
+            
+        Returns:
+            Feature row of the newest bar
+        """
+        self.reset_feature_state()
+        tail = self.feature_window + 2
+        close = np.asarray(data['close'], dtype=np.float64)[-tail:]
+        volume = data.get('volume')
+        if volume is not None and len(volume) > 1:
+            volume = np.asarray(volume, dtype=np.float64)[-tail:]
+        else:
+            volume = None
+            
+        row = None
+        for i in range(len(close)):
+            row = self.update_features(close[i], None if volume is None else volume[i])
+        return row
+        
     def fit(self, data: Dict[str, np.ndarray]) -> None:
         """
         Fit HMM to historical data.
@@ -108,6 +179,8 @@ class RegimeDetector:
         # Fit HMM
         self.model.fit(features_scaled)
         self.is_fitted = True
+        self._emission_cache = None
+        self.reset_filter()
         
     def predict_regime(self, data: Dict[str, np.ndarray]) -> np.ndarray:
         """
@@ -163,6 +236,111 @@ class RegimeDetector:
         posteriors = self.model.predict_proba(features_scaled)
         return posteriors
         
+    def reset_filter(self) -> None:
+        """Reset the streaming forward-filter state."""
+        self._filter_alpha: Optional[np.ndarray] = None
+        
+    def _get_emission_params(self) -> Dict[str, np.ndarray]:
+        """Get per-state Gaussian parameters prepared for fast log-density evaluation."""
+        if self._emission_cache is None:
+            covars = np.asarray(self.model.covars_)
+            n_features = covars.shape[-1]
+            _, logdet = np.linalg.slogdet(covars)
+            self._emission_cache = {
+                'means': np.asarray(self.model.means_),
+                'precisions': np.linalg.inv(covars),
+                'log_norm': -0.5 * (n_features * np.log(2 * np.pi) + logdet),
+                'transmat': np.asarray(self.model.transmat_),
+                'startprob': np.asarray(self.model.startprob_),
+            }
+        return self._emission_cache
+        
+    def filter_step(self, features_scaled: np.ndarray) -> np.ndarray:
+        """
+        Advance the forward filter by one scaled observation.
+        
+        Costs O(K^2) per call, independent of the history length.
+        
+        Args:
+            features_scaled: Scaled feature row of the newest bar
+            
+        Returns:
+            Filtered regime probabilities P(state_t | observations up to t)
+        """
+        if not self.is_fitted:
+            raise ValueError("Model not fitted. Call fit() first.")
+            
+        params = self._get_emission_params()
+        
+        # Gaussian log-density of the observation under every state
+        diff = features_scaled - params['means']
+        mahalanobis = np.einsum('ki,kij,kj->k', diff, params['precisions'], diff)
+        log_likelihood = params['log_norm'] - 0.5 * mahalanobis
+        likelihood = np.exp(log_likelihood - np.max(log_likelihood))
+        
+        if self._filter_alpha is None:
+            prior = params['startprob']
+        else:
+            prior = self._filter_alpha @ params['transmat']
+            
+        alpha = prior * likelihood
+        total = alpha.sum()
+        if not np.isfinite(total) or total <= 0:
+            alpha = prior.copy()
+            total = alpha.sum()
+            
+        self._filter_alpha = alpha / total
+        return self._filter_alpha
+        
+    def seed_filter(self, data: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Run the forward filter over history and seed the streaming state.
+        
+        Args:
+            data: Dictionary with price and volume data
+            
+        Returns:
+            Filtered regime probabilities of the newest bar
+        """
+        if not self.is_fitted:
+            raise ValueError("Model not fitted. Call fit() first.")
+            
+        features_scaled = self.scaler.transform(self.prepare_features(data))
+        self.reset_filter()
+        for row in features_scaled:
+            self.filter_step(row)
+            
+        self.seed_features(data)
+        return self._filter_alpha
+        
+    def update_regime(self, close: float, volume: Optional[float] = None) -> Optional[str]:
+        """
+        Update the streaming regime estimate with one new bar.
+        
+        Args:
+            close: Bar close price
+            volume: Bar volume (omit if the model was fitted without volume)
+            
+        Returns:
+            Most probable current regime name, or None before the first return
+        """
+        row = self.update_features(close, volume)
+        if row is None:
+            return None
+            
+        self.filter_step(self.scaler.transform(row.reshape(1, -1))[0])
+        return self.get_filtered_regime()
+        
+    def get_filtered_probabilities(self) -> Optional[np.ndarray]:
+        """Get the current filtered regime probabilities (None before any update)."""
+        return self._filter_alpha
+        
+    def get_filtered_regime(self) -> Optional[str]:
+        """Get the most probable regime from the streaming filter."""
+        if self._filter_alpha is None:
+            return None
+        return self.regime_names.get(int(np.argmax(self._filter_alpha)), "unknown")
+        
     def get_transition_matrix(self) -> np.ndarray:
         """Get regime transition probability matrix."""
         if not self.is_fitted:
@@ -214,6 +392,9 @@ class RegimeDetector:
             self.scaler = data['scaler']
             self.is_fitted = data['is_fitted']
             self.regime_names = data['regime_names']
+            
+        self._emission_cache = None
+        self.reset_filter()
 
 
 class AdaptiveParameterAdjuster:
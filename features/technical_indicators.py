@@ -1,7 +1,8 @@
 """Technical indicators optimized for GOLD trading."""
 import numpy as np
 import pandas as pd
-from typing import Tuple, Optional
+from collections import deque
+from typing import Dict, Optional, Tuple
 import numba
 
 
@@ -107,6 +108,240 @@ def calculate_rsi_fast(prices: np.ndarray, period: int) -> np.ndarray:
     return rsi
 
 
+@numba.jit(nopython=True, cache=True)
+def _compensated_add(total: float, compensation: float, x: float) -> Tuple[float, float]:
+    """Add x to a running sum with Neumaier error compensation."""
+    t = total + x
+    if abs(total) >= abs(x):
+        compensation += (total - t) + x
+    else:
+        compensation += (x - t) + total
+    return t, compensation
+
+
+@numba.jit(nopython=True, cache=True)
+def calculate_rolling_mean_fast(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Calculate rolling mean with a running sum - JIT compiled.
+    
+    The first window-1 values use the partial window available so far.
+    
+    Args:
+        values: Input array
+        window: Window length
+        
+    Returns:
+        Rolling mean values
+    """
+    n = len(values)
+    result = np.zeros(n)
+    if n == 0:
+        return result
+        
+    # Sum deviations from the first value with Neumaier compensation so
+    # that rounding errors do not accumulate over long series
+    shift = values[0]
+    total = 0.0
+    compensation = 0.0
+    
+    for i in range(n):
+        total, compensation = _compensated_add(total, compensation, values[i] - shift)
+        if i >= window:
+            total, compensation = _compensated_add(total, compensation, shift - values[i - window])
+        result[i] = shift + (total + compensation) / min(i + 1, window)
+        
+    return result
+
+
+@numba.jit(nopython=True, cache=True)
+def calculate_rolling_std_fast(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Calculate rolling population standard deviation (Welford) - JIT compiled.
+    
+    The first window-1 values use the partial window available so far.
+    
+    Args:
+        values: Input array
+        window: Window length
+        
+    Returns:
+        Rolling standard deviation values
+    """
+    n = len(values)
+    result = np.zeros(n)
+    if n == 0:
+        return result
+        
+    # Work on deviations from the first value to limit cancellation
+    shift = values[0]
+    mean = 0.0
+    m2 = 0.0
+    count = 0
+    
+    for i in range(n):
+        x = values[i] - shift
+        
+        # Remove the value leaving the window
+        if i >= window:
+            old = values[i - window] - shift
+            if count == 1:
+                mean = 0.0
+                m2 = 0.0
+            else:
+                delta = old - mean
+                mean -= delta / (count - 1)
+                m2 -= delta * (old - mean)
+            count -= 1
+            
+        # Add the new value
+        count += 1
+        delta = x - mean
+        mean += delta / count
+        m2 += delta * (x - mean)
+        
+        result[i] = np.sqrt(max(m2, 0.0) / count)
+        
+    return result
+
+
+@numba.jit(nopython=True, cache=True)
+def calculate_bollinger_fast(
+    prices: np.ndarray,
+    period: int,
+    std_dev: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculate Bollinger Bands - JIT compiled.
+    
+    Args:
+        prices: Price array
+        period: Period for moving average
+        std_dev: Number of standard deviations
+        
+    Returns:
+        Tuple of (Upper band, Middle band, Lower band), zero before the first full window
+    """
+    n = len(prices)
+    middle_band = np.zeros(n)
+    upper_band = np.zeros(n)
+    lower_band = np.zeros(n)
+    
+    mean = calculate_rolling_mean_fast(prices, period)
+    std = calculate_rolling_std_fast(prices, period)
+    
+    for i in range(period-1, n):
+        middle_band[i] = mean[i]
+        upper_band[i] = mean[i] + std_dev * std[i]
+        lower_band[i] = mean[i] - std_dev * std[i]
+        
+    return upper_band, middle_band, lower_band
+
+
+@numba.jit(nopython=True, cache=True)
+def calculate_adaptive_ma_fast(
+    prices: np.ndarray,
+    vol_norm: np.ndarray,
+    base_period: int,
+    min_period: int,
+    max_period: int
+) -> np.ndarray:
+    """
+    Calculate volatility-adjusted adaptive moving average - JIT compiled.
+    
+    Args:
+        prices: Price array
+        vol_norm: Volatility normalized to [0, 1]
+        base_period: Base period
+        min_period: Minimum period
+        max_period: Maximum period
+        
+    Returns:
+        Adaptive MA values
+    """
+    n = len(prices)
+    ama = np.zeros(n)
+    
+    for i in range(max_period, n):
+        # High volatility -> shorter period, low volatility -> longer period
+        period = int(base_period - (vol_norm[i] * (base_period - min_period)))
+        period = max(min_period, min(period, max_period))
+        
+        total = 0.0
+        for j in range(i-period+1, i+1):
+            total += prices[j]
+        ama[i] = total / period
+        
+    return ama
+
+
+@numba.jit(nopython=True, cache=True)
+def calculate_momentum_fast(prices: np.ndarray, period: int) -> np.ndarray:
+    """
+    Calculate price momentum - JIT compiled.
+    
+    Args:
+        prices: Price array
+        period: Lookback period
+        
+    Returns:
+        Momentum values
+    """
+    n = len(prices)
+    momentum = np.zeros(n)
+    
+    for i in range(period, n):
+        momentum[i] = prices[i] - prices[i - period]
+        
+    return momentum
+
+
+@numba.jit(nopython=True, cache=True)
+def calculate_zscore_fast(prices: np.ndarray, window: int) -> np.ndarray:
+    """
+    Calculate rolling z-score - JIT compiled.
+    
+    Args:
+        prices: Price array
+        window: Rolling window size
+        
+    Returns:
+        Z-score values
+    """
+    n = len(prices)
+    zscore = np.zeros(n)
+    
+    mean = calculate_rolling_mean_fast(prices, window)
+    std = calculate_rolling_std_fast(prices, window)
+    
+    for i in range(window, n):
+        if std[i] > 0:
+            zscore[i] = (prices[i] - mean[i]) / std[i]
+            
+    return zscore
+
+
+def warmup_indicators() -> None:
+    """
+    Compile all JIT indicator kernels ahead of first use.
+    
+    Kernels are cached on disk, so after the first run this only loads
+    the cached machine code. Call it at startup to keep compilation out
+    of the first live bar or backtest iteration.
+    """
+    prices = np.linspace(1.0, 2.0, 64)
+    volatility = np.linspace(0.1, 1.0, 64)
+    
+    calculate_atr_fast(prices + 0.1, prices - 0.1, prices, 14)
+    calculate_ema_fast(prices, 14)
+    calculate_rsi_fast(prices, 14)
+    calculate_rolling_mean_fast(prices, 20)
+    calculate_rolling_std_fast(prices, 20)
+    calculate_bollinger_fast(prices, 20, 2.0)
+    calculate_adaptive_ma_fast(prices, volatility, 20, 5, 50)
+    calculate_momentum_fast(prices, 10)
+    calculate_zscore_fast(prices, 20)
+
+
 class TechnicalIndicators:
     """Technical indicators calculator for GOLD trading."""
     
@@ -159,6 +394,34 @@ class TechnicalIndicators:
         """
         return calculate_rsi_fast(prices, period)
         
+    @staticmethod
+    def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+        """
+        Calculate rolling mean (partial windows at the start).
+        
+        Args:
+            values: Input array
+            window: Window length
+            
+        Returns:
+            Rolling mean values
+        """
+        return calculate_rolling_mean_fast(np.asarray(values, dtype=np.float64), window)
+        
+    @staticmethod
+    def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+        """
+        Calculate rolling population standard deviation (partial windows at the start).
+        
+        Args:
+            values: Input array
+            window: Window length
+            
+        Returns:
+            Rolling standard deviation values
+        """
+        return calculate_rolling_std_fast(np.asarray(values, dtype=np.float64), window)
+        
     @staticmethod
     def macd(
         prices: np.ndarray,
@@ -204,21 +467,8 @@ class TechnicalIndicators:
         Returns:
             Tuple of (Upper band, Middle band, Lower band)
         """
-        n = len(prices)
-        middle_band = np.zeros(n)
-        upper_band = np.zeros(n)
-        lower_band = np.zeros(n)
-        
-        for i in range(period-1, n):
-            window = prices[i-period+1:i+1]
-            middle = np.mean(window)
-            std = np.std(window)
-            
-            middle_band[i] = middle
-            upper_band[i] = middle + std_dev * std
-            lower_band[i] = middle - std_dev * std
-            
-        return upper_band, middle_band, lower_band
+        prices = np.asarray(prices, dtype=np.float64)
+        return calculate_bollinger_fast(prices, period, float(std_dev))
         
     @staticmethod
     def adaptive_ma(
@@ -241,22 +491,13 @@ class TechnicalIndicators:
         Returns:
             Adaptive MA values
         """
-        n = len(prices)
-        ama = np.zeros(n)
+        prices = np.asarray(prices, dtype=np.float64)
+        volatility = np.asarray(volatility, dtype=np.float64)
         
         # Normalize volatility
         vol_norm = volatility / np.max(volatility) if np.max(volatility) > 0 else volatility
         
-        for i in range(max_period, n):
-            # Adjust period based on volatility
-            # High volatility -> shorter period (more reactive)
-            # Low volatility -> longer period (more stable)
-            period = int(base_period - (vol_norm[i] * (base_period - min_period)))
-            period = max(min_period, min(period, max_period))
-            
-            ama[i] = np.mean(prices[i-period+1:i+1])
-            
-        return ama
+        return calculate_adaptive_ma_fast(prices, vol_norm, base_period, min_period, max_period)
         
     @staticmethod
     def volume_profile(
@@ -283,12 +524,11 @@ class TechnicalIndicators:
         bins = np.linspace(price_range[0], price_range[1], n_bins + 1)
         
         # Accumulate volume in each bin
-        volume_profile = np.zeros(n_bins)
-        for i in range(len(prices)):
-            bin_idx = np.searchsorted(bins, prices[i]) - 1
-            bin_idx = max(0, min(bin_idx, n_bins - 1))
-            volume_profile[bin_idx] += volumes[i]
-            
+        bin_idx = np.clip(np.searchsorted(bins, prices) - 1, 0, n_bins - 1)
+        volume_profile = np.bincount(
+            bin_idx, weights=np.asarray(volumes, dtype=np.float64), minlength=n_bins
+        )
+        
         # Find POC (Point of Control)
         poc_idx = np.argmax(volume_profile)
         poc_price = (bins[poc_idx] + bins[poc_idx + 1]) / 2
@@ -337,13 +577,7 @@ class TechnicalIndicators:
         Returns:
             Momentum values
         """
-        n = len(prices)
-        momentum = np.zeros(n)
-        
-        for i in range(period, n):
-            momentum[i] = prices[i] - prices[i - period]
-            
-        return momentum
+        return calculate_momentum_fast(np.asarray(prices, dtype=np.float64), period)
         
     @staticmethod
     def zscore(prices: np.ndarray, window: int = 20) -> np.ndarray:
@@ -357,17 +591,447 @@ class TechnicalIndicators:
         Returns:
             Z-score values
         """
-        n = len(prices)
-        zscore = np.zeros(n)
+        return calculate_zscore_fast(np.asarray(prices, dtype=np.float64), window)
+
+
+class IncrementalSMA:
+    """
+    Streaming simple moving average, O(1) per bar.
+    
+    Matches ``TechnicalIndicators.rolling_mean`` (partial windows at the start).
+    """
+    
+    def __init__(self, period: int):
+        """
+        Initialize streaming SMA.
+        
+        Args:
+            period: SMA period
+        """
+        self.period = period
+        self.reset()
+        
+    def reset(self) -> None:
+        """Clear all state."""
+        self._window = deque()
+        self._sum = 0.0
+        self._evicted: Optional[float] = None
+        self.value = 0.0
+        
+    @property
+    def ready(self) -> bool:
+        """True once a full window has been seen."""
+        return len(self._window) >= self.period
+        
+    def seed(self, prices: np.ndarray) -> float:
+        """
+        Seed state from history.
         
-        for i in range(window, n):
-            window_data = prices[i-window+1:i+1]
-            mean = np.mean(window_data)
-            std = np.std(window_data)
+        Args:
+            prices: Historical prices, oldest first
             
-            if std > 0:
-                zscore[i] = (prices[i] - mean) / std
-            else:
-                zscore[i] = 0.0
+        Returns:
+            SMA of the newest bar
+        """
+        self.reset()
+        for price in np.asarray(prices, dtype=np.float64)[-self.period:]:
+            self.update(float(price))
+        return self.value
+        
+    def update(self, price: float, replace: bool = False) -> float:
+        """
+        Add one bar.
+        
+        Args:
+            price: Newest price
+            replace: Replace the previous update (forming bar) instead of appending
+            
+        Returns:
+            Updated SMA value
+        """
+        if replace and self._window:
+            self._sum -= self._window.pop()
+            if self._evicted is not None:
+                self._window.appendleft(self._evicted)
+                self._sum += self._evicted
+                
+        self._evicted = None
+        if len(self._window) == self.period:
+            self._evicted = self._window.popleft()
+            self._sum -= self._evicted
+            
+        self._window.append(price)
+        self._sum += price
+        self.value = self._sum / len(self._window)
+        return self.value
+
+
+class IncrementalEMA:
+    """
+    Streaming exponential moving average, O(1) per bar.
+    
+    Matches ``TechnicalIndicators.ema`` (zero until the first full period).
+    """
+    
+    def __init__(self, period: int):
+        """
+        Initialize streaming EMA.
+        
+        Args:
+            period: EMA period
+        """
+        self.period = period
+        self.multiplier = 2.0 / (period + 1)
+        self.reset()
+        
+    def reset(self) -> None:
+        """Clear all state."""
+        self._count = 0
+        self._sum = 0.0
+        self.value = 0.0
+        self._snapshot = (0, 0.0, 0.0)
+        
+    @property
+    def ready(self) -> bool:
+        """True once the initial SMA has been formed."""
+        return self._count >= self.period
+        
+    def seed(self, prices: np.ndarray) -> float:
+        """
+        Seed state from history.
+        
+        Args:
+            prices: Historical prices, oldest first
+            
+        Returns:
+            EMA of the newest bar
+        """
+        self.reset()
+        for price in np.asarray(prices, dtype=np.float64):
+            self.update(float(price))
+        return self.value
+        
+    def update(self, price: float, replace: bool = False) -> float:
+        """
+        Add one bar.
+        
+        Args:
+            price: Newest price
+            replace: Replace the previous update (forming bar) instead of appending
+            
+        Returns:
+            Updated EMA value
+        """
+        if replace:
+            self._count, self._sum, self.value = self._snapshot
+        self._snapshot = (self._count, self._sum, self.value)
+        
+        self._count += 1
+        if self._count < self.period:
+            self._sum += price
+        elif self._count == self.period:
+            self._sum += price
+            self.value = self._sum / self.period
+        else:
+            self.value = (price - self.value) * self.multiplier + self.value
+        return self.value
+
+
+class IncrementalRSI:
+    """
+    Streaming Wilder RSI, O(1) per bar.
+    
+    Matches ``TechnicalIndicators.rsi`` (zero until period + 1 bars).
+    """
+    
+    def __init__(self, period: int = 14):
+        """
+        Initialize streaming RSI.
+        
+        Args:
+            period: RSI period
+        """
+        self.period = period
+        self.reset()
+        
+    def reset(self) -> None:
+        """Clear all state."""
+        self._count = 0
+        self._last_price: Optional[float] = None
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+        self.value = 0.0
+        self._snapshot = (0, None, 0.0, 0.0, 0.0)
+        
+    @property
+    def ready(self) -> bool:
+        """True once the first RSI value has been produced."""
+        return self._count > self.period + 1
+        
+    def seed(self, prices: np.ndarray) -> float:
+        """
+        Seed state from history.
+        
+        Args:
+            prices: Historical prices, oldest first
+            
+        Returns:
+            RSI of the newest bar
+        """
+        self.reset()
+        for price in np.asarray(prices, dtype=np.float64):
+            self.update(float(price))
+        return self.value
+        
+    def update(self, price: float, replace: bool = False) -> float:
+        """
+        Add one bar.
+        
+        Args:
+            price: Newest price
+            replace: Replace the previous update (forming bar) instead of appending
+            
+        Returns:
+            Updated RSI value
+        """
+        if replace:
+            (self._count, self._last_price, self._avg_gain,
+             self._avg_loss, self.value) = self._snapshot
+        self._snapshot = (self._count, self._last_price, self._avg_gain,
+                          self._avg_loss, self.value)
+        
+        self._count += 1
+        if self._last_price is None:
+            self._last_price = price
+            return self.value
+            
+        delta = price - self._last_price
+        self._last_price = price
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        
+        # Number of deltas seen so far
+        k = self._count - 1
+        if k <= self.period:
+            # Accumulate sums for the initial averages
+            self._avg_gain += gain
+            self._avg_loss += loss
+            if k == self.period:
+                self._avg_gain /= self.period
+                self._avg_loss /= self.period
+            return self.value
+            
+        self._avg_gain = (self._avg_gain * (self.period - 1) + gain) / self.period
+        self._avg_loss = (self._avg_loss * (self.period - 1) + loss) / self.period
+        
+        if self._avg_loss == 0:
+            self.value = 100.0
+        else:
+            rs = self._avg_gain / self._avg_loss
+            self.value = 100.0 - (100.0 / (1.0 + rs))
+        return self.value
+
+
+class IncrementalATR:
+    """
+    Streaming Wilder ATR, O(1) per bar.
+    
+    Matches ``TechnicalIndicators.atr`` (zero until period bars).
+    """
+    
+    def __init__(self, period: int = 14):
+        """
+        Initialize streaming ATR.
+        
+        Args:
+            period: ATR period
+        """
+        self.period = period
+        self.reset()
+        
+    def reset(self) -> None:
+        """Clear all state."""
+        self._count = 0
+        self._prev_close: Optional[float] = None
+        self._tr_sum = 0.0
+        self.value = 0.0
+        self._snapshot = (0, None, 0.0, 0.0)
+        
+    @property
+    def ready(self) -> bool:
+        """True once the initial average has been formed."""
+        return self._count >= self.period
+        
+    def seed(self, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> float:
+        """
+        Seed state from history.
+        
+        Args:
+            high: Historical high prices, oldest first
+            low: Historical low prices
+            close: Historical close prices
+            
+        Returns:
+            ATR of the newest bar
+        """
+        self.reset()
+        for h, l, c in zip(np.asarray(high, dtype=np.float64),
+                           np.asarray(low, dtype=np.float64),
+                           np.asarray(close, dtype=np.float64)):
+            self.update(float(h), float(l), float(c))
+        return self.value
+        
+    def update(self, high: float, low: float, close: float, replace: bool = False) -> float:
+        """
+        Add one bar.
+        
+        Args:
+            high: Bar high
+            low: Bar low
+            close: Bar close
+            replace: Replace the previous update (forming bar) instead of appending
+            
+        Returns:
+            Updated ATR value
+        """
+        if replace:
+            self._count, self._prev_close, self._tr_sum, self.value = self._snapshot
+        self._snapshot = (self._count, self._prev_close, self._tr_sum, self.value)
+        
+        self._count += 1
+        prev_close = self._prev_close
+        self._prev_close = close
+        if prev_close is None:
+            return self.value
+            
+        tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+        
+        if self._count < self.period:
+            self._tr_sum += tr
+        elif self._count == self.period:
+            self._tr_sum += tr
+            self.value = self._tr_sum / (self.period - 1)
+        else:
+            self.value = (self.value * (self.period - 1) + tr) / self.period
+        return self.value
+
+
+class WindowedBarIndicators:
+    """
+    Rolling-window indicator columns for a re-fetched window of recent bars.
+    
+    Matches callers that fetch the last N bars every cycle and compute
+    pandas ``close.rolling(period).mean()`` SMAs and an ATR as
+    ``tr.rolling(period).mean()`` over that window (NaN for the first
+    ``period - 1`` rows, and a first true range of high - low since the
+    window has no previous close). Only bars newer than the previous call
+    are folded in, in O(1) each; the previous newest bar is recomputed, as
+    it may have been forming. Without that overlap the state is rebuilt.
+    """
+    
+    def __init__(self, sma_periods: Dict[str, int], atr_period: Optional[int] = None):
+        """
+        Initialize windowed indicators.
+        
+        Args:
+            sma_periods: Output column name -> SMA period (on close)
+            atr_period: Period of the 'atr' column (no ATR if None)
+        """
+        self.sma_periods = dict(sma_periods)
+        self.atr_period = atr_period
+        self.reset()
+        
+    def reset(self) -> None:
+        """Clear all state."""
+        self._smas = {name: IncrementalSMA(period) for name, period in self.sma_periods.items()}
+        self._atr = IncrementalSMA(self.atr_period) if self.atr_period else None
+        self._prev_close: Optional[float] = None
+        self._snapshot: Optional[float] = None
+        self._times: Optional[np.ndarray] = None
+        self._columns: Dict[str, np.ndarray] = {}
+        
+    def _overlap(self, times: np.ndarray) -> Tuple[int, int]:
+        """
+        Find where ``times`` continues the previous window.
+        
+        Returns:
+            Index of the previous newest bar in ``times`` and the index of
+            ``times[0]`` in the previous window, or (-1, -1) without overlap
+        """
+        if self._times is None or len(self._times) == 0:
+            return -1, -1
+        start = int(np.searchsorted(times, self._times[-1], side='left'))
+        first = int(np.searchsorted(self._times, times[0], side='left'))
+        if start >= len(times) or len(self._times) - first != start + 1:
+            return -1, -1
+        if not np.array_equal(self._times[first:], times[:start + 1]):
+            return -1, -1
+        return start, first
+        
+    def update(self, times: np.ndarray, close: np.ndarray, high: Optional[np.ndarray] = None,
+               low: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        Compute the columns for a window of bars.
+        
+        Args:
+            times: Bar times, oldest first
+            close: Close prices
+            high: High prices (required with an ATR)
+            low: Low prices (required with an ATR)
+            
+        Returns:
+            Column name -> values aligned with ``times``
+        """
+        times = np.asarray(times)
+        close = np.asarray(close, dtype=np.float64)
+        n = len(times)
+        start, first = self._overlap(times) if n else (-1, -1)
+        if start < 0:
+            self.reset()
+            start, first = 0, 0
+            replace = False
+        else:
+            replace = True
+            
+        names = list(self._smas) + (['atr', 'tr'] if self._atr is not None else [])
+        raw = {}
+        for name in names:
+            values = np.empty(n)
+            values[:start] = self._columns[name][first:first + start] if start else 0.0
+            raw[name] = values
+            
+        for i in range(start, n):
+            replace_bar = replace and i == start
+            price = float(close[i])
+            for name, sma in self._smas.items():
+                raw[name][i] = sma.update(price, replace_bar)
+            if self._atr is not None:
+                if replace_bar:
+                    self._prev_close = self._snapshot
+                self._snapshot = self._prev_close
+                h, l = float(high[i]), float(low[i])
+                tr = h - l
+                if self._prev_close is not None:
+                    tr = max(tr, abs(h - self._prev_close), abs(l - self._prev_close))
+                raw['tr'][i] = tr
+                raw['atr'][i] = self._atr.update(tr, replace_bar)
+                self._prev_close = price
                 
-        return zscore
+        self._times = times
+        self._columns = raw
+        
+        # Window-relative view, as the batch computation over this window sees it
+        out = {}
+        for name, period in self.sma_periods.items():
+            values = raw[name].copy()
+            values[:period - 1] = np.nan
+            out[name] = values
+        if self._atr is not None:
+            period = self.atr_period
+            values = raw['atr'].copy()
+            if n >= period:
+                # The window's first true range has no previous close
+                values[period - 1] += ((float(high[0]) - float(low[0])) - raw['tr'][0]) / period
+            values[:period - 1] = np.nan
+            out['atr'] = values
+        return out
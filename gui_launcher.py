@@ -289,19 +289,22 @@ class BacktestWorker(QThread):
             self.status.emit("Loading backtest data...")
             self.progress.emit(10)
             
-            # Load data - use configured data file or build path from symbol
+            from trading_system.utils.market_store import load_bars, load_dataset, canonical_csv_path
+
+            # Load data - use configured data file, the synced dataset or the legacy snapshot
+            canonical = canonical_csv_path(self.config.data_dir, self.config.symbol, 'M1')
             if self.config.data_file and Path(self.config.data_file).exists():
-                data_file = self.config.data_file
+                df = load_bars(self.config.data_file)
+            elif canonical.exists():
+                df = load_dataset(self.config.symbol, 'M1', self.config.data_dir)
             else:
-                data_file = f"{self.config.data_dir}/{self.config.symbol}_M1_59days.csv"
-            
-            df = pd.read_csv(data_file)
+                df = load_bars(f"{self.config.data_dir}/{self.config.symbol}_M1_59days.csv")
             self.progress.emit(25)
             
             self.status.emit("Running predictions...")
-            from inference import ModelPredictor
+            from inference import get_predictor
             
-            predictor = ModelPredictor(model_dir=self.config.model_dir)
+            predictor = get_predictor(model_dir=self.config.model_dir)
             result = predictor.predict(df)
             predictions = result['predictions']
             
@@ -310,35 +313,25 @@ class BacktestWorker(QThread):
             # Calculate signals and P&L
             self.status.emit("Calculating performance metrics...")
             
-            closes = df['close'].values
-            signals = []
-            trades = []
-            
-            for pred in predictions:
-                if pred > self.config.buy_threshold:
-                    signals.append('BUY')
-                elif pred < self.config.sell_threshold:
-                    signals.append('SELL')
-                else:
-                    signals.append('HOLD')
+            signals = np.where(
+                predictions > self.config.buy_threshold, 1,
+                np.where(predictions < self.config.sell_threshold, -1, 0)
+            )
             
-            # Simple P&L calculation
-            total_pnl = 0.0
-            winning_trades = 0
-            losing_trades = 0
-            entry_price = None
+            # Long-only: BUY opens, SELL closes
+            from backtesting.engine import run_backtest
             
-            for i, signal in enumerate(signals):
-                if signal == 'BUY' and entry_price is None:
-                    entry_price = closes[i]
-                elif signal == 'SELL' and entry_price is not None:
-                    pnl = (closes[i] - entry_price) * self.config.lot_size * 100
-                    total_pnl += pnl
-                    if pnl > 0:
-                        winning_trades += 1
-                    else:
-                        losing_trades += 1
-                    entry_price = None
+            backtest = run_backtest(
+                df['close'].values,
+                signals,
+                lot_size=self.config.lot_size,
+                allow_short=False,
+                exit_on_signal=True,
+            )
+            pnl = backtest.trades['pnl'].values
+            total_pnl = float(pnl.sum())
+            winning_trades = int((pnl > 0).sum())
+            losing_trades = len(pnl) - winning_trades
             
             self.progress.emit(75)
             
@@ -350,9 +343,9 @@ class BacktestWorker(QThread):
                 'win_rate': (winning_trades / (winning_trades + losing_trades) * 100) if (winning_trades + losing_trades) > 0 else 0,
                 'avg_win': total_pnl / max(winning_trades, 1),
                 'predictions_count': len(predictions),
-                'buy_signals': signals.count('BUY'),
-                'sell_signals': signals.count('SELL'),
-                'hold_signals': signals.count('HOLD'),
+                'buy_signals': int((signals == 1).sum()),
+                'sell_signals': int((signals == -1).sum()),
+                'hold_signals': int((signals == 0).sum()),
             }
             
             self.progress.emit(90)
@@ -378,8 +371,6 @@ class MonitoringWorker(QThread):
         self.running = True
         # Track last broadcast per symbol to avoid duplicates: symbol -> {signal, time}
         self._last_broadcast: Dict[str, Dict[str, Any]] = {}
-        # Per-chat rate limit mapping: chat_id -> retry_until (epoch seconds)
-        self._chat_rate_limited: Dict[str, float] = {}
     
     def run(self):
         """Run monitoring."""
@@ -488,24 +479,13 @@ class MonitoringWorker(QThread):
             tp_price = close + (close * (tp_percent / 100.0)) if signal_type == 'BUY' else close - (close * (tp_percent / 100.0))
             sl_price = close - (close * (sl_percent / 100.0)) if signal_type == 'BUY' else close + (close * (sl_percent / 100.0))
 
-            # Prepare chat id list and filter out temporarily rate-limited chats
+            # Prepare chat id list; per-chat and global Telegram rate limits
+            # are handled by the delivery queue
             chat_ids = [c.strip() for c in (self.config.signal_chat_ids or "").split(',') if c.strip()]
             if not chat_ids:
                 logger.warning("No subscriber chat IDs configured for Signal Service")
                 return
 
-            allowed_chat_ids = []
-            for c in chat_ids:
-                retry_until = self._chat_rate_limited.get(c)
-                if retry_until and now < retry_until:
-                    logger.info(f"Skipping chat {c} due to active rate limit until {retry_until}")
-                    continue
-                allowed_chat_ids.append(c)
-
-            if not allowed_chat_ids:
-                logger.info("All subscriber chats are currently rate-limited; skipping broadcast")
-                return
-
             # Call SignalBroadcaster.send_signal with expected signature
             try:
                 send_result = broadcaster.send_signal(
@@ -517,23 +497,14 @@ class MonitoringWorker(QThread):
                     sl_price=sl_price,
                     tp_percent=tp_percent,
                     sl_percent=sl_percent,
-                    chat_ids=allowed_chat_ids,
+                    chat_ids=chat_ids,
                     template=self.config.signal_template,
                     timestamp=timestamp
                 )
                 logger.info(f"Signal broadcast result: {send_result}")
 
-                # Mark rate-limited chats based on broadcaster response
-                rate_limited = send_result.get('rate_limited') or {}
-                for chat_id, retry_after in rate_limited.items():
-                    try:
-                        self._chat_rate_limited[str(chat_id)] = now + int(retry_after)
-                        logger.warning(f"Chat {chat_id} rate-limited for {retry_after}s")
-                    except Exception:
-                        logger.warning(f"Invalid retry_after for {chat_id}: {retry_after}")
-
-                # Update last broadcast time if at least one message was sent
-                if send_result.get('sent_count', 0) > 0:
+                # Update last broadcast time if at least one message was sent or queued
+                if send_result.get('sent_count', 0) > 0 or send_result.get('queued_count', 0) > 0:
                     self._last_broadcast[self.config.symbol] = {'signal': signal_type, 'time': now}
 
             except Exception as e:
@@ -14,17 +14,271 @@ from __future__ import annotations
 
 import json
 import logging
+import threading
+import time
 from pathlib import Path
 from typing import Dict, Optional, Tuple
 
 import joblib
+import numba
 import numpy as np
 import pandas as pd
 
+from trading_system.features.technical_indicators import IncrementalSMA
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger('inference')
 
+# Model input columns, in training order
+FEATURE_COLS = ['close', 'sma_fast', 'sma_slow', 'sma_spread', 'rsi', 'atr', 'range', 'logret_1']
+
+
+@numba.jit(nopython=True, cache=True)
+def _flat_forest_predict_row(x: np.ndarray, roots: np.ndarray, left: np.ndarray, right: np.ndarray,
+                             feature: np.ndarray, threshold: np.ndarray, missing_left: np.ndarray,
+                             value: np.ndarray) -> float:
+    """Average of the leaf values reached by one float32 row in every tree."""
+    total = 0.0
+    for t in range(len(roots)):
+        node = roots[t]
+        while left[node] != -1:
+            v = x[feature[node]]
+            if np.isnan(v):
+                go_left = missing_left[node] != 0
+            else:
+                go_left = v <= threshold[node]
+            node = left[node] if go_left else right[node]
+        total += value[node]
+    return total / len(roots)
+
+
+@numba.jit(nopython=True, cache=True)
+def _flat_forest_predict_batch(X: np.ndarray, roots: np.ndarray, left: np.ndarray, right: np.ndarray,
+                               feature: np.ndarray, threshold: np.ndarray, missing_left: np.ndarray,
+                               value: np.ndarray) -> np.ndarray:
+    """Row-wise ``_flat_forest_predict_row`` over a float32 matrix."""
+    out = np.empty(X.shape[0])
+    for i in range(X.shape[0]):
+        out[i] = _flat_forest_predict_row(X[i], roots, left, right, feature, threshold, missing_left, value)
+    return out
+
+
+class FlatForest:
+    """
+    Tree ensemble flattened into contiguous node arrays.
+    
+    All trees share one set of node arrays; child indices are global and
+    ``roots`` holds the first node of each tree. Evaluation follows
+    scikit-learn exactly (inputs cast to float32, ``<=`` splits, trees
+    summed in order and averaged), so outputs are identical to
+    ``RandomForestRegressor.predict``.
+    """
+    
+    FIELDS = ('roots', 'left', 'right', 'feature', 'threshold', 'missing_left', 'value')
+    
+    def __init__(self, roots: np.ndarray, left: np.ndarray, right: np.ndarray, feature: np.ndarray,
+                 threshold: np.ndarray, missing_left: np.ndarray, value: np.ndarray, n_features: int):
+        """
+        Initialize flat forest.
+        
+        Args:
+            roots: Root node index of each tree
+            left: Left child index per node (-1 for leaves)
+            right: Right child index per node (-1 for leaves)
+            feature: Split feature per node
+            threshold: Split threshold per node
+            missing_left: 1 where NaN values go to the left child
+            value: Leaf value per node
+            n_features: Number of input features
+        """
+        self.roots = np.ascontiguousarray(roots, dtype=np.int64)
+        self.left = np.ascontiguousarray(left, dtype=np.int64)
+        self.right = np.ascontiguousarray(right, dtype=np.int64)
+        self.feature = np.ascontiguousarray(feature, dtype=np.int64)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.missing_left = np.ascontiguousarray(missing_left, dtype=np.uint8)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.n_features = int(n_features)
+        
+    @classmethod
+    def from_model(cls, model) -> Optional['FlatForest']:
+        """
+        Flatten a fitted single-output tree ensemble regressor.
+        
+        Args:
+            model: Fitted RandomForestRegressor (or compatible ensemble)
+            
+        Returns:
+            FlatForest, or None if the model is not a supported ensemble
+        """
+        estimators = getattr(model, 'estimators_', None)
+        if not estimators or not hasattr(estimators[0], 'tree_') or hasattr(model, 'classes_'):
+            return None
+        if any(est.tree_.value.shape[1:] != (1, 1) for est in estimators):
+            return None
+            
+        roots, left, right, feature, threshold, missing_left, value = [], [], [], [], [], [], []
+        offset = 0
+        for est in estimators:
+            tree = est.tree_
+            is_leaf = tree.children_left == -1
+            roots.append(offset)
+            left.append(np.where(is_leaf, -1, tree.children_left + offset))
+            right.append(np.where(is_leaf, -1, tree.children_right + offset))
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(tree.threshold)
+            missing = getattr(tree, 'missing_go_to_left', None)
+            missing_left.append(np.zeros(tree.node_count, dtype=np.uint8) if missing is None else missing)
+            value.append(tree.value[:, 0, 0])
+            offset += tree.node_count
+            
+        return cls(
+            np.array(roots), np.concatenate(left), np.concatenate(right), np.concatenate(feature),
+            np.concatenate(threshold), np.concatenate(missing_left), np.concatenate(value),
+            model.n_features_in_,
+        )
+        
+    def save(self, path: Path) -> None:
+        """Save node arrays to an uncompressed ``.npz`` file."""
+        arrays = {name: getattr(self, name) for name in self.FIELDS}
+        np.savez(path, n_features=np.int64(self.n_features), **arrays)
+        
+    @classmethod
+    def load(cls, path: Path) -> 'FlatForest':
+        """Load node arrays saved by ``save``."""
+        with np.load(path) as data:
+            return cls(*(data[name] for name in cls.FIELDS), n_features=int(data['n_features']))
+        
+    def _args(self) -> Tuple[np.ndarray, ...]:
+        return tuple(getattr(self, name) for name in self.FIELDS)
+        
+    def predict_row(self, x: np.ndarray) -> float:
+        """
+        Predict one feature row.
+        
+        Args:
+            x: Scaled feature row of length n_features
+            
+        Returns:
+            Prediction
+        """
+        x = np.ascontiguousarray(x, dtype=np.float32).reshape(-1)
+        if len(x) != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {len(x)}")
+        return _flat_forest_predict_row(x, *self._args())
+        
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predict a batch of feature rows.
+        
+        Args:
+            X: Scaled feature matrix (n_samples, n_features)
+            
+        Returns:
+            Predictions
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected shape (n, {self.n_features}), got {X.shape}")
+        return _flat_forest_predict_batch(X, *self._args())
+
+
+def flat_forest_path(model_dir: Path, model_name: str) -> Path:
+    """Path of the flattened forest exported next to a model."""
+    return Path(model_dir) / f"{model_name}_flat.npz"
+
+
+def export_flat_forest(model, model_dir: Path, model_name: str) -> Optional[Path]:
+    """
+    Export a fitted forest as flat node arrays next to its ``.pkl``.
+    
+    Args:
+        model: Fitted model
+        model_dir: Directory containing model artifacts
+        model_name: Base name of model files (without extension)
+        
+    Returns:
+        Path of the exported file, or None if the model is not supported
+    """
+    flat = FlatForest.from_model(model)
+    if flat is None:
+        return None
+    path = flat_forest_path(model_dir, model_name)
+    flat.save(path)
+    return path
+
+
+class FeatureState:
+    """
+    Rolling feature state for one bar stream.
+    
+    Builds the same feature row that ``ModelPredictor.add_technical_features``
+    produces for the newest bar of the full history, in O(1) per bar.
+    """
+    
+    def __init__(self, sma_fast: int = 10, sma_slow: int = 30,
+                 rsi_period: int = 14, atr_period: int = 14):
+        """
+        Initialize feature state.
+        
+        Args:
+            sma_fast: Period for fast SMA
+            sma_slow: Period for slow SMA
+            rsi_period: Period for RSI
+            atr_period: Period for ATR
+        """
+        self.sma_fast = IncrementalSMA(sma_fast)
+        self.sma_slow = IncrementalSMA(sma_slow)
+        self.avg_gain = IncrementalSMA(rsi_period)
+        self.avg_loss = IncrementalSMA(rsi_period)
+        self.atr = IncrementalSMA(atr_period)
+        self.prev_close: Optional[float] = None
+        self.last_time = None
+        self.bars = 0
+        self._snapshot = (None, 0)
+    
+    def update(self, close: float, high: float, low: float, replace: bool = False) -> np.ndarray:
+        """
+        Add one bar (or replace the last one) and return its feature row.
+        
+        Args:
+            close: Bar close
+            high: Bar high
+            low: Bar low
+            replace: Replace the previous bar (still forming) instead of appending
+            
+        Returns:
+            Feature row in FEATURE_COLS order
+        """
+        if replace:
+            self.prev_close, self.bars = self._snapshot
+        self._snapshot = (self.prev_close, self.bars)
+        
+        prev_close = self.prev_close
+        sma_fast = self.sma_fast.update(close, replace)
+        sma_slow = self.sma_slow.update(close, replace)
+        
+        if prev_close is None:
+            # First bar: no delta, so RSI is filled with 0 as in the batch path
+            tr = high - low
+            rsi = 0.0
+            logret = 0.0
+        else:
+            delta = close - prev_close
+            gain = self.avg_gain.update(max(delta, 0.0), replace)
+            loss = self.avg_loss.update(max(-delta, 0.0), replace)
+            rs = gain / (loss + 1e-9)
+            rsi = 100 - (100 / (1 + rs))
+            tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+            logret = float(np.log(close) - np.log(prev_close))
+            
+        atr = self.atr.update(tr, replace)
+        self.prev_close = close
+        self.bars += 1
+        
+        return np.array([close, sma_fast, sma_slow, sma_fast - sma_slow, rsi, atr, high - low, logret])
+
 
 class ModelPredictor:
     """Load and use trained RandomForest model for inference."""
@@ -42,6 +296,11 @@ class ModelPredictor:
         self.model = None
         self.scaler = None
         self.metadata = None
+        self.flat_forest: Optional[FlatForest] = None
+        
+        # Per-stream rolling feature state for predict_latest
+        self._feature_states: Dict[str, FeatureState] = {}
+        self._state_lock = threading.Lock()
         
         self._load_artifacts()
     
@@ -54,6 +313,15 @@ class ModelPredictor:
         self.model = joblib.load(model_path)
         logger.info(f"Loaded model from {model_path}")
         
+        # Flat node arrays for compiled evaluation; an export older than the
+        # model is stale, so flatten the loaded model instead
+        flat_path = flat_forest_path(self.model_dir, self.model_name)
+        if flat_path.exists() and flat_path.stat().st_mtime >= model_path.stat().st_mtime:
+            self.flat_forest = FlatForest.load(flat_path)
+            logger.info(f"Loaded flat forest from {flat_path}")
+        else:
+            self.flat_forest = FlatForest.from_model(self.model)
+        
         # Load scaler
         scaler_path = self.model_dir / f"{self.model_name}_scaler.pkl"
         if not scaler_path.exists():
@@ -129,7 +397,7 @@ class ModelPredictor:
         Returns:
             Tuple of (feature DataFrame, scaled numpy array)
         """
-        feature_cols = ['close', 'sma_fast', 'sma_slow', 'sma_spread', 'rsi', 'atr', 'range', 'logret_1']
+        feature_cols = FEATURE_COLS
         
         # Validate columns
         missing = [col for col in feature_cols if col not in df.columns]
@@ -141,7 +409,7 @@ class ModelPredictor:
         # Handle NaN
         if X.isna().any().any():
             logger.warning(f"Found {X.isna().sum().sum()} NaN values in features, filling forward...")
-            X = X.fillna(method='ffill').fillna(0)
+            X = X.ffill().fillna(0)
         
         # Scale
         X_scaled = self.scaler.transform(X)
@@ -159,7 +427,7 @@ class ModelPredictor:
         Returns:
             Dictionary with predictions and metadata
         """
-        logger.info(f"Making predictions on {len(df)} samples")
+        logger.debug(f"Making predictions on {len(df)} samples")
         
         # Add technical features
         df_features = self.add_technical_features(df)
@@ -168,7 +436,10 @@ class ModelPredictor:
         X_df, X_scaled = self.extract_features(df_features)
         
         # Predict
-        preds = self.model.predict(X_scaled)
+        if self.flat_forest is not None:
+            preds = self.flat_forest.predict(X_scaled)
+        else:
+            preds = self.model.predict(X_scaled)
         
         result = {
             'predictions': preds,
@@ -179,13 +450,88 @@ class ModelPredictor:
         
         # Add feature importances
         if hasattr(self.model, 'feature_importances_'):
-            feature_cols = ['close', 'sma_fast', 'sma_slow', 'sma_spread', 'rsi', 'atr', 'range', 'logret_1']
+            feature_cols = FEATURE_COLS
             importances = self.model.feature_importances_
             result['feature_importances'] = dict(zip(feature_cols, importances))
-            logger.info(f"Top 3 features: {sorted(result['feature_importances'].items(), key=lambda x: x[1], reverse=True)[:3]}")
+            logger.debug(f"Top 3 features: {sorted(result['feature_importances'].items(), key=lambda x: x[1], reverse=True)[:3]}")
         
         return result
     
+    def _scale_row(self, row: np.ndarray) -> np.ndarray:
+        """Scale one feature row without the per-call overhead of sklearn validation."""
+        mean = getattr(self.scaler, 'mean_', None)
+        scale = getattr(self.scaler, 'scale_', None)
+        if mean is not None and scale is not None:
+            return ((row - mean) / scale).reshape(1, -1)
+        
+        X = row.reshape(1, -1)
+        if hasattr(self.scaler, 'feature_names_in_'):
+            X = pd.DataFrame(X, columns=self.scaler.feature_names_in_)
+        return self.scaler.transform(X)
+    
+    def predict_latest(self, df: pd.DataFrame, stream: str = 'default') -> float:
+        """
+        Predict only the newest bar, carrying rolling feature state between calls.
+        
+        Only bars from the previous newest bar onwards are folded into the
+        state; that bar is replaced, since it may still have been forming.
+        Without that overlap (first call, gap, or no 'time' column) the state
+        is rebuilt from ``df``. The result matches
+        ``predict(history)['predictions'][-1]`` over the full history seen.
+        
+        Args:
+            df: DataFrame with OHLC data (time, close, high, low columns)
+            stream: Independent state key (e.g. symbol) for shared predictors
+            
+        Returns:
+            Prediction for the newest bar
+        """
+        if len(df) == 0:
+            raise ValueError("No bars to predict on")
+        
+        close = df['close'].to_numpy(dtype=float)
+        high = df['high'].to_numpy(dtype=float)
+        low = df['low'].to_numpy(dtype=float)
+        times = df['time'].to_numpy() if 'time' in df.columns else None
+        
+        with self._state_lock:
+            state = self._feature_states.get(stream)
+            start = 0
+            replace_first = False
+            
+            if state is not None and times is not None and state.last_time is not None:
+                start = int(np.searchsorted(times, state.last_time, side='left'))
+                replace_first = start < len(times) and times[start] == state.last_time
+                
+            if state is None or times is None or not replace_first:
+                state = FeatureState()
+                start = 0
+                replace_first = False
+                self._feature_states[stream] = state
+                
+            for i in range(start, len(df)):
+                row = state.update(close[i], high[i], low[i], replace=replace_first and i == start)
+            if times is not None:
+                state.last_time = times[-1]
+                
+        X = self._scale_row(row)
+        if self.flat_forest is not None:
+            return self.flat_forest.predict_row(X)
+        return float(self.model.predict(X)[0])
+    
+    def reset_state(self, stream: Optional[str] = None) -> None:
+        """
+        Drop carried feature state.
+        
+        Args:
+            stream: Stream to reset (all streams if None)
+        """
+        with self._state_lock:
+            if stream is None:
+                self._feature_states.clear()
+            else:
+                self._feature_states.pop(stream, None)
+    
     def predict_single(self, close: float, high: float, low: float, 
                       lookback_df: Optional[pd.DataFrame] = None) -> float:
         """
@@ -222,6 +568,18 @@ class ModelPredictor:
         
         return float(pred)
     
+    def warmup(self) -> None:
+        """Run one dummy prediction so that first live calls pay no lazy-initialization cost."""
+        n_features = getattr(self.scaler, 'n_features_in_', len(FEATURE_COLS))
+        X = np.zeros((1, n_features))
+        if hasattr(self.scaler, 'feature_names_in_'):
+            X = pd.DataFrame(X, columns=self.scaler.feature_names_in_)
+        X_scaled = self.scaler.transform(X)
+        self.model.predict(X_scaled)
+        if self.flat_forest is not None:
+            self.flat_forest.predict_row(X_scaled[0])
+            self.flat_forest.predict(X_scaled)
+    
     def get_model_info(self) -> Dict:
         """Get information about loaded model."""
         info = {
@@ -243,6 +601,116 @@ class ModelPredictor:
         return info
 
 
+class ModelRegistry:
+    """
+    Process-wide cache of loaded predictors.
+    
+    Predictors are loaded lazily on first request and warmed up once.
+    Later requests return the cached instance. The artifact files are
+    re-checked at most every ``check_interval`` seconds, and a predictor
+    is reloaded when any of their modification times change.
+    """
+    
+    def __init__(self, check_interval: float = 2.0):
+        """
+        Initialize registry.
+        
+        Args:
+            check_interval: Minimum seconds between artifact mtime checks per model
+        """
+        self.check_interval = check_interval
+        self._entries: Dict[Tuple[str, str], Dict] = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _artifact_mtimes(model_dir: Path, model_name: str) -> Tuple[float, ...]:
+        """Get modification times of model, scaler, metadata and flat forest files."""
+        mtimes = []
+        for suffix in ('.pkl', '_scaler.pkl', '_metadata.json', '_flat.npz'):
+            path = model_dir / f"{model_name}{suffix}"
+            try:
+                mtimes.append(path.stat().st_mtime)
+            except FileNotFoundError:
+                if suffix in ('_metadata.json', '_flat.npz'):
+                    mtimes.append(0.0)
+                else:
+                    raise FileNotFoundError(f"Model artifact not found at {path}")
+        return tuple(mtimes)
+    
+    def get(self, model_dir: Path = Path('models'), model_name: str = 'rf_baseline') -> ModelPredictor:
+        """
+        Get a loaded predictor, loading or hot-reloading it if needed.
+        
+        Args:
+            model_dir: Directory containing model artifacts
+            model_name: Base name of model files (without extension)
+            
+        Returns:
+            Shared ModelPredictor instance
+        """
+        model_dir = Path(model_dir)
+        key = (str(model_dir.resolve()), model_name)
+        now = time.monotonic()
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry['checked_at'] < self.check_interval:
+                return entry['predictor']
+            
+            mtimes = self._artifact_mtimes(model_dir, model_name)
+            if entry is not None and entry['mtimes'] == mtimes:
+                entry['checked_at'] = now
+                return entry['predictor']
+            
+            if entry is not None:
+                logger.info(f"Model artifacts changed, reloading {model_name} from {model_dir}")
+            
+            predictor = ModelPredictor(model_dir=model_dir, model_name=model_name)
+            try:
+                predictor.warmup()
+            except Exception as e:
+                logger.warning(f"Model warm-up failed: {e}")
+            
+            self._entries[key] = {
+                'predictor': predictor,
+                'mtimes': mtimes,
+                'checked_at': now,
+            }
+            return predictor
+    
+    def clear(self) -> None:
+        """Drop all cached predictors."""
+        with self._lock:
+            self._entries.clear()
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Get the process-wide model registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+    return _registry
+
+
+def get_predictor(model_dir: Path = Path('models'), model_name: str = 'rf_baseline') -> ModelPredictor:
+    """
+    Get a shared, warmed-up predictor from the process-wide registry.
+    
+    Args:
+        model_dir: Directory containing model artifacts
+        model_name: Base name of model files (without extension)
+        
+    Returns:
+        Shared ModelPredictor instance
+    """
+    return get_model_registry().get(model_dir, model_name)
+
+
 def main():
     """Demo usage of ModelPredictor."""
     import argparse
@@ -256,7 +724,7 @@ def main():
     args = parser.parse_args()
     
     # Initialize predictor
-    predictor = ModelPredictor(model_dir=args.model_dir)
+    predictor = get_predictor(model_dir=args.model_dir)
     
     if args.show_info:
         info = predictor.get_model_info()
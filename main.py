@@ -57,8 +57,12 @@ class TradingSystem:
         # Symbol
         self.symbol = self.config['trading']['symbol']
         
-        # Tick processor
-        self.tick_processor = get_tick_processor(self.symbol)
+        # Tick processor (optionally backed by the persistent tick journal)
+        journal_config = self.config.get('tick_journal', {})
+        journal_dir = None
+        if journal_config.get('enabled', False):
+            journal_dir = Path(journal_config.get('directory', 'data/ticks'))
+        self.tick_processor = get_tick_processor(self.symbol, journal_dir=journal_dir)
         
         self.logger.info(
             "Trading system initialized",
@@ -81,7 +85,8 @@ class TradingSystem:
             await self.database.connect()
             
             # Start tick processor
-            await self.tick_processor.start(update_interval_ms=100)
+            batch_ingest = self.config.get('tick_processor', {}).get('batch_ingest', False)
+            await self.tick_processor.start(update_interval_ms=100, batch_ingest=batch_ingest)
             
             # Set running flag
             self.running = True
@@ -294,14 +294,56 @@ class TradingBot:
             logger.error("MT5 not connected")
             return None
         
+        if date_str is None:
+            date_str = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+        
         logger.info(f"Backtesting {symbol} for {date_str}...")
         
-        # Implementation would fetch historical data and simulate trades
+        # Fetch the day plus enough lookback for the features
+        day_start = datetime.strptime(date_str, '%Y-%m-%d')
+        day_end = day_start + timedelta(days=1)
+        lookback_start = day_start - timedelta(minutes=self.lookback_bars)
+        rates = mt5.copy_rates_range(symbol, mt5.TIMEFRAME_M1, lookback_start, day_end)
+        if rates is None or len(rates) == 0:
+            logger.error(f"No bars for {symbol} on {date_str}: {mt5.last_error()}")
+            return None
+        
+        df = pd.DataFrame(rates)
+        df['time'] = pd.to_datetime(df['time'], unit='s')
+        
+        # Same signal rules as generate_signals, for every bar of the day
+        preds = self.predictor.predict(df)['predictions']
+        signals = np.where(preds > 0, 1, -1)
+        signals[np.abs(preds) < self.min_prediction_strength] = 0
+        signals[(df['time'] < day_start).values] = 0
+        
+        info = mt5.symbol_info(symbol)
+        point = info.point if info else 0.0
+        contract_size = info.trade_contract_size if info else 100.0
+        
+        from backtesting.engine import run_backtest
+        
+        result = run_backtest(
+            df['close'].values,
+            signals,
+            high=df['high'].values,
+            low=df['low'].values,
+            open_=df['open'].values,
+            times=df['time'].values,
+            lot_size=self.position_size,
+            contract_size=contract_size,
+            spread=df['spread'].values * point,
+            initial_balance=0.0,
+            exit_on_signal=True,
+            reverse=True,
+            close_at_end=True,
+        )
+        
         return {
             'symbol': symbol,
             'date': date_str,
-            'trades': [],
-            'pnl': 0,
+            'trades': result.trades.to_dict('records'),
+            'pnl': float(result.trades['pnl'].sum()),
         }
 
 
@@ -1,16 +1,20 @@
-import pandas as pd
-import numpy as np
-from itertools import product
-import sys
+"""
+Grid search over SMA crossover / RSI / ATR SL-TP strategy parameters.
 
-print("=" * 70)
-print("STRATEGY PARAMETER OPTIMIZATION")
-print("=" * 70)
+The grid runs on backtesting.parameter_sweep (indicators computed once per
+period, compiled SL/TP kernel, process pool). ``backtest_params`` is the
+original row-by-row simulation of a single combination, kept as the
+reference that ``--verify`` checks the engine against.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
 
-# Load data
-data_file = 'data/XAUUSD_M1_59days.csv'
-df = pd.read_csv(data_file)
-df['time'] = pd.to_datetime(df['time'])
+from backtesting.parameter_sweep import calculate_rsi, run_parameter_sweep, RESULT_COLUMNS
+from backtesting.walk_forward import WalkForwardOptimizer
+from trading_system.utils.market_store import load_bars
 
 # Parameter ranges to test
 sma_fast_range = [5, 10, 15, 20]
@@ -19,15 +23,6 @@ rsi_period_range = [10, 14, 20]
 atr_sl_multiplier_range = [1.5, 2.0, 2.5, 3.0]
 atr_tp_multiplier_range = [2.0, 2.5, 3.0, 4.0]
 
-print(f"\nTesting parameter combinations...")
-print(f"Total combinations: {len(sma_fast_range) * len(sma_slow_range) * len(rsi_period_range) * len(atr_sl_multiplier_range) * len(atr_tp_multiplier_range)}")
-
-def calculate_rsi(data, period=14):
-    delta = data.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    return 100 - (100 / (1 + rs))
 
 def backtest_params(df, sma_fast, sma_slow, rsi_period, atr_sl_mult, atr_tp_mult):
     # Calculate indicators
@@ -111,48 +106,120 @@ def backtest_params(df, sma_fast, sma_slow, rsi_period, atr_sl_mult, atr_tp_mult
         'total_trades': len(trades),
     }
 
-# Grid search
-results = []
-total_combinations = len(list(product(sma_fast_range, sma_slow_range, rsi_period_range, atr_sl_multiplier_range, atr_tp_multiplier_range)))
-counter = 0
 
-for sma_fast, sma_slow, rsi_period, atr_sl_mult, atr_tp_mult in product(sma_fast_range, sma_slow_range, rsi_period_range, atr_sl_multiplier_range, atr_tp_multiplier_range):
-    if sma_fast >= sma_slow: 
-        continue
-    
-    counter += 1
-    if counter % 50 == 0:
-        print(f"Progress: {counter}/{total_combinations} ({counter/total_combinations*100:.1f}%)")
-    
-    result = backtest_params(df, sma_fast, sma_slow, rsi_period, atr_sl_mult, atr_tp_mult)
-    if result:
-        results.append(result)
-
-# Sort by total return
-results_df = pd.DataFrame(results)
-results_df = results_df.sort_values('total_return', ascending=False)
-
-print(f"\n" + "=" * 70)
-print(f"OPTIMIZATION RESULTS - TOP 10 PARAMETER SETS")
-print(f"=" * 70)
-print(results_df.head(10).to_string(index=False))
-
-# Save results
-results_df.to_csv('optimization_results.csv', index=False)
-print(f"\n✅ Full results saved to: optimization_results.csv")
-
-# Best parameters
-best = results_df.iloc[0]
-print(f"\n" + "=" * 70)
-print(f"BEST PARAMETERS FOUND")
-print(f"=" * 70)
-print(f"SMA Fast: {best['sma_fast']}")
-print(f"SMA Slow: {best['sma_slow']}")
-print(f"RSI Period: {best['rsi_period']}")
-print(f"ATR Stop Loss Multiplier: {best['atr_sl_mult']}")
-print(f"ATR Take Profit Multiplier: {best['atr_tp_mult']}")
-print(f"\nPerformance:")
-print(f"Total Return: {best['total_return']:.2f}%")
-print(f"Win Rate: {best['win_rate']:.1f}%")
-print(f"Profit Factor: {best['profit_factor']:.2f}")
-print(f"Total Trades: {int(best['total_trades'])}")
\ No newline at end of file
+def verify(df, results_df, samples=5, seed=0):
+    """Check random grid rows against the row-by-row reference simulation."""
+    rng = np.random.default_rng(seed)
+    for idx in rng.choice(len(results_df), size=min(samples, len(results_df)), replace=False):
+        row = results_df.iloc[idx]
+        expected = backtest_params(df, int(row['sma_fast']), int(row['sma_slow']), int(row['rsi_period']),
+                                   row['atr_sl_mult'], row['atr_tp_mult'])
+        for key in RESULT_COLUMNS:
+            if not np.isclose(row[key], expected[key], rtol=1e-9, atol=1e-9):
+                raise AssertionError(f"Mismatch for {key}: engine {row[key]} vs reference {expected[key]}")
+    print(f"✅ Verified {min(samples, len(results_df))} combinations against the reference loop")
+
+
+def run_walk_forward(df, args):
+    """Optimize on rolling train windows and report out-of-sample results."""
+    print(f"\nWalk-forward: {args.train_days} train days, {args.test_days} test days, "
+          f"step {args.step_days or args.test_days} days, objective {args.objective}")
+
+    start = time.perf_counter()
+    optimizer = WalkForwardOptimizer(
+        df, train_days=args.train_days, test_days=args.test_days, step_days=args.step_days,
+        objective=args.objective, min_trades=args.min_trades,
+    )
+    folds_df, aggregate = optimizer.run(
+        sma_fast_range, sma_slow_range, rsi_period_range,
+        atr_sl_multiplier_range, atr_tp_multiplier_range, workers=args.workers,
+    )
+    print(f"Evaluated {len(folds_df)} folds in {time.perf_counter() - start:.2f}s")
+
+    print(f"\n" + "=" * 70)
+    print(f"WALK-FORWARD RESULTS - OUT-OF-SAMPLE PER FOLD")
+    print(f"=" * 70)
+    print(folds_df.to_string(index=False))
+
+    print(f"\n" + "=" * 70)
+    print(f"OUT-OF-SAMPLE AGGREGATE")
+    print(f"=" * 70)
+    print(f"Folds: {aggregate['evaluated_folds']}/{aggregate['folds']}")
+    print(f"Total Return: {aggregate['oos_total_return']:.2f}%")
+    print(f"Mean Fold Return: {aggregate['oos_mean_fold_return']:.2f}%")
+    print(f"Profitable Folds: {aggregate['oos_profitable_folds']:.1f}%")
+    print(f"Win Rate: {aggregate['oos_win_rate']:.1f}%")
+    print(f"Profit Factor: {aggregate['oos_profit_factor']:.2f}")
+    print(f"Total Trades: {aggregate['oos_total_trades']}")
+
+    folds_df.to_csv(args.walk_forward_output, index=False)
+    print(f"\n✅ Fold results saved to: {args.walk_forward_output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Strategy parameter optimization')
+    parser.add_argument('--data-file', default='data/XAUUSD_M1_59days.csv')
+    parser.add_argument('--output', default='optimization_results.csv')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--verify', type=int, default=0, help='Check N random combinations against the reference loop')
+    parser.add_argument('--walk-forward', action='store_true', help='Rolling train/test optimization instead of one full-sample grid')
+    parser.add_argument('--train-days', type=int, default=14, help='Trading days per train window')
+    parser.add_argument('--test-days', type=int, default=7, help='Trading days per test window')
+    parser.add_argument('--step-days', type=int, default=None, help='Days between folds, at least test days (default: test days)')
+    parser.add_argument('--objective', default='total_return', choices=['total_return', 'profit_factor', 'win_rate'])
+    parser.add_argument('--min-trades', type=int, default=10, help='Minimum train trades for a parameter set')
+    parser.add_argument('--walk-forward-output', default='walk_forward_results.csv')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("STRATEGY PARAMETER OPTIMIZATION")
+    print("=" * 70)
+
+    # Load data
+    df = load_bars(args.data_file)
+
+    if args.walk_forward:
+        run_walk_forward(df, args)
+        return
+
+    print(f"\nTesting parameter combinations...")
+    print(f"Total combinations: {len(sma_fast_range) * len(sma_slow_range) * len(rsi_period_range) * len(atr_sl_multiplier_range) * len(atr_tp_multiplier_range)}")
+
+    start = time.perf_counter()
+    results_df = run_parameter_sweep(
+        df, sma_fast_range, sma_slow_range, rsi_period_range,
+        atr_sl_multiplier_range, atr_tp_multiplier_range, workers=args.workers,
+    )
+    print(f"Evaluated {len(results_df)} combinations with trades in {time.perf_counter() - start:.2f}s")
+
+    print(f"\n" + "=" * 70)
+    print(f"OPTIMIZATION RESULTS - TOP 10 PARAMETER SETS")
+    print(f"=" * 70)
+    print(results_df.head(10).to_string(index=False))
+
+    # Save results
+    results_df.to_csv(args.output, index=False)
+    print(f"\n✅ Full results saved to: {args.output}")
+
+    if args.verify:
+        verify(df, results_df, samples=args.verify)
+
+    # Best parameters
+    best = results_df.iloc[0]
+    print(f"\n" + "=" * 70)
+    print(f"BEST PARAMETERS FOUND")
+    print(f"=" * 70)
+    print(f"SMA Fast: {best['sma_fast']}")
+    print(f"SMA Slow: {best['sma_slow']}")
+    print(f"RSI Period: {best['rsi_period']}")
+    print(f"ATR Stop Loss Multiplier: {best['atr_sl_mult']}")
+    print(f"ATR Take Profit Multiplier: {best['atr_tp_mult']}")
+    print(f"\nPerformance:")
+    print(f"Total Return: {best['total_return']:.2f}%")
+    print(f"Win Rate: {best['win_rate']:.1f}%")
+    print(f"Profit Factor: {best['profit_factor']:.2f}")
+    print(f"Total Trades: {int(best['total_trades'])}")
+
+
+if __name__ == '__main__':
+    main()
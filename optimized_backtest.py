@@ -4,6 +4,9 @@ from datetime import datetime
 import sys
 import os
 
+from backtesting.engine import crossover_signals, run_backtest
+from trading_system.utils.market_store import load_bars
+
 print("=" * 70)
 print("OPTIMIZED STRATEGY BACKTEST - VALIDATION")
 print("=" * 70)
@@ -26,8 +29,7 @@ print(f"  Take Profit: {ATR_TP_MULT}x ATR")
 data_file = 'data/XAUUSD_M1_59days.csv'
 print(f"\n[1/5] Loading data from {data_file}...")
 
-df = pd.read_csv(data_file)
-df['time'] = pd.to_datetime(df['time'])
+df = load_bars(data_file)
 print(f"✅ Loaded {len(df):,} bars")
 print(f"   Period: {df['time'].min()} to {df['time'].max()}")
 
@@ -72,96 +74,32 @@ print(f"   Valid bars: {len(df):,}")
 print(f"\n[4/5] Running optimized strategy simulation...")
 
 initial_balance = 1000.0
-balance = initial_balance
-position = 0
-entry_price = 0
-entry_time = None
-trades = []
-equity_curve = [initial_balance]
-peak_balance = initial_balance
-max_drawdown_dollars = 0
-
 lot_size = 0.01
 
-for i in range(1, len(df)):
-    row = df.iloc[i]
-    prev_row = df.iloc[i-1]
-    current_price = row['close']
-    
-    # Entry signals
-    if position == 0:
-        if (prev_row['sma_fast'] <= prev_row['sma_slow'] and 
-            row['sma_fast'] > row['sma_slow'] and 
-            row['rsi'] < 70):
-            
-            position = 1
-            entry_price = current_price
-            entry_time = row['time']
-            stop_loss = entry_price - (row['atr'] * ATR_SL_MULT)
-            take_profit = entry_price + (row['atr'] * ATR_TP_MULT)
-            
-        elif (prev_row['sma_fast'] >= prev_row['sma_slow'] and 
-              row['sma_fast'] < row['sma_slow'] and 
-              row['rsi'] > 30):
-            
-            position = -1
-            entry_price = current_price
-            entry_time = row['time']
-            stop_loss = entry_price + (row['atr'] * ATR_SL_MULT)
-            take_profit = entry_price - (row['atr'] * ATR_TP_MULT)
-    
-    # Exit logic
-    elif position == 1:
-        hit_sl = current_price <= stop_loss
-        hit_tp = current_price >= take_profit
-        
-        if hit_sl or hit_tp:
-            pnl = (current_price - entry_price) * lot_size * 100
-            balance += pnl
-            trades.append({
-                'entry_time': entry_time,
-                'exit_time': row['time'],
-                'direction': 'LONG',
-                'entry_price': entry_price,
-                'exit_price': current_price,
-                'pnl': pnl,
-                'exit_reason': 'Stop Loss' if hit_sl else 'Take Profit'
-            })
-            position = 0
-            
-    elif position == -1:
-        hit_sl = current_price >= stop_loss
-        hit_tp = current_price <= take_profit
-        
-        if hit_sl or hit_tp:
-            pnl = (entry_price - current_price) * lot_size * 100
-            balance += pnl
-            trades.append({
-                'entry_time': entry_time,
-                'exit_time': row['time'],
-                'direction': 'SHORT',
-                'entry_price': entry_price,
-                'exit_price': current_price,
-                'pnl': pnl,
-                'exit_reason': 'Stop Loss' if hit_sl else 'Take Profit'
-            })
-            position = 0
-    
-    equity_curve.append(balance)
-    
-    # Track drawdown
-    if balance > peak_balance:
-        peak_balance = balance
-    drawdown = peak_balance - balance
-    if drawdown > max_drawdown_dollars:
-        max_drawdown_dollars = drawdown
+signals = crossover_signals(df['sma_fast'], df['sma_slow'], df['rsi'])
+result = run_backtest(
+    df['close'].to_numpy(),
+    signals,
+    times=df['time'].to_numpy(),
+    sl_distance=df['atr'].to_numpy() * ATR_SL_MULT,
+    tp_distance=df['atr'].to_numpy() * ATR_TP_MULT,
+    lot_size=lot_size,
+    initial_balance=initial_balance,
+)
+balance = result.final_balance
+trades_df = result.trades.drop(columns=['entry_index', 'exit_index'])
+equity_curve = result.equity
+
+# Track drawdown
+peaks = np.maximum.accumulate(equity_curve)
+peak_balance = peaks[-1]
+max_drawdown_dollars = max(float(np.max(peaks - equity_curve)), 0.0)
 
 print(f"✅ Simulation complete")
 
 # Calculate metrics
 print(f"\n[5/5] Calculating performance metrics...")
 
-trades_df = pd.DataFrame(trades)
 total_trades = len(trades_df)
 
 if total_trades > 0:
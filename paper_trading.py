@@ -4,6 +4,7 @@ import numpy as np
 from datetime import datetime
 import time
 import yaml
+from trading_system.features.technical_indicators import WindowedBarIndicators
 
 print("=" * 70)
 print("PAPER TRADING - OPTIMIZED GOLD STRATEGY")
@@ -84,9 +85,9 @@ if rates is None:
 df = pd.DataFrame(rates)
 df['time'] = pd.to_datetime(df['time'], unit='s')
 
-# Calculate indicators
-df['sma_fast'] = df['close'].rolling(window=SMA_FAST).mean()
-df['sma_slow'] = df['close'].rolling(window=SMA_SLOW).mean()
+# Calculate indicators (SMAs carried across fetches, only new bars are added)
+smas = WindowedBarIndicators({'sma_fast': SMA_FAST, 'sma_slow': SMA_SLOW})
+df = df.assign(**smas.update(rates['time'], rates['close']))
 df['rsi'] = calculate_rsi(df['close'].values, RSI_PERIOD)
 df['atr'] = df['close'].rolling(window=14).std() * 1.5  # Simplified ATR
 
@@ -119,8 +120,7 @@ try:
         
         df = pd.DataFrame(rates)
         df['time'] = pd.to_datetime(df['time'], unit='s')
-        df['sma_fast'] = df['close'].rolling(window=SMA_FAST).mean()
-        df['sma_slow'] = df['close'].rolling(window=SMA_SLOW).mean()
+        df = df.assign(**smas.update(rates['time'], rates['close']))
         df['rsi'] = calculate_rsi(df['close'].values, RSI_PERIOD)
         df['atr'] = df['close'].rolling(window=14).std() * 1.5
         
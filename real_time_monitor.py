@@ -14,6 +14,10 @@ Usage:
 
     # With CSV rolling window (for backtesting)
     python real_time_monitor.py --source csv --data-file data/XAUUSD_M1_59days.csv --interval 60
+
+    # Predict once per closed M1 bar, woken at the bar close or by the first
+    # tick of the next bar (polling the tick every --interval seconds)
+    python real_time_monitor.py --source mt5 ... --bar-seconds 60 --interval 1
 """
 from __future__ import annotations
 
@@ -26,7 +30,9 @@ from typing import Dict, Optional, Tuple
 import numpy as np
 import pandas as pd
 
-from inference import ModelPredictor
+from inference import get_predictor
+from trading_system.core.scheduler import BarClock
+from trading_system.utils.market_store import load_bars
 
 # Setup logging
 logging.basicConfig(
@@ -91,8 +97,9 @@ class DataSourceMT5:
         except Exception:
             return False
     
-    def get_candles(self, symbol: str = 'XAUUSD', timeframe: int = None, n_candles: int = 100) -> pd.DataFrame:
-        """Fetch OHLC candles from MT5."""
+    def get_candles(self, symbol: str = 'XAUUSD', timeframe: int = None, n_candles: int = 100,
+                    start_pos: int = 0) -> pd.DataFrame:
+        """Fetch OHLC candles from MT5 (``start_pos=1`` skips the forming bar)."""
         if not self.connected:
             logger.error("Not connected to MT5")
             return None
@@ -107,7 +114,7 @@ class DataSourceMT5:
                 self.connect()
                 return None
             
-            ticks = mt5.copy_rates_from_pos(symbol, timeframe, 0, n_candles)
+            ticks = mt5.copy_rates_from_pos(symbol, timeframe, start_pos, n_candles)
             
             if ticks is None:
                 error_code, error_msg = mt5.last_error()
@@ -124,6 +131,14 @@ class DataSourceMT5:
             logger.error(f"Error fetching MT5 candles: {e}")
             return None
     
+    def last_tick_time(self, symbol: str = 'XAUUSD') -> Optional[int]:
+        """Time of the latest tick in seconds (None if unavailable)."""
+        try:
+            tick = mt5.symbol_info_tick(symbol)
+            return tick.time if tick is not None else None
+        except Exception:
+            return None
+
     def disconnect(self):
         """Disconnect from MT5."""
         try:
@@ -229,10 +244,8 @@ class DataSourceCSV:
         logger.info(f"Loaded {len(self.df)} rows from {data_file}")
     
     def _load_data(self) -> pd.DataFrame:
-        """Load CSV data."""
-        df = pd.read_csv(self.data_file)
-        df['time'] = pd.to_datetime(df.get('time', df.index))
-        return df[['time', 'open', 'high', 'low', 'close']].sort_values('time').reset_index(drop=True)
+        """Load CSV data (memory-mapped columnar sidecar, OHLC columns only)."""
+        return load_bars(self.data_file, columns=['time', 'open', 'high', 'low', 'close'])
     
     def get_candles(self, n_candles: int = 100) -> pd.DataFrame:
         """
@@ -262,12 +275,14 @@ class RealTimeMonitor:
             source: Data source ('mt5', 'yfinance', 'csv')
             **source_kwargs: Arguments for data source
         """
-        self.predictor = ModelPredictor(model_dir=model_dir)
+        self.model_dir = Path(model_dir)
+        self.predictor = get_predictor(model_dir=self.model_dir)
         self.source = source
         self.data_source = self._init_data_source(source, source_kwargs)
         
         self.lookback_bars = 100
         self.lookback_data = None
+        self.last_bar_time: Dict[str, pd.Timestamp] = {}
         self.predictions = []
         self.signals = []
         
@@ -310,14 +325,15 @@ class RealTimeMonitor:
     def fetch_data(self, symbol: str = 'XAUUSD', **kwargs) -> pd.DataFrame:
         """Fetch latest data for symbol."""
         if self.source == 'mt5':
-            return self.data_source.get_candles(symbol=symbol, **kwargs)
+            # Closed bars only: a prediction per bar, made once the bar is final
+            return self.data_source.get_candles(symbol=symbol, start_pos=1, **kwargs)
         elif self.source == 'yfinance':
             return self.data_source.get_candles(symbol=symbol, **kwargs)
         elif self.source == 'csv':
             return self.data_source.get_candles(**kwargs)
     
     def run_single_iteration(self, symbol: str = 'XAUUSD') -> Dict:
-        """Run one prediction iteration."""
+        """Run one prediction iteration (None if no new bar since the last one)."""
         try:
             # Fetch data with specified symbol
             df = self.fetch_data(symbol=symbol, n_candles=self.lookback_bars)
@@ -325,11 +341,18 @@ class RealTimeMonitor:
             if df is None or len(df) == 0:
                 logger.warning(f"No data fetched for {symbol}, skipping iteration")
                 return None
+
+            # Skip recomputation while the last bar is unchanged
+            last_time = df['time'].iloc[-1]
+            if self.last_bar_time.get(symbol) == last_time:
+                logger.debug(f"No new bar for {symbol} since {last_time}")
+                return None
+            self.last_bar_time[symbol] = last_time
             
-            # Make prediction
-            result = self.predictor.predict(df)
-            pred = result['predictions'][-1]
-            close = result['close'][-1]
+            # Make prediction (picks up retrained models from the shared registry)
+            self.predictor = get_predictor(model_dir=self.model_dir)
+            pred = self.predictor.predict_latest(df, stream=symbol)
+            close = df['close'].iloc[-1]
             timestamp = df['time'].iloc[-1]
             
             # Generate signal
@@ -355,23 +378,59 @@ class RealTimeMonitor:
             logger.error(f"Error in run_single_iteration for {symbol}: {e}", exc_info=False)
             return None
     
-    def run_continuous(self, interval_seconds: int = 60, max_iterations: int = None, symbol: str = 'XAUUSD'):
+    def wait_for_bar(self, clock: BarClock, symbol: str, poll_seconds: float):
+        """
+        Block until the bar in progress closes.
+
+        Wakes at the wall-clock bar close, or earlier when the tick stream
+        (MT5 source) already shows a tick in a later bar.
+
+        Args:
+            clock: Bar clock of the monitored timeframe
+            symbol: Trading symbol
+            poll_seconds: Tick polling interval
+        """
+        import time
+
+        last_tick_time = getattr(self.data_source, 'last_tick_time', None)
+        deadline = time.time() + clock.seconds_to_close()
+        while True:
+            tick_time = last_tick_time(symbol) if last_tick_time else None
+            now = time.time()
+            # Bars are marked in tick (server) time whenever a tick is known
+            stamp = tick_time if tick_time is not None else now
+            if clock.current_bar is None or clock.is_new_bar(stamp) or now >= deadline:
+                clock.mark(stamp)
+                return
+            time.sleep(min(poll_seconds, deadline - now))
+
+    def run_continuous(self, interval_seconds: int = 60, max_iterations: int = None, symbol: str = 'XAUUSD',
+                       bar_seconds: Optional[int] = None):
         """
         Run continuous monitoring loop.
         
         Args:
-            interval_seconds: Wait time between iterations
+            interval_seconds: Wait time between iterations (tick polling
+                interval when ``bar_seconds`` is set)
             max_iterations: Max iterations (None = infinite)
             symbol: Trading symbol
+            bar_seconds: Bar length; when set, iterations are triggered by
+                bar closes instead of a fixed interval
         """
         import time
         
         logger.info(f"Starting continuous monitoring for {symbol}")
-        logger.info(f"Interval: {interval_seconds}s, Max iterations: {max_iterations}")
+        if bar_seconds:
+            logger.info(f"Trigger: {bar_seconds}s bar close, Max iterations: {max_iterations}")
+        else:
+            logger.info(f"Interval: {interval_seconds}s, Max iterations: {max_iterations}")
+        clock = BarClock(bar_seconds) if bar_seconds else None
         
         iteration = 0
         try:
             while max_iterations is None or iteration < max_iterations:
+                if clock is not None:
+                    self.wait_for_bar(clock, symbol, interval_seconds)
                 iteration += 1
                 
                 logger.info(f"\n{'='*60}")
@@ -394,7 +453,7 @@ class RealTimeMonitor:
                     self._log_result(result)
                 
                 # Wait before next iteration
-                if max_iterations is None or iteration < max_iterations:
+                if clock is None and (max_iterations is None or iteration < max_iterations):
                     logger.info(f"Waiting {interval_seconds}s until next update...")
                     time.sleep(interval_seconds)
         
@@ -455,6 +514,8 @@ def main():
                        help="CSV data file (for csv source)")
     parser.add_argument("--interval", type=float, default=1, help="Monitoring interval in seconds (for demo)")
     parser.add_argument("--iterations", type=int, help="Max iterations (default: infinite)")
+    parser.add_argument("--bar-seconds", type=int, default=None,
+                       help="Trigger on bar close of this length (e.g. 60 for M1) instead of a fixed interval")
     parser.add_argument("--model-dir", type=str, default="models", help="Model directory")
     
     args = parser.parse_args()
@@ -481,7 +542,8 @@ def main():
         monitor.run_continuous(
             interval_seconds=args.interval,
             max_iterations=args.iterations,
-            symbol=args.symbol
+            symbol=args.symbol,
+            bar_seconds=args.bar_seconds
         )
     
     except Exception as e:
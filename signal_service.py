@@ -11,22 +11,35 @@ from pathlib import Path
 from typing import List, Dict, Optional
 import requests
 
+from trading_system.utils.telegram_delivery import get_delivery_queue, AIOHTTP_AVAILABLE
+from trading_system.utils.signal_store import SignalHistoryStore
+
 logger = logging.getLogger(__name__)
 
 
 class SignalBroadcaster:
     """Broadcasts trading signals to subscriber list with TP/SL recommendations."""
     
-    def __init__(self, bot_token: str, history_file: str = "logs/signal_history.csv"):
+    def __init__(self, bot_token: str, history_file: str = "logs/signal_history.csv", delivery=None,
+                 signal_ttl: Optional[float] = 600):
         """Initialize signal broadcaster.
         
         Args:
             bot_token: Telegram bot token for signal service
-            history_file: Path to CSV file for logging signal history
+            history_file: Path to CSV file for logging signal history (the
+                indexed store lives next to it with a .db suffix)
+            delivery: TelegramDeliveryQueue to send through (None: the shared one)
+            signal_ttl: Seconds after which undelivered copies of a signal are
+                dropped as stale (None keeps them until sent)
         """
         self.bot_token = bot_token
         self.history_file = Path(history_file)
         self.api_url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+        self.delivery = delivery
+        self.signal_ttl = signal_ttl
+        # Indexed store answering history/statistics queries; the CSV is
+        # kept as an append-only export log and seeds an empty store
+        self.store = SignalHistoryStore(self.history_file.with_suffix('.db'), legacy_csv=self.history_file)
         self._ensure_history_file()
     
     def _ensure_history_file(self):
@@ -101,9 +114,17 @@ class SignalBroadcaster:
                    sl_percent: float,
                    chat_ids: List[str],
                    template: str = "detailed",
+                   wait: Optional[float] = None,
                    **kwargs) -> Dict:
         """Send signal to all subscribers.
         
+        The message is queued on the shared Telegram delivery queue, which
+        spreads it over the subscribers at Telegram's allowed rate, newest
+        signal first; the call returns at once with status 'queued' and the
+        history row is written when every subscriber has a final outcome.
+        Pass ``wait`` to block up to that many seconds for the delivery
+        result.
+        
         Args:
             symbol: Trading symbol (e.g., XAUUSD)
             signal_type: BUY or SELL
@@ -115,10 +136,12 @@ class SignalBroadcaster:
             sl_percent: SL as percentage
             chat_ids: List of telegram chat IDs to send to
             template: Format template (minimal/detailed)
+            wait: Seconds to wait for delivery (None returns immediately)
             **kwargs: Additional data (sma_fast, sma_slow, rsi, etc.)
         
         Returns:
-            Dict with status, sent_count, failed_count, errors
+            Dict with status, sent_count, failed_count, queued_count, total, failed_ids
+            and delivery latency percentiles (latency_p50/p90/p99/max, seconds)
         """
         try:
             # Format message
@@ -133,50 +156,31 @@ class SignalBroadcaster:
                     kwargs.get('rsi')
                 )
             
-            # Send to all subscribers
-            sent_count = 0
-            failed_count = 0
-            failed_ids = []
-            
-            for chat_id in chat_ids:
-                try:
-                    response = requests.post(
-                        self.api_url,
-                        json={
-                            'chat_id': chat_id,
-                            'text': message,
-                            'parse_mode': 'HTML'
-                        },
-                        timeout=10
-                    )
-                    
-                    if response.status_code == 200:
-                        sent_count += 1
-                        logger.info(f"Signal sent to {chat_id}: {symbol} {signal_type}")
-                    else:
-                        failed_count += 1
-                        failed_ids.append(chat_id)
-                        logger.warning(f"Failed to send to {chat_id}: {response.text}")
-                
-                except Exception as e:
-                    failed_count += 1
-                    failed_ids.append(chat_id)
-                    logger.error(f"Error sending to {chat_id}: {e}")
-            
-            # Log to history
-            self._log_signal(
-                symbol, signal_type, price, ml_score, tp_price, sl_price,
-                tp_percent, sl_percent, sent_count, failed_count, failed_ids
-            )
-            
-            status = "success" if failed_count == 0 else "partial"
-            return {
-                'status': status,
-                'sent_count': sent_count,
-                'failed_count': failed_count,
-                'total': len(chat_ids),
-                'failed_ids': failed_ids
-            }
+            if not AIOHTTP_AVAILABLE:
+                return self._send_blocking(
+                    message, symbol, signal_type, price, ml_score, tp_price, sl_price,
+                    tp_percent, sl_percent, chat_ids
+                )
+
+            def log_outcome(batch):
+                result = batch.result()
+                logger.info(f"Signal {symbol} {signal_type} delivered to {result['sent_count']}/{result['total']} "
+                            f"(latency p50 {result['latency_p50']:.2f}s, p90 {result['latency_p90']:.2f}s, "
+                            f"p99 {result['latency_p99']:.2f}s, max {result['latency_max']:.2f}s)")
+                self._log_signal(
+                    symbol, signal_type, price, ml_score, tp_price, sl_price,
+                    tp_percent, sl_percent, result['sent_count'], result['failed_count'], result['failed_ids']
+                )
+
+            delivery = self.delivery or get_delivery_queue()
+            batch = delivery.submit(self.bot_token, chat_ids, message, 'HTML', on_complete=log_outcome,
+                                    newest_first=True, ttl=self.signal_ttl)
+            if wait is not None:
+                batch.wait(wait)
+            result = batch.result()
+            logger.info(f"Signal {symbol} {signal_type}: {result['status']} "
+                        f"({result['sent_count']} sent, {result['queued_count']} queued)")
+            return result
         
         except Exception as e:
             logger.error(f"Error in send_signal: {e}")
@@ -192,16 +196,88 @@ class SignalBroadcaster:
                 'failed_count': len(chat_ids)
             }
     
+    def _send_blocking(self, message: str, symbol: str, signal_type: str, price: float, ml_score: float,
+                       tp_price: float, sl_price: float, tp_percent: float, sl_percent: float,
+                       chat_ids: List[str]) -> Dict:
+        """Send to every subscriber in series (fallback without aiohttp)."""
+        sent_count = 0
+        failed_count = 0
+        failed_ids = []
+        
+        for chat_id in chat_ids:
+            try:
+                response = requests.post(
+                    self.api_url,
+                    json={
+                        'chat_id': chat_id,
+                        'text': message,
+                        'parse_mode': 'HTML'
+                    },
+                    timeout=10
+                )
+                
+                if response.status_code == 200:
+                    sent_count += 1
+                    logger.info(f"Signal sent to {chat_id}: {symbol} {signal_type}")
+                else:
+                    failed_count += 1
+                    failed_ids.append(chat_id)
+                    logger.warning(f"Failed to send to {chat_id}: {response.text}")
+            
+            except Exception as e:
+                failed_count += 1
+                failed_ids.append(chat_id)
+                logger.error(f"Error sending to {chat_id}: {e}")
+        
+        # Log to history
+        self._log_signal(
+            symbol, signal_type, price, ml_score, tp_price, sl_price,
+            tp_percent, sl_percent, sent_count, failed_count, failed_ids
+        )
+        
+        status = "success" if failed_count == 0 else "partial"
+        return {
+            'status': status,
+            'sent_count': sent_count,
+            'failed_count': failed_count,
+            'total': len(chat_ids),
+            'failed_ids': failed_ids
+        }
+    
     def _log_signal(self, symbol: str, signal_type: str, price: float, ml_score: float,
                    tp_price: float, sl_price: float, tp_percent: float, sl_percent: float,
                    sent_count: int, failed_count: int, chat_ids_sent: List[str] = None,
                    error_msg: str = ""):
-        """Log signal to CSV history."""
+        """Log signal to the history store and the CSV export log."""
+        now = datetime.now()
+        status = "success" if failed_count == 0 else "partial"
+        chat_ids = ",".join(chat_ids_sent) if chat_ids_sent else ""
+        
+        try:
+            self.store.add({
+                'timestamp': now.timestamp(),
+                'symbol': symbol,
+                'signal_type': signal_type,
+                'price': price,
+                'ml_score': ml_score,
+                'tp_price': tp_price,
+                'sl_price': sl_price,
+                'tp_percent': tp_percent,
+                'sl_percent': sl_percent,
+                'chat_ids_sent': chat_ids,
+                'sent_count': sent_count,
+                'failed_count': failed_count,
+                'status': status,
+                'error_message': error_msg,
+            })
+        except Exception as e:
+            logger.error(f"Error storing signal: {e}")
+        
         try:
             with open(self.history_file, 'a', newline='') as f:
                 writer = csv.writer(f)
                 writer.writerow([
-                    datetime.now().isoformat(),
+                    now.isoformat(),
                     symbol,
                     signal_type,
                     f"{price:.2f}",
@@ -210,70 +286,33 @@ class SignalBroadcaster:
                     f"{sl_price:.2f}",
                     f"{tp_percent:.2f}",
                     f"{sl_percent:.2f}",
-                    ",".join(chat_ids_sent) if chat_ids_sent else "",
-                    "success" if failed_count == 0 else "partial",
+                    chat_ids,
+                    status,
                     error_msg
                 ])
         except Exception as e:
             logger.error(f"Error logging signal: {e}")
     
-    def get_signal_history(self, limit: int = 50) -> List[Dict]:
+    def get_signal_history(self, limit: int = 50, symbol: Optional[str] = None) -> List[Dict]:
         """Get recent signals from history.
         
         Args:
             limit: Maximum number of records to return
+            symbol: Only signals of this symbol (all if None)
         
         Returns:
-            List of signal records
+            List of signal records, newest first
         """
-        history = []
         try:
-            with open(self.history_file, 'r') as f:
-                reader = csv.DictReader(f)
-                for i, row in enumerate(reader):
-                    if i >= limit:
-                        break
-                    history.insert(0, row)  # Reverse order (newest first)
+            return self.store.latest(limit, symbol)
         except Exception as e:
             logger.error(f"Error reading signal history: {e}")
-        
-        return history
+            return []
     
-    def get_statistics(self) -> Dict:
-        """Get signal statistics from history."""
+    def get_statistics(self, symbol: Optional[str] = None) -> Dict:
+        """Get signal statistics (overall with a per-symbol breakdown, or for one symbol)."""
         try:
-            with open(self.history_file, 'r') as f:
-                reader = csv.DictReader(f)
-                records = list(reader)
-            
-            if not records:
-                return {
-                    'total_signals': 0,
-                    'buy_signals': 0,
-                    'sell_signals': 0,
-                    'success_rate': 0,
-                    'total_sent': 0,
-                    'total_failed': 0
-                }
-            
-            total = len(records)
-            buys = sum(1 for r in records if r['signal_type'] == 'BUY')
-            sells = sum(1 for r in records if r['signal_type'] == 'SELL')
-            successes = sum(1 for r in records if r['status'] == 'success')
-            
-            total_sent = sum(int(r.get('chat_ids_sent', '').count(',') + 1) 
-                            for r in records if r.get('chat_ids_sent'))
-            total_failed = sum(int(r.get('error_message', '') != '') for r in records)
-            
-            return {
-                'total_signals': total,
-                'buy_signals': buys,
-                'sell_signals': sells,
-                'success_rate': (successes / total * 100) if total > 0 else 0,
-                'total_sent': total_sent,
-                'total_failed': total_failed
-            }
-        
+            return self.store.get_statistics(symbol)
         except Exception as e:
             logger.error(f"Error getting statistics: {e}")
             return {}
@@ -452,13 +452,15 @@ class SignalServiceTab(QWidget):
                 tp_percent=self.config.signal_tp_percent,
                 sl_percent=self.config.signal_sl_percent,
                 chat_ids=chat_ids,
-                template=self.config.signal_template
+                template=self.config.signal_template,
+                wait=15
             )
             
             QMessageBox.information(
                 self, "Test Signal Sent",
                 f"✓ Sent to {result['sent_count']}/{len(chat_ids)} subscribers\n"
                 f"Failed: {result['failed_count']}"
+                + (f"\nStill queued: {result['queued_count']}" if result.get('queued_count') else "")
             )
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to send test signal: {e}")
@@ -530,6 +532,11 @@ class SignalServiceTab(QWidget):
                 ("Failed Broadcasts", str(stats.get('total_failed', 0))),
                 ("BUY/SELL Ratio", f"{stats.get('buy_signals', 0)}/{stats.get('sell_signals', 0)}"),
             ]
+            for symbol, symbol_stats in stats.get('by_symbol', {}).items():
+                metrics.append((
+                    f"{symbol} Signals / Success",
+                    f"{symbol_stats['total_signals']} / {symbol_stats['success_rate']:.1f}%"
+                ))
             
             for idx, (metric, value) in enumerate(metrics):
                 self.stats_table.insertRow(idx)
@@ -1,10 +1,12 @@
-import MetaTrader5 as mt5
 import pandas as pd
 import numpy as np
 from datetime import datetime
 import sys
 import os
 
+from backtesting.engine import crossover_signals, run_backtest
+from trading_system.utils.market_store import load_bars
+
 print("=" * 70)
 print("SIMPLE BACKTESTING ENGINE FOR GOLD HFT STRATEGY")
 print("=" * 70)
@@ -27,8 +29,7 @@ if not os.path.exists(data_file):
     print("   Please run download_data.py first!")
     sys.exit(1)
 
-df = pd.read_csv(data_file)
-df['time'] = pd.to_datetime(df['time'])
+df = load_bars(data_file)
 print(f"✅ Loaded {len(df):,} bars")
 print(f"   Period: {df['time'].min()} to {df['time'].max()}")
 
@@ -82,80 +83,29 @@ print(f"   Valid bars after indicators: {len(df):,}")
 print(f"\n[4/5] Running strategy simulation...")
 
 initial_balance = 1000.0
-balance = initial_balance
-position = 0  # 0 = no position, 1 = long, -1 = short
-entry_price = 0
-trades = []
-equity_curve = [initial_balance]
 
 risk_per_trade = 0.005  # 0.5% (conservative)
 lot_size = 0.01
 
-for i in range(1, len(df)):
-    row = df.iloc[i]
-    prev_row = df.iloc[i-1]
-    
-    current_price = row['close']
-    
-    # Entry signals
-    if position == 0:
-        # Long signal:  Fast SMA crosses above Slow SMA + RSI < 70
-        if (prev_row['sma_fast'] <= prev_row['sma_slow'] and 
-            row['sma_fast'] > row['sma_slow'] and 
-            row['rsi'] < 70):
-            
-            position = 1
-            entry_price = current_price
-            stop_loss = entry_price - (row['atr'] * 2)
-            take_profit = entry_price + (row['atr'] * 3)
-            
-        # Short signal: Fast SMA crosses below Slow SMA + RSI > 30
-        elif (prev_row['sma_fast'] >= prev_row['sma_slow'] and 
-              row['sma_fast'] < row['sma_slow'] and 
-              row['rsi'] > 30):
-            
-            position = -1
-            entry_price = current_price
-            stop_loss = entry_price + (row['atr'] * 2)
-            take_profit = entry_price - (row['atr'] * 3)
-    
-    # Exit logic
-    elif position == 1:  # Long position
-        if current_price <= stop_loss or current_price >= take_profit:
-            pnl = (current_price - entry_price) * lot_size * 100
-            balance += pnl
-            trades.append({
-                'entry_time': df.iloc[i-1]['time'],
-                'exit_time': row['time'],
-                'direction':  'LONG',
-                'entry_price': entry_price,
-                'exit_price': current_price,
-                'pnl': pnl
-            })
-            position = 0
-            
-    elif position == -1:  # Short position
-        if current_price >= stop_loss or current_price <= take_profit:
-            pnl = (entry_price - current_price) * lot_size * 100
-            balance += pnl
-            trades.append({
-                'entry_time':  df.iloc[i-1]['time'],
-                'exit_time': row['time'],
-                'direction': 'SHORT',
-                'entry_price': entry_price,
-                'exit_price':  current_price,
-                'pnl': pnl
-            })
-            position = 0
-    
-    equity_curve.append(balance)
+signals = crossover_signals(df['sma_fast'], df['sma_slow'], df['rsi'])
+result = run_backtest(
+    df['close'].to_numpy(),
+    signals,
+    times=df['time'].to_numpy(),
+    sl_distance=df['atr'].to_numpy() * 2,
+    tp_distance=df['atr'].to_numpy() * 3,
+    lot_size=lot_size,
+    initial_balance=initial_balance,
+)
+balance = result.final_balance
+trades_df = result.trades.drop(columns=['entry_index', 'exit_index', 'exit_reason'])
+equity_curve = result.equity
 
 print(f"✅ Simulation complete")
 
 # Calculate metrics
 print(f"\n[5/5] Calculating performance metrics...")
 
-trades_df = pd.DataFrame(trades)
 total_trades = len(trades_df)
 
 if total_trades > 0:
@@ -28,7 +28,7 @@ try:
 except ImportError:
     raise ImportError("Streamlit required: pip install streamlit plotly pandas")
 
-from inference import ModelPredictor
+from inference import ModelPredictor, get_predictor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -67,10 +67,9 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-@st.cache_resource
 def load_predictor(model_dir: str = "models") -> ModelPredictor:
-    """Load ML model (cached)."""
-    return ModelPredictor(model_dir=model_dir)
+    """Load ML model (shared registry, hot-reloaded when model files change)."""
+    return get_predictor(model_dir=model_dir)
 
 
 @st.cache_data(ttl=30)
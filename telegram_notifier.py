@@ -2,17 +2,38 @@ import requests
 import json
 from datetime import datetime
 
+from trading_system.utils.telegram_delivery import get_delivery_queue, AIOHTTP_AVAILABLE
+
 class TelegramNotifier:
-    def __init__(self, bot_token, chat_ids):  # chat_ids: list or str
+    def __init__(self, bot_token, chat_ids, delivery=None):  # chat_ids: list or str
         self.bot_token = bot_token
         if isinstance(chat_ids, str):
             self.chat_ids = [chat_ids]
         else:
             self.chat_ids = chat_ids
         self.base_url = f"https://api.telegram.org/bot{bot_token}"
-    
-    def send_message(self, message, parse_mode="HTML"):
-        """Kirim ke SEMUA chat_id dalam list"""
+        # Shared background delivery queue (None: the global one)
+        self.delivery = delivery
+    
+    def send_message(self, message, parse_mode="HTML", wait=None):
+        """Kirim ke SEMUA chat_id dalam list
+
+        The message is handed to the background delivery queue and this
+        returns immediately (True once queued). With `wait` seconds it
+        blocks until delivered and returns True only if every chat got it.
+        Without aiohttp it falls back to blocking sends.
+        """
+        if not AIOHTTP_AVAILABLE:
+            return self._send_blocking(message, parse_mode)
+
+        delivery = self.delivery or get_delivery_queue()
+        batch = delivery.submit(self.bot_token, self.chat_ids, message, parse_mode)
+        if wait is None:
+            return True
+        return batch.wait(wait) and batch.result()['status'] == 'success'
+
+    def _send_blocking(self, message, parse_mode="HTML"):
+        """Send to every chat in series (fallback without aiohttp)"""
         success = True
         for chat_id in self.chat_ids:
             try:
@@ -158,7 +179,7 @@ def test_telegram():
     
     # Test 1: Simple message
     print("\n[1/5] Testing simple message...")
-    if notifier.send_message("🤖 Test message from trading bot! "):
+    if notifier.send_message("🤖 Test message from trading bot! ", wait=30):
         print("✅ Simple message sent!")
     else:
         print("❌ Failed to send simple message")
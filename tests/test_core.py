@@ -1,6 +1,7 @@
 """Basic unit tests for core components."""
 import pytest
 import asyncio
+from contextlib import contextmanager
 from pathlib import Path
 
 
@@ -69,6 +70,345 @@ class TestDatabase:
         assert trade_id > 0
         
         await db.close()
+    
+    async def test_write_behind_batches(self, tmp_path):
+        """Test buffered batches, the durable barrier and tick-rate inserts."""
+        import sqlite3
+        from trading_system.utils.database import TradingDatabase
+        
+        db_path = tmp_path / 'trading.db'
+        db = TradingDatabase(db_path, batch_size=500, flush_interval=0.05)
+        await db.connect()
+        
+        def count(table):
+            with sqlite3.connect(str(db_path)) as conn:
+                return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        
+        with sqlite3.connect(str(db_path)) as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        
+        await db.insert_performance({'equity': 1000.0, 'balance': 1000.0})
+        ticks = [{'timestamp': 1.0 + i / 1000, 'bid': 2000.0, 'ask': 2000.5} for i in range(20000)]
+        assert await db.insert_ticks('XAUUSD', ticks) == 20000
+        
+        # A durable order commits everything buffered before it
+        order_id = await db.insert_order({'symbol': 'XAUUSD', 'order_type': 'buy', 'volume': 0.01,
+                                          'price': 2000.5, 'status': 'filled'})
+        assert order_id > 0
+        assert count('ticks_19700101') == 20000
+        assert count('performance') == 1
+        stats = db.get_write_stats()
+        assert stats['rows_written'] == 20002
+        assert stats['batches'] < 100
+        assert stats['pending'] == 0
+        
+        # Buffered rows reach disk on the flush interval
+        await db.insert_ticks('XAUUSD', ticks[:10])
+        await asyncio.sleep(0.3)
+        assert count('ticks_19700101') == 20010
+        
+        await db.insert_performance({'equity': 1001.0, 'balance': 1000.0})
+        await db.close()
+        assert count('performance') == 2
+    
+    async def test_close_during_flush(self, tmp_path):
+        """Test that close waits for a running flush and a cancelled commit keeps its rows."""
+        from trading_system.utils.database import TradingDatabase
+        
+        start = 1_704_067_200_000
+        ticks = [{'time_msc': start + i, 'bid': 2000.0, 'ask': 2000.5} for i in range(100000)]
+        db = TradingDatabase(tmp_path / 'trading.db', batch_size=10 ** 6, flush_interval=60, max_pending=10 ** 6)
+        await db.connect()
+        
+        # A commit cancelled mid-transaction restores its rows and rolls back
+        await db.insert_ticks('XAUUSD', ticks)
+        task = asyncio.create_task(db.flush())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert db.get_write_stats()['pending'] == 100000
+        
+        # The flusher is now busy with the batch when close is called
+        db.batch_size = 1000
+        await db.insert_ticks('XAUUSD', [{'time_msc': start + 100000 + i, 'bid': 2000.0, 'ask': 2000.5}
+                                         for i in range(100000)])
+        await asyncio.sleep(0.01)
+        await db.close()
+        
+        db = TradingDatabase(tmp_path / 'trading.db')
+        await db.connect()
+        assert len(await db.get_ticks('XAUUSD')) == 200000
+        await db.close()
+    
+    async def test_tick_partitions_and_rollups(self, tmp_path):
+        """Test day partitions, incremental M1/M5 rollups, range reads and pruning."""
+        from trading_system.utils.database import TradingDatabase
+        
+        day_ms = 86_400_000
+        start = 1_704_067_200_000  # 2024-01-01 00:00 UTC
+        db = TradingDatabase(tmp_path / 'trading.db', tick_retention_days=2)
+        await db.connect()
+        
+        # Two batches into the same M1 bar: rollups merge across inserts
+        await db.insert_ticks('XAUUSD', [
+            {'time_msc': start + 1_000, 'bid': 2000.0, 'ask': 2000.5, 'volume': 1.0},
+            {'time_msc': start + 2_000, 'bid': 2003.0, 'ask': 2003.5, 'volume': 1.0},
+        ])
+        await db.flush()
+        await db.insert_ticks('XAUUSD', [
+            {'time_msc': start + 59_000, 'bid': 1999.0, 'ask': 1999.5, 'volume': 2.0},
+            {'time_msc': start + 500, 'bid': 2001.0, 'ask': 2001.5, 'volume': 1.0},
+            {'time_msc': start + 61_000, 'bid': 2002.0, 'ask': 2002.5, 'volume': 1.0},
+        ])
+        await db.insert_ticks('EURUSD', [{'time_msc': start + 1_000, 'bid': 1.1, 'ask': 1.1001}])
+        
+        bars = await db.get_bars('XAUUSD', 'M1')
+        assert [b['time'] for b in bars] == [start // 1000, start // 1000 + 60]
+        first = bars[0]
+        assert (first['open'], first['high'], first['low'], first['close']) == (2001.0, 2003.0, 1999.0, 1999.0)
+        assert first['tick_volume'] == 4 and first['volume'] == 5.0
+        m5 = await db.get_bars('XAUUSD', 'M5')
+        assert len(m5) == 1 and m5[0]['tick_volume'] == 5 and m5[0]['close'] == 2002.0
+        
+        ticks = await db.get_ticks('XAUUSD', start + 1_000, start + 60_000)
+        assert [t['time_msc'] for t in ticks] == [start + 1_000, start + 2_000, start + 59_000]
+        assert len(await db.get_ticks('EURUSD')) == 1
+        
+        # Ticks on later days create new partitions; days beyond retention are dropped
+        for day in range(1, 4):
+            await db.insert_ticks('XAUUSD', [{'time_msc': start + day * day_ms, 'bid': 2010.0, 'ask': 2010.5}])
+            await db.flush()
+        async with db._conn.execute("SELECT day FROM tick_partitions ORDER BY day") as cursor:
+            days = [row[0] for row in await cursor.fetchall()]
+        assert days == ['20240102', '20240103', '20240104']
+        assert await db.get_ticks('XAUUSD', start, start + day_ms - 1) == []
+        # Bars outlive their tick partitions
+        assert len(await db.get_bars('XAUUSD', 'M1')) == 5
+        await db.close()
+
+
+class TestMarketStore:
+    """Test columnar market data store."""
+
+    def test_partitioned_write_and_read(self, tmp_path):
+        """Test month partitions, merge on overlap, projection and time filters."""
+        pytest.importorskip("pyarrow")
+        import numpy as np
+        import pandas as pd
+        from trading_system.utils.market_store import MarketDataStore
+
+        times = pd.date_range('2024-01-31 23:55', periods=10, freq='min')
+        df = pd.DataFrame({'time': times, 'close': np.arange(10.0), 'tick_volume': np.arange(10)})
+
+        store = MarketDataStore(tmp_path)
+        store.write('XAUUSD', 'M1', df.iloc[:7])
+        update = df.iloc[5:].copy()
+        update['close'] += 100
+        store.write('XAUUSD', 'M1', update)
+
+        assert [p.stem for p in store.partitions('XAUUSD', 'M1')] == ['2024-01', '2024-02']
+        bars = store.read('XAUUSD', 'M1', columns=['close'])
+        assert list(bars.columns) == ['time', 'close']
+        assert bars['close'].tolist() == [0, 1, 2, 3, 4, 105, 106, 107, 108, 109]
+        assert len(store.read('XAUUSD', 'M1', start=times[3], end=times[6])) == 4
+        assert store.last_time('XAUUSD', 'M1') == times[-1]
+
+    def test_csv_sidecar_conversion(self, tmp_path):
+        """Test that CSVs convert on first use and reconvert when changed."""
+        pytest.importorskip("pyarrow")
+        import os
+        import pandas as pd
+        from trading_system.utils.market_store import load_bars, csv_cache_path
+
+        csv_path = tmp_path / 'XAUUSD_M1_1days.csv'
+        pd.DataFrame({'time': ['2024-01-01 00:01:00', '2024-01-01 00:00:00'], 'close': [2.0, 1.0]}).to_csv(csv_path, index=False)
+
+        bars = load_bars(csv_path)
+        assert csv_cache_path(csv_path).exists()
+        assert pd.api.types.is_datetime64_any_dtype(bars['time'])
+        assert bars['close'].tolist() == [1.0, 2.0]
+
+        pd.DataFrame({'time': ['2024-01-01 00:00:00'], 'close': [5.0]}).to_csv(csv_path, index=False)
+        os.utime(csv_path, ns=(0, 10**9))
+        assert load_bars(csv_path, columns=['close'])['close'].tolist() == [5.0]
+
+    def test_canonical_csv_name(self, tmp_path):
+        """Test that canonical and legacy download names parse alike."""
+        from trading_system.utils.market_store import canonical_csv_path, parse_csv_name
+
+        path = canonical_csv_path(tmp_path, 'GOLD.ls', 'M1')
+        assert path.name == 'GOLD.ls_M1_history.csv'
+        assert parse_csv_name(path) == ('GOLD.ls', 'M1')
+        assert parse_csv_name(tmp_path / 'GOLD.ls_M1_59days.csv') == ('GOLD.ls', 'M1')
+
+    def test_canonical_csv_reads_store(self, tmp_path):
+        """Test that synced datasets load from the partitioned store, other CSVs from sidecars."""
+        pytest.importorskip("pyarrow")
+        import pandas as pd
+        from trading_system.utils.market_store import (
+            MarketDataStore, canonical_csv_path, csv_cache_path, load_bars, load_dataset, store_root
+        )
+
+        times = pd.date_range('2024-01-31 23:58', periods=4, freq='min')
+        bars = pd.DataFrame({'time': times, 'open': 1.0, 'close': [1.0, 2.0, 3.0, 4.0]})
+        MarketDataStore(store_root(tmp_path)).write('XAUUSD', 'M1', bars)
+        canonical = canonical_csv_path(tmp_path, 'XAUUSD', 'M1')
+        bars.to_csv(canonical, index=False)
+
+        df = load_bars(canonical, columns=['time', 'close'])
+        assert list(df.columns) == ['time', 'close']
+        assert df['close'].tolist() == [1.0, 2.0, 3.0, 4.0]
+        assert not csv_cache_path(canonical).exists()
+        assert load_dataset('XAUUSD', 'M1', tmp_path, columns=['close'])['close'].tolist() == [1.0, 2.0, 3.0, 4.0]
+
+        # A legacy snapshot of the same symbol is its own data, read through a sidecar
+        snapshot = tmp_path / 'XAUUSD_M1_1days.csv'
+        bars.iloc[:2].to_csv(snapshot, index=False)
+        assert len(load_bars(snapshot)) == 2
+        assert csv_cache_path(snapshot).exists()
+
+    def test_incremental_sync(self, tmp_path, monkeypatch):
+        """Test that a sync fetches only from the last stored bar and dedupes."""
+        pytest.importorskip("pyarrow")
+        import sys
+        from unittest import mock
+        import numpy as np
+        import pandas as pd
+
+        monkeypatch.setitem(sys.modules, 'MetaTrader5', mock.MagicMock())
+        import download_data
+        from trading_system.utils.market_store import MarketDataStore
+
+        def rates(start, n, close):
+            times = (pd.date_range(start, periods=n, freq='min') - pd.Timestamp(0)) // pd.Timedelta('1s')
+            return np.array(list(zip(times, np.full(n, close))), dtype=[('time', 'i8'), ('close', 'f8')])
+
+        calls = []
+        monkeypatch.setattr(download_data.mt5, 'copy_rates_range',
+                            lambda symbol, tf, start, end: calls.append(start) or
+                            (rates('2024-01-01', 5, 1.0) if len(calls) == 1 else rates('2024-01-01 00:04', 3, 2.0)))
+
+        store = MarketDataStore(tmp_path / 'store')
+        path, fetched = download_data.sync_symbol('XAUUSD', output_dir=str(tmp_path), store=store)
+        assert fetched == 5
+        path, fetched = download_data.sync_symbol('XAUUSD', output_dir=str(tmp_path), store=store)
+        assert fetched == 3
+        assert pd.Timestamp(calls[1]).tz_convert(None) == pd.Timestamp('2024-01-01 00:04')
+
+        bars = pd.read_csv(path)
+        assert len(bars) == 7
+        assert bars['time'].is_unique
+        assert bars['close'].tolist() == [1.0] * 4 + [2.0] * 3
+        assert store.read('XAUUSD', 'M1')['close'].tolist() == bars['close'].tolist()
+
+        # Without a store the CSV tail is the resume point and is appended to the same way
+        calls.clear()
+        plain = tmp_path / 'plain'
+        plain.mkdir()
+        download_data.sync_symbol('XAUUSD', output_dir=str(plain))
+        path, fetched = download_data.sync_symbol('XAUUSD', output_dir=str(plain))
+        assert pd.Timestamp(calls[1]).tz_convert(None) == pd.Timestamp('2024-01-01 00:04')
+        assert pd.read_csv(path)['close'].tolist() == [1.0] * 4 + [2.0] * 3
+
+
+class TestTickBuffer:
+    """Test tick ring buffer."""
+    
+    def test_ring_buffer_wraparound(self):
+        """Test that the buffer keeps the newest ticks in order."""
+        import numpy as np
+        from trading_system.core.tick_processor import TickBuffer
+        from trading_system.core.tick_data import TickData
+        
+        buffer = TickBuffer(max_size=5)
+        
+        for i in range(12):
+            buffer.add_tick(TickData(float(i), 2000.0 + i, 2000.5 + i, 0.0, 1, 0, 0, 0.0))
+            
+        timestamps = np.arange(100.0, 103.0)
+        buffer.add_ticks(timestamps, timestamps, timestamps + 1.0, np.ones(3))
+        
+        recent = buffer.get_recent_ticks(10)
+        assert buffer.size == 5
+        assert list(recent['timestamps']) == [10.0, 11.0, 100.0, 101.0, 102.0]
+        assert list(recent['spreads']) == [0.5, 0.5, 1.0, 1.0, 1.0]
+        assert buffer.get_latest_tick()['mid_price'] == 102.5
+
+
+    def test_tick_journal_roundtrip(self, tmp_path):
+        """Test that journaled ticks survive reopening and split by day."""
+        import numpy as np
+        from trading_system.core.tick_journal import TickJournal, JOURNAL_DTYPE
+        
+        records = np.zeros(10, dtype=JOURNAL_DTYPE)
+        records['time_msc'] = 86_400_000 - 5000 + np.arange(10) * 1000
+        records['bid'] = np.arange(10)
+        
+        journal = TickJournal(tmp_path, 'XAUUSD', grow_records=4)
+        journal.append(records)
+        journal.close()
+        
+        reopened = TickJournal(tmp_path, 'XAUUSD')
+        assert reopened.days() == ['19700101', '19700102']
+        assert list(reopened.tail(3)['bid']) == [7.0, 8.0, 9.0]
+        assert len(reopened.tail(100)) == 10
+
+    def test_batch_cursor_dedupes_and_pages(self, monkeypatch):
+        """Test that batch ingestion skips seen ticks and pages past a crowded second."""
+        import sys
+        from unittest import mock
+        import numpy as np
+
+        monkeypatch.setitem(sys.modules, 'MetaTrader5', mock.MagicMock())
+        from trading_system.core.tick_processor import TickProcessor
+
+        dtype = [('time', 'i8'), ('bid', 'f8'), ('ask', 'f8'), ('last', 'f8'), ('volume', 'u8'),
+                 ('time_msc', 'i8'), ('flags', 'u4'), ('volume_real', 'f8')]
+        history = np.zeros(10, dtype=dtype)
+        history['time_msc'] = [1000, 1500, 1500, 1500, 2000, 2000, 2000, 2000, 2000, 2500]
+        history['time'] = history['time_msc'] // 1000
+        history['bid'] = np.arange(10)
+        history['ask'] = history['bid'] + 1
+
+        class Connector:
+            """copy_ticks_from pages by whole seconds."""
+            def __init__(self):
+                self.counts = []
+
+            async def get_ticks_array(self, symbol, from_time_msc, count):
+                self.counts.append(count)
+                start = int(np.searchsorted(history['time_msc'], from_time_msc // 1000 * 1000))
+                ticks = history[start:start + count]
+                return ticks if len(ticks) else None
+
+        processor = TickProcessor('XAUUSD', buffer_size=100)
+        processor.connector = Connector()
+
+        async def poll():
+            ticks, full = await processor._fetch_new(max_batch=2)
+            if len(ticks):
+                processor._ingest_batch(ticks)
+            return list(ticks['bid']), full
+
+        # First batch ends inside ms 1500
+        assert asyncio.run(poll()) == ([0.0, 1.0], True)
+        assert (processor._last_time_msc, processor._last_msc_count) == (1500, 1)
+        # The seen ticks fill the batch: the request grows, duplicates of ms 1500 are skipped
+        assert asyncio.run(poll()) == ([2.0, 3.0], True)
+        assert (processor._last_time_msc, processor._last_msc_count) == (1500, 3)
+        # The cursor moves past the last ms
+        assert asyncio.run(poll()) == ([4.0, 5.0, 6.0, 7.0], True)
+        assert (processor._last_time_msc, processor._last_msc_count) == (2000, 4)
+        # A full batch inside one already-seen ms does not stall
+        processor.connector.counts.clear()
+        assert asyncio.run(poll()) == ([8.0, 9.0], False)
+        assert processor.connector.counts == [2, 4, 8]
+        assert (processor._last_time_msc, processor._last_msc_count) == (2500, 1)
+        # Caught up
+        assert asyncio.run(poll()) == ([], False)
+
+        assert list(processor.buffer.bids) == list(history['bid'])
 
 
 class TestMicrostructure:
@@ -87,6 +427,239 @@ class TestMicrostructure:
             
         vpin_value = vpin.calculate_vpin()
         assert 0 <= vpin_value <= 1.0
+        
+    def test_batch_update_matches_per_tick(self):
+        """Test that batch updates reproduce per-tick updates."""
+        import numpy as np
+        from trading_system.features.microstructure import MicrostructureAnalyzer
+        
+        rng = np.random.default_rng(42)
+        bids = 2000.0 + np.cumsum(rng.choice([-0.01, 0.0, 0.01], 3000))
+        asks = bids + rng.choice([0.1, 0.2, 0.3], 3000)
+        volumes = rng.integers(1, 5, 3000).astype(float)
+        
+        per_tick = MicrostructureAnalyzer()
+        for bid, ask, volume in zip(bids, asks, volumes):
+            per_tick.update(bid, ask, volume)
+            
+        batched = MicrostructureAnalyzer()
+        for chunk in np.array_split(np.arange(3000), 7):
+            batched.update_batch(bids[chunk], asks[chunk], volumes[chunk])
+            
+        expected = per_tick.get_analysis()
+        actual = batched.get_analysis()
+        assert actual['vpin'] == pytest.approx(expected['vpin'])
+        assert actual['entropy'] == pytest.approx(expected['entropy'])
+        assert actual['order_imbalance'] == pytest.approx(expected['order_imbalance'])
+        assert actual['spread_stats']['std'] == pytest.approx(expected['spread_stats']['std'])
+
+
+class TestHawkesProcess:
+    """Test Hawkes process."""
+    
+    def test_recursive_likelihood_matches_direct_sum(self):
+        """Test the O(n) likelihood against the direct O(n^2) sum."""
+        import numpy as np
+        from trading_system.features.hawkes_process import exponential_log_likelihood_fast
+        
+        timestamps = np.cumsum(np.random.default_rng(0).exponential(0.5, 200))
+        mu, alpha, beta = 1.2, 0.4, 1.5
+        
+        ll = 0.0
+        for i in range(len(timestamps)):
+            excitation = np.sum(np.exp(-beta * (timestamps[i] - timestamps[:i])))
+            ll += np.log(mu + alpha * beta * excitation)
+        ll -= mu * (timestamps[-1] - timestamps[0])
+        ll -= alpha * np.sum(1 - np.exp(-beta * (timestamps[-1] - timestamps)))
+        
+        nll, grad = exponential_log_likelihood_fast(timestamps, mu, alpha, beta)
+        assert nll == pytest.approx(-ll)
+        assert grad.shape == (3,)
+        
+    def test_streaming_intensity(self):
+        """Test the O(1) intensity against the full event sum."""
+        import numpy as np
+        from trading_system.features.hawkes_process import HawkesProcess
+        
+        hawkes = HawkesProcess(window_seconds=5.0)
+        for t in np.round(np.cumsum(np.random.default_rng(1).exponential(0.2, 300)), 1):
+            hawkes.add_event(t)
+            
+        t = hawkes.event_times[-1] + 0.25
+        expected = hawkes.mu + sum(
+            hawkes.alpha * hawkes.beta * np.exp(-hawkes.beta * (t - e))
+            for e in hawkes.event_times
+        )
+        assert hawkes.calculate_intensity(t) == pytest.approx(expected)
+
+
+class TestRegimeDetection:
+    """Test HMM regime detection."""
+    
+    def test_forward_filter_matches_posterior(self):
+        """Test that streaming filter probabilities match the batch posterior."""
+        import numpy as np
+        from trading_system.features.regime_detection import RegimeDetector
+        
+        rng = np.random.default_rng(0)
+        scale = np.repeat(rng.uniform(0.5, 3.0, 12), 50)
+        data = {
+            'close': 2000.0 + np.cumsum(rng.normal(0, 0.3, 600) * scale),
+            'volume': rng.integers(10, 500, 600).astype(float),
+        }
+        history = {key: values[:500] for key, values in data.items()}
+        
+        detector = RegimeDetector(n_states=3, n_iter=10)
+        detector.fit(history)
+        detector.seed_filter(history)
+        for close, volume in zip(data['close'][500:], data['volume'][500:]):
+            detector.update_regime(close, volume)
+            
+        expected = detector.get_regime_probabilities(data)[-1]
+        assert np.allclose(detector.get_filtered_probabilities(), expected, atol=1e-6)
+
+
+class TestModelRegistry:
+    """Test shared model registry."""
+    
+    def test_registry_caches_and_hot_reloads(self, tmp_path):
+        """Test that predictors are shared and reloaded when artifacts change."""
+        import os
+        import joblib
+        import numpy as np
+        from sklearn.ensemble import RandomForestRegressor
+        from sklearn.preprocessing import StandardScaler
+        from inference import ModelRegistry
+        
+        X = np.random.default_rng(0).normal(size=(50, 8))
+        joblib.dump(RandomForestRegressor(n_estimators=2).fit(X, X[:, 0]), tmp_path / 'rf_baseline.pkl')
+        joblib.dump(StandardScaler().fit(X), tmp_path / 'rf_baseline_scaler.pkl')
+        
+        registry = ModelRegistry(check_interval=0.0)
+        first = registry.get(tmp_path)
+        assert registry.get(tmp_path) is first
+        
+        model_path = tmp_path / 'rf_baseline.pkl'
+        mtime = model_path.stat().st_mtime + 10
+        os.utime(model_path, (mtime, mtime))
+        assert registry.get(tmp_path) is not first
+
+    def test_bot_signal_uses_predict_latest(self, tmp_path, monkeypatch):
+        """Test that the bot skips the registry without a model and otherwise predicts incrementally."""
+        import sys
+        from types import SimpleNamespace
+        from unittest import mock
+        import pandas as pd
+        import inference
+
+        monkeypatch.setitem(sys.modules, 'MetaTrader5', mock.MagicMock())
+        import trading_system
+        import auto_trading
+
+        streams = []
+        score = []
+
+        class Predictor:
+            def predict_latest(self, df, stream='default'):
+                streams.append(stream)
+                return score[0]
+
+        monkeypatch.setattr(inference, 'get_predictor', lambda model_dir: Predictor())
+        monkeypatch.chdir(tmp_path)
+        bot = auto_trading.AutoTradingBot.__new__(auto_trading.AutoTradingBot)
+        bot.config = SimpleNamespace(SYMBOL='XAUUSD', ATR_SL_MULT=1.0, ATR_TP_MULT=2.0)
+        df = pd.DataFrame({'time': [0, 60], 'close': [2000.0, 2001.0], 'high': [2001.0, 2002.0],
+                           'low': [1999.0, 2000.0], 'sma_fast': [1.0, 3.0], 'sma_slow': [2.0, 2.0],
+                           'rsi': [50.0, 50.0], 'atr': [1.0, 1.0]})
+
+        # No model file: technical signal only, registry untouched
+        assert bot.detect_signal(df)['ml_score'] == 0.0
+        assert streams == []
+
+        (tmp_path / 'models').mkdir()
+        (tmp_path / 'models' / 'rf_baseline.pkl').touch()
+        score.append(0.5)
+        assert bot.detect_signal(df)['ml_score'] == 0.5
+        score[0] = -0.5
+        assert bot.detect_signal(df) is None
+        assert streams == ['XAUUSD', 'XAUUSD']
+
+    def test_predict_latest_matches_full_path(self, tmp_path):
+        """Test that carried feature state reproduces the full prediction path."""
+        import joblib
+        import numpy as np
+        import pandas as pd
+        from sklearn.ensemble import RandomForestRegressor
+        from sklearn.preprocessing import StandardScaler
+        from inference import ModelPredictor, FEATURE_COLS
+
+        rng = np.random.default_rng(0)
+        close = 2000.0 + np.cumsum(rng.normal(0, 0.5, 120))
+        df = pd.DataFrame({
+            'time': pd.date_range('2024-01-01', periods=len(close), freq='min'),
+            'close': close,
+            'high': close + rng.uniform(0, 1, len(close)),
+            'low': close - rng.uniform(0, 1, len(close)),
+        })
+
+        features = ModelPredictor.add_technical_features(None, df)[FEATURE_COLS].fillna(0)
+        scaler = StandardScaler().fit(features.to_numpy())
+        model = RandomForestRegressor(n_estimators=5, random_state=0)
+        model.fit(scaler.transform(features.to_numpy()), rng.normal(size=len(df)))
+        joblib.dump(model, tmp_path / 'rf_baseline.pkl')
+        joblib.dump(scaler, tmp_path / 'rf_baseline_scaler.pkl')
+
+        predictor = ModelPredictor(model_dir=tmp_path)
+        for end in (1, 2, 15, 31, 60, 61, 120):
+            history = df.iloc[:end]
+            # Forming version of the newest bar, replaced on the next call
+            forming = history.copy()
+            forming.loc[forming.index[-1], 'close'] += 0.3
+            predictor.predict_latest(forming)
+
+            expected = predictor.predict(history)['predictions'][-1]
+            assert predictor.predict_latest(history) == pytest.approx(expected)
+
+
+class TestFlatForest:
+    """Test flattened forest evaluator."""
+
+    @staticmethod
+    def _check_parity(model, X):
+        import numpy as np
+        from inference import FlatForest
+
+        flat = FlatForest.from_model(model)
+        assert np.array_equal(flat.predict(X), model.predict(X))
+        for row in X[:20]:
+            assert flat.predict_row(row) == model.predict(row.reshape(1, -1))[0]
+
+    def test_flat_forest_matches_sklearn(self, tmp_path):
+        """Test identical batch and single-row outputs on a fitted forest."""
+        import numpy as np
+        from sklearn.ensemble import RandomForestRegressor
+        from inference import FlatForest, export_flat_forest
+
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(500, 8))
+        X[rng.random(X.shape) < 0.02] = np.nan
+        model = RandomForestRegressor(n_estimators=50, random_state=0).fit(X, rng.normal(size=500))
+        self._check_parity(model, rng.normal(size=(200, 8)))
+
+        path = export_flat_forest(model, tmp_path, 'rf_baseline')
+        assert np.array_equal(FlatForest.load(path).predict(X), model.predict(X))
+
+    def test_flat_forest_shipped_model(self):
+        """Test parity against the shipped model files."""
+        import joblib
+        import numpy as np
+
+        model_path = Path(__file__).resolve().parents[1] / 'models' / 'rf_baseline.pkl'
+        if not model_path.exists():
+            pytest.skip("Shipped model rf_baseline.pkl not present")
+        model = joblib.load(model_path)
+        X = np.random.default_rng(0).normal(size=(200, model.n_features_in_))
+        self._check_parity(model, X)
 
 
 class TestTechnicalIndicators:
@@ -103,6 +676,617 @@ class TestTechnicalIndicators:
         
         atr = TechnicalIndicators.atr(high, low, close, period=3)
         assert len(atr) == len(close)
+        
+    def test_rolling_kernels(self):
+        """Test rolling mean/std against direct window computation."""
+        import numpy as np
+        from trading_system.features.technical_indicators import TechnicalIndicators
+        
+        values = 2000.0 + np.cumsum(np.random.default_rng(0).normal(0, 0.5, 500))
+        window = 21
+        
+        mean = TechnicalIndicators.rolling_mean(values, window)
+        std = TechnicalIndicators.rolling_std(values, window)
+        for i in (0, 5, 20, 21, 250, 499):
+            chunk = values[max(0, i - window + 1):i + 1]
+            assert mean[i] == pytest.approx(np.mean(chunk))
+            assert std[i] == pytest.approx(np.std(chunk), abs=1e-9)
+            
+    def test_compiled_zscore_and_bollinger(self):
+        """Test compiled z-score and Bollinger Bands against direct windows."""
+        import numpy as np
+        from trading_system.features.technical_indicators import TechnicalIndicators
+        
+        prices = 2000.0 + np.cumsum(np.random.default_rng(1).normal(0, 0.5, 300))
+        zscore = TechnicalIndicators.zscore(prices, window=20)
+        upper, middle, lower = TechnicalIndicators.bollinger_bands(prices, period=20)
+        
+        assert zscore[19] == 0.0 and middle[18] == 0.0
+        for i in (20, 150, 299):
+            window = prices[i - 19:i + 1]
+            assert zscore[i] == pytest.approx((prices[i] - window.mean()) / window.std())
+            assert middle[i] == pytest.approx(window.mean())
+            assert upper[i] - lower[i] == pytest.approx(4 * window.std())
+            
+    def test_incremental_indicators_match_batch(self):
+        """Test streaming indicators against batch versions, including bar replacement."""
+        import numpy as np
+        from trading_system.features.technical_indicators import (
+            TechnicalIndicators, IncrementalEMA, IncrementalRSI, IncrementalATR
+        )
+        
+        rng = np.random.default_rng(2)
+        close = 2000.0 + np.cumsum(rng.normal(0, 1, 200))
+        high = close + rng.uniform(0, 1, 200)
+        low = close - rng.uniform(0, 1, 200)
+        
+        ema, rsi, atr = IncrementalEMA(20), IncrementalRSI(14), IncrementalATR(14)
+        for i in range(200):
+            # Feed a provisional forming bar first, then the final one
+            ema.update(close[i] + 1.0)
+            rsi.update(close[i] + 1.0)
+            atr.update(high[i] + 1.0, low[i], close[i])
+            ema.update(close[i], replace=True)
+            rsi.update(close[i], replace=True)
+            atr.update(high[i], low[i], close[i], replace=True)
+            
+        assert ema.value == pytest.approx(TechnicalIndicators.ema(close, 20)[-1])
+        assert rsi.value == pytest.approx(TechnicalIndicators.rsi(close, 14)[-1])
+        assert atr.value == pytest.approx(TechnicalIndicators.atr(high, low, close, 14)[-1])
+
+    def test_windowed_indicators_match_callers(self):
+        """Test carried SMA/ATR columns against the bot's per-window pandas computation."""
+        import numpy as np
+        import pandas as pd
+        from trading_system.features.technical_indicators import WindowedBarIndicators
+
+        rng = np.random.default_rng(3)
+        n = 400
+        times = np.arange(n) * 60
+        close = 2000.0 + np.cumsum(rng.normal(0, 1, n))
+        high = close + rng.uniform(0, 1, n)
+        low = close - rng.uniform(0, 1, n)
+
+        def expected(window):
+            df = pd.DataFrame({'close': close[window], 'high': high[window], 'low': low[window]})
+            tr = pd.concat([df['high'] - df['low'], (df['high'] - df['close'].shift()).abs(),
+                            (df['low'] - df['close'].shift()).abs()], axis=1).max(axis=1)
+            return {'sma_fast': df['close'].rolling(window=5).mean().values,
+                    'sma_slow': df['close'].rolling(window=50).mean().values,
+                    'atr': tr.rolling(window=14).mean().values}
+
+        def check(columns, window):
+            for name, values in expected(window).items():
+                assert np.array_equal(np.isnan(columns[name]), np.isnan(values))
+                assert np.allclose(columns[name], values, rtol=0, atol=1e-9, equal_nan=True)
+
+        indicators = WindowedBarIndicators({'sma_fast': 5, 'sma_slow': 50}, atr_period=14)
+        for end in list(range(100, 300)) + list(range(320, n)):
+            # Sliding window of 100 bars; the newest bar is first seen while forming
+            window = slice(end - 100, end)
+            forming_close, forming_high = close[window].copy(), high[window].copy()
+            forming_close[-1] += 3.0
+            forming_high[-1] += 3.0
+            indicators.update(times[window], forming_close, forming_high, low[window])
+            check(indicators.update(times[window], close[window], high[window], low[window]), window)
+
+        # A window that does not continue the previous one is rebuilt
+        check(indicators.update(times[:60], close[:60], high[:60], low[:60]), slice(0, 60))
+
+
+class TestParameterSweep:
+    """Test vectorized parameter sweep."""
+
+    def test_sweep_matches_row_by_row_backtest(self):
+        """Test engine metrics against the reference loop, in-process and pooled."""
+        import numpy as np
+        import pandas as pd
+        from backtesting.parameter_sweep import ParameterSweep
+        from optimize_strategy import backtest_params
+
+        rng = np.random.default_rng(3)
+        close = 2000.0 + np.cumsum(rng.normal(0, 0.5, 1500))
+        df = pd.DataFrame({
+            'close': close,
+            'high': close + rng.uniform(0, 1, 1500),
+            'low': close - rng.uniform(0, 1, 1500),
+        })
+
+        sweep = ParameterSweep(df)
+        grid = ([5, 10], [20, 30], [10, 14], [1.5, 2.0], [2.0, 3.0])
+        results = sweep.run(*grid, workers=1)
+        assert len(results) == 32
+
+        for _, row in results.iterrows():
+            expected = backtest_params(df, int(row['sma_fast']), int(row['sma_slow']), int(row['rsi_period']),
+                                       row['atr_sl_mult'], row['atr_tp_mult'])
+            for key, value in expected.items():
+                assert row[key] == pytest.approx(value)
+
+        pooled = sweep.run(*grid, workers=2)
+        pd.testing.assert_frame_equal(pooled, results)
+
+    def test_walk_forward_out_of_sample(self):
+        """Test fold windows and out-of-sample metrics against the backtest engine."""
+        import numpy as np
+        import pandas as pd
+        from backtesting.engine import crossover_signals, run_backtest
+        from backtesting.parameter_sweep import calculate_atr, calculate_rsi
+        from backtesting.walk_forward import WalkForwardOptimizer
+
+        rng = np.random.default_rng(5)
+        n = 8 * 600
+        close = 2000.0 + np.cumsum(rng.normal(0, 0.5, n))
+        df = pd.DataFrame({
+            'time': pd.Timestamp('2024-01-01') + pd.to_timedelta(np.arange(n) // 600, unit='D')
+                    + pd.to_timedelta(np.arange(n) % 600, unit='min'),
+            'close': close,
+            'high': close + rng.uniform(0, 1, n),
+            'low': close - rng.uniform(0, 1, n),
+        })
+
+        with pytest.raises(ValueError):
+            WalkForwardOptimizer(df, train_days=3, test_days=2, step_days=1)
+
+        optimizer = WalkForwardOptimizer(df, train_days=2, test_days=2, min_trades=1)
+        assert optimizer.folds() == [(0, 1200, 1200, 2400), (1200, 2400, 2400, 3600), (2400, 3600, 3600, 4800)]
+
+        grid = ([5, 10], [20, 30], [14], [1.5, 2.0], [2.0, 3.0])
+        folds, aggregate = optimizer.run(*grid, workers=1)
+        assert len(folds) == 3
+        assert aggregate['oos_total_trades'] == folds['total_trades'].sum()
+        assert aggregate['oos_total_return'] == pytest.approx(folds['total_return'].sum())
+
+        for fold, (_, _, test_start, test_end) in zip(folds.itertuples(), optimizer.folds()):
+            window = df.iloc[test_start:test_end]
+            sma_fast = df['close'].rolling(fold.sma_fast).mean().iloc[test_start:test_end]
+            sma_slow = df['close'].rolling(fold.sma_slow).mean().iloc[test_start:test_end]
+            rsi = calculate_rsi(df['close'], fold.rsi_period).iloc[test_start:test_end]
+            atr = calculate_atr(df).iloc[test_start:test_end]
+            result = run_backtest(window['close'], crossover_signals(sma_fast, sma_slow, rsi),
+                                  sl_distance=atr * fold.atr_sl_mult, tp_distance=atr * fold.atr_tp_mult,
+                                  close_at_end=True)
+            assert result.summary()['total_return'] == pytest.approx(fold.total_return)
+            assert result.summary()['total_trades'] == fold.total_trades
+
+        pooled, _ = optimizer.run(*grid, workers=2)
+        pd.testing.assert_frame_equal(pooled, folds)
+
+
+class TestBacktestEngine:
+    """Test unified backtest engine."""
+
+    def test_crossover_strategy_matches_reference(self):
+        """Test close-based SL/TP backtest against the row-by-row reference loop."""
+        import numpy as np
+        import pandas as pd
+        from backtesting.engine import crossover_signals, run_backtest
+        from backtesting.parameter_sweep import calculate_atr, calculate_rsi
+        from optimize_strategy import backtest_params
+
+        rng = np.random.default_rng(4)
+        close = 2000.0 + np.cumsum(rng.normal(0, 0.5, 2000))
+        df = pd.DataFrame({
+            'close': close,
+            'high': close + rng.uniform(0, 1, 2000),
+            'low': close - rng.uniform(0, 1, 2000),
+        })
+        df['sma_fast'] = df['close'].rolling(10).mean()
+        df['sma_slow'] = df['close'].rolling(30).mean()
+        df['rsi'] = calculate_rsi(df['close'], 14)
+        df['atr'] = calculate_atr(df, 14)
+        df = df.dropna()
+
+        result = run_backtest(
+            df['close'], crossover_signals(df['sma_fast'], df['sma_slow'], df['rsi']),
+            sl_distance=df['atr'] * 2.0, tp_distance=df['atr'] * 3.0,
+        )
+        summary = result.summary()
+        expected = backtest_params(df[['close', 'high', 'low']], 10, 30, 14, 2.0, 3.0)
+        assert summary['total_trades'] == expected['total_trades']
+        assert summary['total_return'] == pytest.approx(expected['total_return'])
+        assert summary['win_rate'] == pytest.approx(expected['win_rate'])
+        assert len(result.equity) == len(df)
+
+    def test_intrabar_stops_and_spread(self):
+        """Test high/low stop fills, gap fills, spread cost and signal exits."""
+        import numpy as np
+        from backtesting.engine import run_backtest
+
+        open_ = np.array([100.0, 100.0, 101.0, 97.0, 100.0])
+        high = np.array([100.5, 101.5, 103.5, 98.0, 100.5])
+        low = np.array([99.5, 99.5, 100.5, 96.0, 99.5])
+        close = np.array([100.0, 101.0, 102.0, 97.5, 100.0])
+
+        # Long at ask 100.5 with TP 2.0 away: bar 2 high reaches 102.5
+        result = run_backtest(close, [1, 0, 0, 0, 0], high=high, low=low, open_=open_,
+                              sl_distance=2.0, tp_distance=2.0, spread=0.5, intrabar=True)
+        trade = result.trades.iloc[0]
+        assert (trade['entry_price'], trade['exit_price'], trade['exit_reason']) == (100.5, 102.5, 'Take Profit')
+        assert trade['pnl'] == pytest.approx(2.0)
+
+        # Long from bar 2 at 102.0: bar 3 gaps below the 100.0 stop and fills at the open
+        result = run_backtest(close, [0, 0, 1, 0, 0], high=high, low=low, open_=open_,
+                              sl_distance=2.0, tp_distance=5.0, intrabar=True)
+        assert result.trades['exit_price'].tolist() == [97.0]
+        assert result.trades['exit_reason'].tolist() == ['Stop Loss']
+
+        # Long-only signal trading: sells only close longs
+        result = run_backtest(close, [1, -1, -1, 1, -1], allow_short=False, exit_on_signal=True)
+        assert result.trades['direction'].tolist() == ['LONG', 'LONG']
+        assert result.trades['pnl'].tolist() == pytest.approx([1.0, 2.5])
+        assert result.equity[-1] == pytest.approx(1003.5)
+
+    def test_reverse_on_every_bar(self):
+        """Test alternating signals in reverse mode, which close a trade on every bar."""
+        import numpy as np
+        from backtesting.engine import run_backtest
+
+        n = 20
+        close = 100.0 + np.arange(n, dtype=float)
+        signals = np.where(np.arange(n) % 2 == 0, 1, -1)
+        result = run_backtest(close, signals, exit_on_signal=True, reverse=True, close_at_end=True)
+        assert len(result.trades) == n
+        assert result.trades['exit_reason'].tolist() == ['Signal'] * (n - 1) + ['End of Data']
+        assert result.trades['exit_index'].tolist() == list(range(1, n)) + [n - 1]
+        assert result.trades['direction'].tolist()[:2] == ['LONG', 'SHORT']
+
+        signals = np.where(np.arange(200000) % 2 == 0, 1, -1)
+        result = run_backtest(100.0 + np.zeros(200000), signals, exit_on_signal=True, reverse=True)
+        assert len(result.trades) == 199999
+
+
+class TestSymbolScheduler:
+    """Test multi-symbol pipeline scheduling."""
+
+    def test_cadence_and_serialized_cycles(self):
+        """Test per-symbol cadence, one-at-a-time terminal access and stop."""
+        import threading
+        import time
+        from trading_system.core.scheduler import SymbolScheduler
+
+        scheduler = SymbolScheduler()
+        active = []
+        overlaps = []
+        threads = set()
+
+        def job(symbol):
+            def cycle():
+                active.append(symbol)
+                overlaps.append(len(active))
+                threads.add(threading.get_ident())
+                time.sleep(0.005)
+                active.remove(symbol)
+                return 0.5 if symbol == 'SLOW' else None
+            return cycle
+
+        scheduler.add('FAST', job('FAST'), interval=0.02)
+        scheduler.add('OTHER', job('OTHER'), interval=0.02)
+        scheduler.add('SLOW', job('SLOW'), interval=0.02)
+
+        async def main():
+            task = asyncio.create_task(scheduler.run())
+            await asyncio.sleep(0.3)
+            scheduler.stop()
+            await asyncio.wait_for(task, timeout=2)
+
+        asyncio.run(main())
+        stats = scheduler.get_stats()
+        assert max(overlaps) == 1
+        assert len(threads) == 1
+        assert stats['FAST']['cycles'] >= 8
+        assert abs(stats['FAST']['cycles'] - stats['OTHER']['cycles']) <= 1
+        assert stats['SLOW']['cycles'] == 1
+
+    def test_bar_clock(self):
+        """Test bar-close detection from tick times."""
+        from trading_system.core.scheduler import BarClock
+
+        clock = BarClock(60)
+        assert clock.is_new_bar(1000.0)
+        clock.mark(1000.0)
+        assert clock.current_bar == 960.0
+        assert not clock.is_new_bar(1019.9)
+        assert clock.is_new_bar(1020.0)
+        assert clock.seconds_to_close(1000.0) == 20.0
+
+    def test_bot_cycle_leaves_interval_to_scheduler(self, monkeypatch):
+        """Test bar-close retries of the full cycle and when a cycle overrides the interval."""
+        import sys
+        from types import SimpleNamespace
+        from unittest import mock
+        from trading_system.core.scheduler import BarClock
+
+        monkeypatch.setitem(sys.modules, 'MetaTrader5', mock.MagicMock())
+        import trading_system
+        import auto_trading
+
+        calls = []
+        outcomes = []
+
+        def full_cycle():
+            calls.append('full')
+            outcome = outcomes.pop(0)
+            if outcome == 'evaluated':
+                bot.signal_pending = False
+                return None
+            return outcome
+
+        bot = auto_trading.AutoTradingBot.__new__(auto_trading.AutoTradingBot)
+        bot.config = SimpleNamespace(BAR_CLOSE_TRIGGER=True, SYMBOL='XAUUSD', CHECK_INTERVAL=10)
+        bot.interval = 5
+        bot.bar_clock = BarClock(60)
+        bot.signal_pending = False
+        bot.monitor_ticks = lambda: calls.append('ticks')
+        bot.run_full_cycle = full_cycle
+        monkeypatch.setattr(auto_trading.mt5, 'symbol_info_tick', lambda symbol: SimpleNamespace(time=1000.0))
+        monkeypatch.setattr(bot.bar_clock, 'seconds_to_close', lambda: 30.0)
+
+        # New bar, but the cycle exits early (risk halt): its back-off wins
+        outcomes[:] = [1, None, 'evaluated']
+        assert bot.run_cycle() == 1
+        # Same bar: the full cycle is retried until the signal was evaluated
+        assert bot.run_cycle() is None
+        assert bot.run_cycle() is None
+        # Then only the tick path runs; the bar close comes before the next regular wake-up
+        monkeypatch.setattr(bot.bar_clock, 'seconds_to_close', lambda: 2.0)
+        assert bot.run_cycle() == pytest.approx(2.05)
+        assert calls == ['full', 'full', 'full', 'ticks']
+
+        bot.config.BAR_CLOSE_TRIGGER = False
+        outcomes[:] = [None]
+        assert bot.run_cycle() is None
+
+
+@contextmanager
+def _telegram_server(reply):
+    """
+    Run a local stand-in for the Telegram Bot API.
+
+    Args:
+        reply: Called with each decoded request body, returns (status, JSON reply)
+
+    Yields:
+        Base URL of the server
+    """
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            status, body = reply(json.loads(self.rfile.read(int(self.headers['Content-Length']))))
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        request_queue_size = 128
+
+    server = Server(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class TestTelegramDelivery:
+    """Test the asynchronous Telegram delivery queue."""
+
+    def test_latency_percentiles_nearest_rank(self):
+        """Test that latency percentiles pick the nearest-rank value."""
+        from trading_system.utils.telegram_delivery import _percentile
+
+        ten = [float(v) for v in range(1, 11)]
+        assert _percentile(ten, 50) == 5.0
+        assert _percentile(ten, 90) == 9.0
+        assert _percentile(ten, 100) == 10.0
+        assert _percentile(ten, 0) == 1.0
+        hundred = [float(v) for v in range(1, 101)]
+        assert _percentile(hundred, 99) == 99.0
+        assert _percentile(hundred, 50) == 50.0
+        assert _percentile([], 50) == 0.0
+
+    def test_fan_out_rate_limit_and_pending(self, tmp_path):
+        """Test concurrent fan-out, 429 retry, permanent failures and persistence."""
+        pytest.importorskip("aiohttp")
+        import json
+        import time
+        from trading_system.utils.telegram_delivery import TelegramDeliveryQueue
+
+        received = []
+        limited = set()
+
+        def reply(body):
+            chat_id = body['chat_id']
+            received.append(chat_id)
+            if chat_id == 'limited' and chat_id not in limited:
+                limited.add(chat_id)
+                return 429, {'ok': False, 'parameters': {'retry_after': 0.2}}
+            if chat_id == 'bad':
+                return 400, {'ok': False, 'description': 'chat not found'}
+            if chat_id == 'down':
+                return 502, {'ok': False}
+            return 200, {'ok': True}
+
+        pending = tmp_path / 'pending.jsonl'
+        with _telegram_server(reply) as api_url:
+            queue = TelegramDeliveryQueue(api_url=api_url, max_attempts=2, retry_delay=0.05,
+                                          pending_file=pending)
+            try:
+                completed = []
+                started = time.perf_counter()
+                batch = queue.submit('TOKEN', ['a', 'b', 'limited', 'bad'], 'hello',
+                                     on_complete=completed.append)
+                assert time.perf_counter() - started < 0.5
+                assert batch.wait(5)
+                result = batch.result()
+                assert result['status'] == 'partial'
+                assert result['sent_count'] == 3
+                assert result['failed_ids'] == ['bad']
+                assert received.count('limited') == 2
+                assert completed == [batch]
+
+                # 5xx is retried, then persisted once attempts are exhausted
+                down = queue.submit('TOKEN', ['down'], 'hello')
+                assert down.wait(5)
+                assert down.result()['status'] == 'failed'
+                assert received.count('down') == 2
+                records = [json.loads(line) for line in pending.read_text().splitlines()]
+                assert [r['chat_id'] for r in records] == ['down']
+                assert 'TOKEN' not in pending.read_text()
+            finally:
+                queue.stop()
+
+        # Persisted messages wait for their bot's token, then are re-queued
+        restarted = TelegramDeliveryQueue(api_url=api_url, pending_file=pending)
+        restarted.start()
+        assert not pending.exists()
+        restarted.stop(timeout=0.5)
+        assert [json.loads(line)['bot'] for line in pending.read_text().splitlines()] == [records[0]['bot']]
+
+        restarted = TelegramDeliveryQueue(api_url=api_url, pending_file=pending)
+        restarted.start()
+        restarted.submit('OTHER', [], 'nothing')
+        restarted.flush(0.2)
+        assert restarted.get_stats()['parked'] == 1
+        restarted.submit('TOKEN', [], 'nothing')
+        restarted.flush(0.2)
+        assert restarted.get_stats()['parked'] == 0
+        restarted.stop(timeout=0.5)
+        assert pending.exists()
+        assert 'TOKEN' not in pending.read_text()
+
+    def test_rate_limited_newest_first(self):
+        """Test global/per-chat token buckets and newest-first broadcast ordering."""
+        pytest.importorskip("aiohttp")
+        import time
+        from trading_system.utils.telegram_delivery import TelegramDeliveryQueue, TokenBucket
+
+        bucket = TokenBucket(rate=2, capacity=1)
+        now = bucket.updated
+        assert bucket.ready_at(now) == now
+        bucket.consume(now)
+        assert bucket.ready_at(now) == pytest.approx(now + 0.5)
+
+        received = []
+
+        def reply(body):
+            received.append((time.time(), body['chat_id'], body['text']))
+            return 200, {'ok': True}
+
+        with _telegram_server(reply) as api_url:
+            queue = TelegramDeliveryQueue(api_url=api_url, pending_file=None, global_rate=40, chat_rate=10)
+            try:
+                queue.start()
+                started = time.time()
+                # Direct messages go first and use up the burst, so both broadcasts are throttled
+                warmup = queue.submit('TOKEN', [f"w{i}" for i in range(40)], 'warmup')
+                old = queue.submit('TOKEN', [f"o{i}" for i in range(40)], 'old', newest_first=True)
+                new = queue.submit('TOKEN', [f"n{i}" for i in range(20)], 'new', newest_first=True)
+                stale = queue.submit('TOKEN', ['s0'], 'stale', newest_first=True, ttl=0)
+                direct = queue.submit('TOKEN', ['me'] * 3, 'direct')
+                assert all(batch.wait(10) for batch in (warmup, old, new, stale, direct))
+                elapsed = time.time() - started
+
+                # 103 sends at 40/s after a burst of 40
+                assert elapsed >= 1.4
+                texts = [text for _, _, text in received if text != 'warmup']
+                assert len(texts) == 63
+                assert stale.result()['status'] == 'failed'
+                assert queue.get_stats()['expired'] == 1
+                # Direct messages are released before broadcasts, the newer broadcast before the older
+                last_new = max(i for i, t in enumerate(texts) if t == 'new')
+                assert texts[-1] == 'old'
+                assert last_new < len(texts) - 10
+                # One chat is held to its own rate
+                me = [t for t, chat, _ in received if chat == 'me']
+                assert min(b - a for a, b in zip(me, me[1:])) >= 0.09
+                result = new.result()
+                assert 0 < result['latency_p50'] <= result['latency_p90'] <= result['latency_max']
+            finally:
+                queue.stop()
+
+    def test_chat_order_kept_across_retries(self):
+        """Test that later messages for a chat wait behind one being retried."""
+        pytest.importorskip("aiohttp")
+        from trading_system.utils.telegram_delivery import TelegramDeliveryQueue
+
+        received = []
+        failed = set()
+
+        def reply(body):
+            received.append((body['chat_id'], body['text']))
+            if body['text'] == 'm1' and 'm1' not in failed:
+                failed.add('m1')
+                return 502, {'ok': False}
+            return 200, {'ok': True}
+
+        with _telegram_server(reply) as api_url:
+            queue = TelegramDeliveryQueue(api_url=api_url, pending_file=None, retry_delay=0.2, chat_rate=100)
+            try:
+                batches = [queue.submit('TOKEN', ['x'], text) for text in ('m1', 'm2', 'm3')]
+                other = queue.submit('TOKEN', ['y'], 'other')
+                assert all(batch.wait(5) for batch in batches + [other])
+
+                assert [text for chat, text in received if chat == 'x'] == ['m1', 'm1', 'm2', 'm3']
+                # Other chats are not held behind the retry
+                assert received.index(('y', 'other')) < received.index(('x', 'm2'))
+                assert queue.get_stats()['held'] == 0
+            finally:
+                queue.stop()
+
+
+class TestSignalHistoryStore:
+    """Test the indexed signal history store."""
+
+    def test_latest_and_statistics(self, tmp_path):
+        """Test legacy CSV import, newest-first queries and maintained counters."""
+        import csv
+        from trading_system.utils.signal_store import SignalHistoryStore, HISTORY_COLUMNS
+
+        legacy = tmp_path / 'signal_history.csv'
+        with open(legacy, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(HISTORY_COLUMNS)
+            writer.writerow(['2024-01-01T10:00:00', 'XAUUSD', 'BUY', '2000.00', '0.800000', '2010.00',
+                             '1990.00', '0.50', '0.50', '1,2', 'success', ''])
+            writer.writerow(['2024-01-01T11:00:00', 'EURUSD', 'SELL', '1.10', '0.700000', '1.09',
+                             '1.11', '0.50', '0.50', '', 'partial', 'timeout'])
+
+        store = SignalHistoryStore(tmp_path / 'signal_history.db', legacy_csv=legacy)
+        assert store.count() == 2
+        base = 1800000000.0
+        for i in range(5):
+            store.add({'timestamp': base + i, 'symbol': 'XAUUSD', 'signal_type': 'SELL', 'price': 2001.0 + i,
+                       'sent_count': 3, 'failed_count': i % 2, 'status': 'success' if i % 2 == 0 else 'partial'})
+        store.close()
+
+        # Reopening does not import the CSV again
+        store = SignalHistoryStore(tmp_path / 'signal_history.db', legacy_csv=legacy)
+        assert store.count() == 7
+
+        latest = store.latest(3)
+        assert [r['price'] for r in latest] == ['2005.00', '2004.00', '2003.00']
+        assert store.latest(10, symbol='EURUSD')[0]['error_message'] == 'timeout'
+
+        stats = store.get_statistics()
+        assert stats['total_signals'] == 7
+        assert stats['buy_signals'] == 1 and stats['sell_signals'] == 6
+        assert stats['total_sent'] == 2 + 15
+        assert stats['total_failed'] == 1
+        gold = stats['by_symbol']['XAUUSD']
+        assert gold['total_signals'] == 6
+        assert gold['success_rate'] == pytest.approx(4 / 6 * 100)
+        assert store.get_statistics('EURUSD')['success_rate'] == 0
+        store.close()
 
 
 if __name__ == "__main__":
@@ -32,6 +32,9 @@ from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 
+from inference import export_flat_forest
+from trading_system.utils.market_store import load_bars
+
 # Optional import for LSTM
 try:
     import torch
@@ -76,18 +79,8 @@ def find_latest_data_file(data_dir: Path, pattern: str = "*_M1_*.csv") -> Option
 
 
 def load_data(file_path: Path) -> pd.DataFrame:
-    """Load CSV and ensure datetime column."""
-    df = pd.read_csv(file_path)
-    # Common column name used in repo is 'time' and 'close','high','low','open'
-    if 'time' not in df.columns:
-        # try common alternatives
-        for col in ('timestamp', 'date', 'datetime'):
-            if col in df.columns:
-                df = df.rename(columns={col: 'time'})
-                break
-    df['time'] = pd.to_datetime(df['time'])
-    df = df.sort_values('time').reset_index(drop=True)
-    return df
+    """Load CSV (through its columnar sidecar) sorted by a parsed 'time' column."""
+    return load_bars(file_path)
 
 
 def add_technical_features(df: pd.DataFrame, sma_fast: int = 10, sma_slow: int = 30, rsi_period: int = 14, atr_period: int = 14) -> pd.DataFrame:
@@ -329,6 +322,11 @@ def save_model_and_artifacts(model, scaler, output_dir: Path, model_name: str =
         joblib.dump(model, model_path)
         logger.info(f"Saved model to {model_path}")
 
+        # Flat node arrays for the compiled evaluator in inference.py
+        flat_path = export_flat_forest(model, output_dir, model_name)
+        if flat_path is not None:
+            logger.info(f"Saved flat forest to {flat_path}")
+
     # Save metadata & history
     if metadata is None:
         metadata = {}
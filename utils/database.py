@@ -1,35 +1,142 @@
 """Database layer for data persistence."""
+import asyncio
 import sqlite3
+import time
 import aiosqlite
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Tuple
-from datetime import datetime
+from typing import Optional, List, Dict, Any, Tuple, Iterable
+from datetime import datetime, timedelta, timezone
 import json
 
+from trading_system.utils.logger import get_logger
+
+
+INSERT_SQL = {
+    'trades': """
+        INSERT INTO trades (
+            timestamp, symbol, action, volume, entry_price, exit_price,
+            stop_loss, take_profit, pnl, commission, duration_seconds,
+            signal_strength, regime, metadata
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    'orders': """
+        INSERT INTO orders (
+            timestamp, symbol, order_type, volume, price, status,
+            execution_time_ms, slippage, metadata
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    'performance': """
+        INSERT INTO performance (
+            timestamp, equity, balance, margin_used, free_margin,
+            pnl_daily, open_positions, total_trades, win_rate,
+            sharpe_ratio, drawdown, metadata
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+}
+
+# Ticks live in one table per UTC day (ticks_YYYYMMDD); bars are rolled up
+# from them on insert, keyed by bar open time in seconds
+TICK_PARTITION_PREFIX = 'ticks_'
+MS_PER_DAY = 86_400_000
+ROLLUP_TIMEFRAMES = {
+    'M1': 60,
+    'M5': 300,
+}
+
+# Applied on connect. WAL lets readers run alongside the writer and turns
+# commits into sequential log appends; with synchronous=NORMAL a commit
+# only fsyncs at checkpoints, durable commits switch to FULL for themselves.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-32000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+)
+
 
 class TradingDatabase:
-    """SQLite database for trading data persistence."""
+    """
+    SQLite database for trading data persistence.
+    
+    Inserts are write-behind: rows are buffered in memory and written in
+    one ``executemany`` transaction per table once ``batch_size`` rows are
+    pending or ``flush_interval`` seconds have passed. Trades and orders
+    are durable by default: their insert waits for a barrier commit that
+    also writes everything buffered before it and is fsynced before it
+    returns. All statements run on aiosqlite's worker thread, so the
+    event loop never blocks on disk.
+    
+    Ticks are stored compactly (symbol id, integer ms time, prices; no
+    JSON) in one table per UTC day, indexed by (symbol, time), so range
+    queries only touch the days they cover and expiry is a DROP TABLE.
+    Each tick batch also updates the M1/M5 OHLCV rollup tables in the same
+    transaction. Tick days older than ``tick_retention_days`` before the
+    newest stored day are dropped; bars are kept.
+    """
     
-    def __init__(self, db_path: Path):
+    def __init__(self, db_path: Path, batch_size: int = 1000, flush_interval: float = 0.5,
+                 max_pending: int = 100000, tick_retention_days: Optional[int] = 30):
         """
         Initialize the database.
         
         Args:
             db_path: Path to SQLite database file
+            batch_size: Pending rows that trigger a flush
+            flush_interval: Maximum seconds a row stays buffered
+            max_pending: Pending rows at which inserts wait for a flush
+            tick_retention_days: Days of tick partitions to keep (None keeps all)
         """
         self.db_path = db_path
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.tick_retention_days = tick_retention_days
+        self.logger = get_logger()
         self._conn: Optional[aiosqlite.Connection] = None
+        self._pending: Dict[str, List[Tuple]] = {}
+        self._pending_count = 0
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._flush_wanted: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._symbol_ids: Dict[str, int] = {}
+        self._partitions: set = set()
+        self.write_stats = {
+            'rows_written': 0,
+            'batches': 0,
+            'durable_commits': 0,
+            'last_batch_ms': 0.0,
+        }
         
     async def connect(self) -> None:
-        """Connect to the database and create tables."""
+        """Connect to the database, apply pragmas, create tables and start the flusher."""
         self._conn = await aiosqlite.connect(str(self.db_path))
+        for pragma in PRAGMAS:
+            await self._conn.execute(pragma)
         await self._create_tables()
+        await self._load_tick_catalog()
+        self._write_lock = asyncio.Lock()
+        self._flush_wanted = asyncio.Event()
+        self._stopping = False
+        self._flusher = asyncio.create_task(self._flush_loop())
         
     async def close(self) -> None:
-        """Close database connection."""
+        """Write everything pending durably and close the connection."""
+        if self._flusher:
+            # Let a flush in progress finish instead of cancelling it mid-transaction
+            self._stopping = True
+            self._flush_wanted.set()
+            await self._flusher
+            self._flusher = None
         if self._conn:
-            await self._conn.close()
+            try:
+                await self.flush(durable=True)
+            finally:
+                await self._conn.close()
+                self._conn = None
             
     async def _create_tables(self) -> None:
         """Create database tables if they don't exist."""
@@ -87,36 +194,175 @@ class TradingDatabase:
         """)
         
         await self._conn.execute("""
-            CREATE TABLE IF NOT EXISTS tick_data (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp REAL NOT NULL,
-                symbol TEXT NOT NULL,
-                bid REAL NOT NULL,
-                ask REAL NOT NULL,
-                last REAL,
-                volume REAL,
-                metadata TEXT
+            CREATE TABLE IF NOT EXISTS symbols (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            )
+        """)
+        
+        await self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS tick_partitions (
+                day TEXT PRIMARY KEY,
+                first_msc INTEGER NOT NULL,
+                last_msc INTEGER NOT NULL,
+                rows INTEGER NOT NULL
             )
         """)
         
+        for timeframe in ROLLUP_TIMEFRAMES:
+            await self._conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS bars_{timeframe.lower()} (
+                    symbol_id INTEGER NOT NULL,
+                    time INTEGER NOT NULL,
+                    open REAL NOT NULL,
+                    high REAL NOT NULL,
+                    low REAL NOT NULL,
+                    close REAL NOT NULL,
+                    tick_volume INTEGER NOT NULL,
+                    volume REAL NOT NULL,
+                    open_msc INTEGER NOT NULL,
+                    close_msc INTEGER NOT NULL,
+                    PRIMARY KEY (symbol_id, time)
+                ) WITHOUT ROWID
+            """)
+        
         # Create indices
         await self._conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_timestamp ON trades(timestamp)")
         await self._conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_symbol ON trades(symbol)")
         await self._conn.execute("CREATE INDEX IF NOT EXISTS idx_orders_timestamp ON orders(timestamp)")
         await self._conn.execute("CREATE INDEX IF NOT EXISTS idx_performance_timestamp ON performance(timestamp)")
-        await self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tick_data_timestamp ON tick_data(timestamp)")
         
         await self._conn.commit()
         
-    async def insert_trade(self, trade_data: Dict[str, Any]) -> int:
-        """Insert a trade record."""
-        cursor = await self._conn.execute("""
-            INSERT INTO trades (
-                timestamp, symbol, action, volume, entry_price, exit_price,
-                stop_loss, take_profit, pnl, commission, duration_seconds,
-                signal_strength, regime, metadata
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+    # ------------------------------------------------------------------
+    # Write-behind buffer
+    # ------------------------------------------------------------------
+    
+    async def _flush_loop(self) -> None:
+        """Flush when the batch is full or the interval has passed, until ``close``."""
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._flush_wanted.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_wanted.clear()
+            if self._stopping:
+                break
+            try:
+                await self.flush()
+            except Exception as e:
+                self.logger.error("Database flush failed", error=str(e), pending=self._pending_count)
+    
+    async def _enqueue(self, table: str, row: Tuple) -> None:
+        """Buffer one row for the next batch."""
+        self._pending.setdefault(table, []).append(row)
+        self._pending_count += 1
+        if self._pending_count >= self.max_pending:
+            # Backpressure: the producer waits for the batch to be written
+            await self.flush()
+        elif self._pending_count >= self.batch_size:
+            self._flush_wanted.set()
+    
+    async def _commit(self, durable: bool = False, tail: Optional[Tuple[str, Tuple]] = None) -> Optional[int]:
+        """
+        Write all pending rows (and an optional final row) in one transaction.
+        
+        Args:
+            durable: Fsync the commit before returning
+            tail: (table, row) inserted last; its row id is returned
+            
+        Returns:
+            Row id of ``tail`` (None without it)
+        """
+        async with self._write_lock:
+            batches, self._pending = self._pending, {}
+            count, self._pending_count = self._pending_count, 0
+            if not batches and tail is None:
+                if durable:
+                    # Nothing new to commit: sync what earlier commits left in the WAL
+                    await self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+                return None
+            
+            started = time.perf_counter()
+            row_id = None
+            if durable:
+                await self._conn.execute("PRAGMA synchronous=FULL")
+            try:
+                for table, rows in batches.items():
+                    if table == 'ticks':
+                        await self._write_ticks(rows)
+                    else:
+                        await self._conn.executemany(INSERT_SQL[table], rows)
+                if tail is not None:
+                    cursor = await self._conn.execute(INSERT_SQL[tail[0]], tail[1])
+                    row_id = cursor.lastrowid
+                await self._conn.commit()
+            except BaseException:
+                # Keep the rows for the next attempt, ahead of newer ones (also
+                # on cancellation, before anything else is awaited)
+                for table, rows in batches.items():
+                    self._pending[table] = rows + self._pending.get(table, [])
+                self._pending_count += count
+                await self._conn.rollback()
+                # Symbols and partitions created in the failed transaction are gone too
+                await self._load_tick_catalog()
+                raise
+            finally:
+                if durable:
+                    await self._conn.execute("PRAGMA synchronous=NORMAL")
+            
+            if tail is not None:
+                count += 1
+            if 'ticks' in batches:
+                await self._prune_ticks()
+            self.write_stats['rows_written'] += count
+            self.write_stats['batches'] += 1
+            self.write_stats['durable_commits'] += int(durable)
+            self.write_stats['last_batch_ms'] = (time.perf_counter() - started) * 1000
+            return row_id
+    
+    async def flush(self, durable: bool = False) -> None:
+        """
+        Write all pending rows now.
+        
+        Args:
+            durable: Barrier: return only once the rows are fsynced to disk
+        """
+        await self._commit(durable=durable)
+    
+    def get_write_stats(self) -> Dict[str, Any]:
+        """
+        Get write-behind statistics.
+        
+        Returns:
+            Rows written, batches, durable commits, last batch duration (ms)
+            and currently pending rows
+        """
+        return {**self.write_stats, 'pending': self._pending_count}
+    
+    async def _insert(self, table: str, row: Tuple, durable: bool) -> Optional[int]:
+        """Insert through the buffer, or as a durable barrier returning the row id."""
+        if durable:
+            return await self._commit(durable=True, tail=(table, row))
+        await self._enqueue(table, row)
+        return None
+    
+    # ------------------------------------------------------------------
+    # Inserts
+    # ------------------------------------------------------------------
+    
+    async def insert_trade(self, trade_data: Dict[str, Any], durable: bool = True) -> Optional[int]:
+        """
+        Insert a trade record.
+        
+        Args:
+            trade_data: Trade fields
+            durable: Commit and fsync before returning (False: buffer it)
+            
+        Returns:
+            Row id if durable, else None
+        """
+        return await self._insert('trades', (
             trade_data.get('timestamp', datetime.utcnow().timestamp()),
             trade_data['symbol'],
             trade_data['action'],
@@ -131,18 +377,20 @@ class TradingDatabase:
             trade_data.get('signal_strength'),
             trade_data.get('regime'),
             json.dumps(trade_data.get('metadata', {}))
-        ))
-        await self._conn.commit()
-        return cursor.lastrowid
-        
-    async def insert_order(self, order_data: Dict[str, Any]) -> int:
-        """Insert an order record."""
-        cursor = await self._conn.execute("""
-            INSERT INTO orders (
-                timestamp, symbol, order_type, volume, price, status,
-                execution_time_ms, slippage, metadata
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        ), durable)
+        
+    async def insert_order(self, order_data: Dict[str, Any], durable: bool = True) -> Optional[int]:
+        """
+        Insert an order record.
+        
+        Args:
+            order_data: Order fields
+            durable: Commit and fsync before returning (False: buffer it)
+            
+        Returns:
+            Row id if durable, else None
+        """
+        return await self._insert('orders', (
             order_data.get('timestamp', datetime.utcnow().timestamp()),
             order_data['symbol'],
             order_data['order_type'],
@@ -152,19 +400,20 @@ class TradingDatabase:
             order_data.get('execution_time_ms'),
             order_data.get('slippage'),
             json.dumps(order_data.get('metadata', {}))
-        ))
-        await self._conn.commit()
-        return cursor.lastrowid
-        
-    async def insert_performance(self, perf_data: Dict[str, Any]) -> int:
-        """Insert a performance snapshot."""
-        cursor = await self._conn.execute("""
-            INSERT INTO performance (
-                timestamp, equity, balance, margin_used, free_margin,
-                pnl_daily, open_positions, total_trades, win_rate,
-                sharpe_ratio, drawdown, metadata
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        ), durable)
+        
+    async def insert_performance(self, perf_data: Dict[str, Any], durable: bool = False) -> Optional[int]:
+        """
+        Insert a performance snapshot (buffered by default).
+        
+        Args:
+            perf_data: Performance fields
+            durable: Commit and fsync before returning
+            
+        Returns:
+            Row id if durable, else None
+        """
+        return await self._insert('performance', (
             perf_data.get('timestamp', datetime.utcnow().timestamp()),
             perf_data['equity'],
             perf_data['balance'],
@@ -177,9 +426,244 @@ class TradingDatabase:
             perf_data.get('sharpe_ratio'),
             perf_data.get('drawdown'),
             json.dumps(perf_data.get('metadata', {}))
-        ))
+        ), durable)
+    
+    async def insert_ticks(self, symbol: str, ticks: Iterable[Dict[str, Any]]) -> int:
+        """
+        Buffer ticks for the day-partitioned tick store.
+        
+        Args:
+            symbol: Trading symbol
+            ticks: Dicts with time_msc (or timestamp in seconds), bid, ask
+                and optional last, volume
+            
+        Returns:
+            Number of ticks buffered
+        """
+        count = 0
+        for tick in ticks:
+            time_msc = tick.get('time_msc')
+            if time_msc is None:
+                time_msc = int(round(tick['timestamp'] * 1000))
+            await self._enqueue('ticks', (
+                symbol,
+                int(time_msc),
+                tick['bid'],
+                tick['ask'],
+                tick.get('last'),
+                tick.get('volume') or 0.0,
+            ))
+            count += 1
+        return count
+    
+    # ------------------------------------------------------------------
+    # Tick partitions and rollups
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def _partition_day(time_msc: int) -> str:
+        """UTC day key (YYYYMMDD) of a tick time."""
+        return datetime.fromtimestamp(time_msc // MS_PER_DAY * 86400, tz=timezone.utc).strftime('%Y%m%d')
+    
+    async def _load_tick_catalog(self) -> None:
+        """Load symbol ids and existing partitions."""
+        async with self._conn.execute("SELECT name, id FROM symbols") as cursor:
+            self._symbol_ids = {name: symbol_id for name, symbol_id in await cursor.fetchall()}
+        async with self._conn.execute("SELECT day FROM tick_partitions") as cursor:
+            self._partitions = {row[0] for row in await cursor.fetchall()}
+    
+    async def _symbol_id(self, symbol: str) -> int:
+        """Id of a symbol, registering it on first use (inside the write transaction)."""
+        symbol_id = self._symbol_ids.get(symbol)
+        if symbol_id is None:
+            await self._conn.execute("INSERT OR IGNORE INTO symbols (name) VALUES (?)", (symbol,))
+            async with self._conn.execute("SELECT id FROM symbols WHERE name = ?", (symbol,)) as cursor:
+                symbol_id = (await cursor.fetchone())[0]
+            self._symbol_ids[symbol] = symbol_id
+        return symbol_id
+    
+    async def _write_ticks(self, rows: List[Tuple]) -> None:
+        """Insert buffered ticks into their day partitions and fold them into the rollups."""
+        by_day: Dict[str, List[Tuple]] = {}
+        bars: Dict[str, Dict[Tuple[int, int], List]] = {tf: {} for tf in ROLLUP_TIMEFRAMES}
+        
+        for symbol, time_msc, bid, ask, last, volume in rows:
+            symbol_id = await self._symbol_id(symbol)
+            by_day.setdefault(self._partition_day(time_msc), []).append(
+                (symbol_id, time_msc, bid, ask, last, volume)
+            )
+            
+            # Bars are built from bid, like MT5 chart bars
+            price = bid if bid else last
+            for timeframe, seconds in ROLLUP_TIMEFRAMES.items():
+                bar_time = time_msc // 1000 // seconds * seconds
+                bar = bars[timeframe].get((symbol_id, bar_time))
+                if bar is None:
+                    # open, high, low, close, tick_volume, volume, open_msc, close_msc
+                    bars[timeframe][(symbol_id, bar_time)] = [price, price, price, price, 1, volume, time_msc, time_msc]
+                    continue
+                if time_msc < bar[6]:
+                    bar[0], bar[6] = price, time_msc
+                if time_msc >= bar[7]:
+                    bar[3], bar[7] = price, time_msc
+                bar[1] = max(bar[1], price)
+                bar[2] = min(bar[2], price)
+                bar[4] += 1
+                bar[5] += volume
+        
+        for day, day_rows in by_day.items():
+            table = f"{TICK_PARTITION_PREFIX}{day}"
+            if day not in self._partitions:
+                await self._conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        symbol_id INTEGER NOT NULL,
+                        time_msc INTEGER NOT NULL,
+                        bid REAL NOT NULL,
+                        ask REAL NOT NULL,
+                        last REAL,
+                        volume REAL NOT NULL
+                    )
+                """)
+                await self._conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{table}_symbol_time ON {table}(symbol_id, time_msc)"
+                )
+                self._partitions.add(day)
+            await self._conn.executemany(
+                f"INSERT INTO {table} (symbol_id, time_msc, bid, ask, last, volume) VALUES (?, ?, ?, ?, ?, ?)",
+                day_rows
+            )
+            await self._conn.execute("""
+                INSERT INTO tick_partitions (day, first_msc, last_msc, rows) VALUES (?, ?, ?, ?)
+                ON CONFLICT(day) DO UPDATE SET
+                    first_msc = MIN(first_msc, excluded.first_msc),
+                    last_msc = MAX(last_msc, excluded.last_msc),
+                    rows = rows + excluded.rows
+            """, (day, min(r[1] for r in day_rows), max(r[1] for r in day_rows), len(day_rows)))
+        
+        for timeframe, timeframe_bars in bars.items():
+            await self._conn.executemany(f"""
+                INSERT INTO bars_{timeframe.lower()} (
+                    symbol_id, time, open, high, low, close, tick_volume, volume, open_msc, close_msc
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(symbol_id, time) DO UPDATE SET
+                    open = CASE WHEN excluded.open_msc < open_msc THEN excluded.open ELSE open END,
+                    open_msc = MIN(open_msc, excluded.open_msc),
+                    high = MAX(high, excluded.high),
+                    low = MIN(low, excluded.low),
+                    close = CASE WHEN excluded.close_msc >= close_msc THEN excluded.close ELSE close END,
+                    close_msc = MAX(close_msc, excluded.close_msc),
+                    tick_volume = tick_volume + excluded.tick_volume,
+                    volume = volume + excluded.volume
+            """, [(symbol_id, bar_time, *bar) for (symbol_id, bar_time), bar in timeframe_bars.items()])
+    
+    async def _prune_ticks(self) -> None:
+        """Drop tick partitions older than the retention window (caller holds the write lock)."""
+        if self.tick_retention_days is None or not self._partitions:
+            return
+        newest = datetime.strptime(max(self._partitions), '%Y%m%d')
+        cutoff = (newest - timedelta(days=self.tick_retention_days)).strftime('%Y%m%d')
+        expired = sorted(day for day in self._partitions if day < cutoff)
+        if not expired:
+            return
+        
+        for day in expired:
+            await self._conn.execute(f"DROP TABLE IF EXISTS {TICK_PARTITION_PREFIX}{day}")
+            await self._conn.execute("DELETE FROM tick_partitions WHERE day = ?", (day,))
+            self._partitions.discard(day)
         await self._conn.commit()
-        return cursor.lastrowid
+        self.logger.info("Pruned tick partitions", days=len(expired), oldest_kept=min(self._partitions))
+    
+    async def get_ticks(
+        self,
+        symbol: str,
+        start_msc: Optional[int] = None,
+        end_msc: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get ticks in time order, reading only the day partitions in range.
+        
+        Args:
+            symbol: Trading symbol
+            start_msc: First tick time in ms (inclusive)
+            end_msc: Last tick time in ms (inclusive)
+            limit: Maximum number of ticks (oldest first)
+            
+        Returns:
+            Dicts with time_msc, bid, ask, last, volume
+        """
+        await self.flush()
+        symbol_id = self._symbol_ids.get(symbol)
+        if symbol_id is None:
+            return []
+        start_msc = start_msc if start_msc is not None else 0
+        end_msc = end_msc if end_msc is not None else 2 ** 62
+        
+        async with self._conn.execute(
+            "SELECT day FROM tick_partitions WHERE last_msc >= ? AND first_msc <= ? ORDER BY day",
+            (start_msc, end_msc)
+        ) as cursor:
+            days = [row[0] for row in await cursor.fetchall()]
+        
+        ticks: List[Dict[str, Any]] = []
+        for day in days:
+            query = (f"SELECT time_msc, bid, ask, last, volume FROM {TICK_PARTITION_PREFIX}{day} "
+                     "WHERE symbol_id = ? AND time_msc BETWEEN ? AND ? ORDER BY time_msc")
+            params: List[Any] = [symbol_id, start_msc, end_msc]
+            if limit is not None:
+                query += " LIMIT ?"
+                params.append(limit - len(ticks))
+            async with self._conn.execute(query, params) as cursor:
+                columns = [desc[0] for desc in cursor.description]
+                ticks.extend(dict(zip(columns, row)) for row in await cursor.fetchall())
+            if limit is not None and len(ticks) >= limit:
+                break
+        return ticks
+    
+    async def get_bars(
+        self,
+        symbol: str,
+        timeframe: str = 'M1',
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        limit: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """
+        Get rolled-up bars in time order.
+        
+        Args:
+            symbol: Trading symbol
+            timeframe: 'M1' or 'M5'
+            start_time: First bar open time in seconds (inclusive)
+            end_time: Last bar open time in seconds (inclusive)
+            limit: Maximum number of bars (the newest ones in range)
+            
+        Returns:
+            Dicts with time, open, high, low, close, tick_volume, volume
+        """
+        if timeframe not in ROLLUP_TIMEFRAMES:
+            raise ValueError(f"No rollup for timeframe {timeframe}")
+        await self.flush()
+        symbol_id = self._symbol_ids.get(symbol)
+        if symbol_id is None:
+            return []
+        
+        query = (f"SELECT time, open, high, low, close, tick_volume, volume FROM bars_{timeframe.lower()} "
+                 "WHERE symbol_id = ?")
+        params: List[Any] = [symbol_id]
+        if start_time is not None:
+            query += " AND time >= ?"
+            params.append(start_time)
+        if end_time is not None:
+            query += " AND time <= ?"
+            params.append(end_time)
+        query += " ORDER BY time DESC LIMIT ?"
+        params.append(limit)
+        
+        async with self._conn.execute(query, params) as cursor:
+            columns = [desc[0] for desc in cursor.description]
+            rows = await cursor.fetchall()
+        return [dict(zip(columns, row)) for row in reversed(rows)]
         
     async def get_trades(
         self,
@@ -188,7 +672,8 @@ class TradingDatabase:
         end_time: Optional[float] = None,
         limit: int = 100
     ) -> List[Dict[str, Any]]:
-        """Get trade records."""
+        """Get trade records (pending rows are flushed first)."""
+        await self.flush()
         query = "SELECT * FROM trades WHERE 1=1"
         params = []
         
@@ -216,7 +701,8 @@ class TradingDatabase:
         end_time: Optional[float] = None,
         limit: int = 1000
     ) -> List[Dict[str, Any]]:
-        """Get performance history."""
+        """Get performance history (pending rows are flushed first)."""
+        await self.flush()
         query = "SELECT * FROM performance WHERE 1=1"
         params = []
         
@@ -0,0 +1,299 @@
+"""Columnar market-data store backed by memory-mapped Feather (Arrow IPC) files."""
+import os
+import re
+from pathlib import Path
+from typing import List, Optional, Sequence, Union
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.feather as feather
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+
+# Bars are partitioned by calendar month of their time
+PARTITION_FORMAT = '%Y-%m'
+FEATHER_SUFFIX = '.feather'
+# Store root inside a data directory; CSV sidecars live in it too
+STORE_DIR = 'store'
+CSV_CACHE_DIR = Path(STORE_DIR) / '_csv'
+
+# Download file names: {symbol}_{timeframe}_{days}days.csv (legacy snapshots)
+# and {symbol}_{timeframe}_history.csv (canonical, incrementally synced)
+CSV_NAME_PATTERN = re.compile(r'^(?P<symbol>.+)_(?P<timeframe>M1|M5|M15|M30|H1|H4|D1)_(\d+days|history)$')
+CANONICAL_CSV_SUFFIX = 'history'
+
+TIME_COLUMN_ALIASES = ('timestamp', 'date', 'datetime')
+
+
+def _normalize_bars(df: pd.DataFrame) -> pd.DataFrame:
+    """Ensure a parsed, sorted, unique 'time' column."""
+    if 'time' not in df.columns:
+        for col in TIME_COLUMN_ALIASES:
+            if col in df.columns:
+                df = df.rename(columns={col: 'time'})
+                break
+    if 'time' in df.columns:
+        if not pd.api.types.is_datetime64_any_dtype(df['time']):
+            df['time'] = pd.to_datetime(df['time'])
+        df = df.drop_duplicates('time', keep='last').sort_values('time').reset_index(drop=True)
+    return df
+
+
+def _write_feather(table: 'pa.Table', path: Path) -> None:
+    """Write uncompressed (mappable) Feather atomically."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, path)
+
+
+def _read_feather(path: Path, columns: Optional[Sequence[str]] = None) -> 'pa.Table':
+    """Read a Feather file through a memory map, projecting columns."""
+    return feather.read_table(path, columns=list(columns) if columns else None, memory_map=True)
+
+
+class MarketDataStore:
+    """
+    Per-symbol, per-timeframe bar store.
+
+    Layout: ``{root}/{symbol}/{timeframe}/{YYYY-MM}.feather``. Files are
+    uncompressed Arrow IPC so reads are memory-mapped and only the
+    requested columns are touched.
+    """
+
+    def __init__(self, root: Union[str, Path] = Path('data') / 'store'):
+        """
+        Initialize store.
+
+        Args:
+            root: Store root directory
+        """
+        if not ARROW_AVAILABLE:
+            raise RuntimeError("pyarrow is required for the market data store")
+        self.root = Path(root)
+
+    def dataset_dir(self, symbol: str, timeframe: str) -> Path:
+        """Directory holding the partitions of one symbol and timeframe."""
+        return self.root / symbol / timeframe
+
+    def partitions(self, symbol: str, timeframe: str) -> List[Path]:
+        """List partition files in time order."""
+        directory = self.dataset_dir(symbol, timeframe)
+        if not directory.exists():
+            return []
+        return sorted(directory.glob(f"*{FEATHER_SUFFIX}"))
+
+    def has(self, symbol: str, timeframe: str) -> bool:
+        """Check whether any bars are stored."""
+        return bool(self.partitions(symbol, timeframe))
+
+    def write(self, symbol: str, timeframe: str, df: pd.DataFrame) -> int:
+        """
+        Merge bars into the store.
+
+        Only the monthly partitions touched by ``df`` are rewritten. Bars
+        with a time already stored replace the stored ones.
+
+        Args:
+            symbol: Trading symbol
+            timeframe: Timeframe (e.g. 'M1')
+            df: Bars with a 'time' column
+
+        Returns:
+            Number of bars written
+        """
+        df = _normalize_bars(df.copy())
+        if len(df) == 0:
+            return 0
+
+        directory = self.dataset_dir(symbol, timeframe)
+        for month, chunk in df.groupby(df['time'].dt.strftime(PARTITION_FORMAT), sort=True):
+            path = directory / f"{month}{FEATHER_SUFFIX}"
+            if path.exists():
+                existing = _read_feather(path).to_pandas()
+                chunk = _normalize_bars(pd.concat([existing, chunk], ignore_index=True))
+            _write_feather(pa.Table.from_pandas(chunk, preserve_index=False), path)
+        return len(df)
+
+    def read(self, symbol: str, timeframe: str, columns: Optional[Sequence[str]] = None,
+             start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """
+        Read bars.
+
+        Args:
+            symbol: Trading symbol
+            timeframe: Timeframe (e.g. 'M1')
+            columns: Columns to load ('time' is always included; all if None)
+            start: First bar time to include
+            end: Last bar time to include
+
+        Returns:
+            Bars sorted by time
+        """
+        if columns is not None and 'time' not in columns:
+            columns = ['time'] + list(columns)
+
+        first = pd.Timestamp(start).strftime(PARTITION_FORMAT) if start is not None else None
+        last = pd.Timestamp(end).strftime(PARTITION_FORMAT) if end is not None else None
+
+        tables = []
+        for path in self.partitions(symbol, timeframe):
+            month = path.stem
+            if (first and month < first) or (last and month > last):
+                continue
+            tables.append(_read_feather(path, columns))
+        if not tables:
+            return pd.DataFrame(columns=list(columns) if columns else ['time'])
+
+        table = pa.concat_tables(tables)
+        if start is not None:
+            table = table.filter(pc.greater_equal(table['time'], pa.scalar(pd.Timestamp(start), table.schema.field('time').type)))
+        if end is not None:
+            table = table.filter(pc.less_equal(table['time'], pa.scalar(pd.Timestamp(end), table.schema.field('time').type)))
+        return table.to_pandas()
+
+    def last_time(self, symbol: str, timeframe: str) -> Optional[pd.Timestamp]:
+        """Time of the newest stored bar (None if empty)."""
+        partitions = self.partitions(symbol, timeframe)
+        if not partitions:
+            return None
+        times = _read_feather(partitions[-1], ['time'])['time']
+        return pd.Timestamp(pc.max(times).as_py()) if len(times) else None
+
+
+def store_root(data_dir: Union[str, Path]) -> Path:
+    """Root of the partitioned store that ``download_data`` syncs into (``<data_dir>/store``)."""
+    return Path(data_dir) / STORE_DIR
+
+
+def csv_cache_path(csv_path: Union[str, Path]) -> Path:
+    """Feather sidecar used for a CSV file (``<csv dir>/store/_csv/<stem>.feather``)."""
+    csv_path = Path(csv_path)
+    return csv_path.parent / CSV_CACHE_DIR / f"{csv_path.stem}{FEATHER_SUFFIX}"
+
+
+def canonical_csv_path(data_dir: Union[str, Path], symbol: str, timeframe: str) -> Path:
+    """Canonical CSV of one symbol and timeframe (``<data_dir>/{symbol}_{timeframe}_history.csv``)."""
+    return Path(data_dir) / f"{symbol}_{timeframe}_{CANONICAL_CSV_SUFFIX}.csv"
+
+
+def parse_csv_name(csv_path: Union[str, Path]) -> Optional[tuple]:
+    """
+    Get (symbol, timeframe) from a download file name.
+
+    Args:
+        csv_path: Path like data/XAUUSD_M1_59days.csv or data/XAUUSD_M1_history.csv
+
+    Returns:
+        (symbol, timeframe) or None if the name does not match
+    """
+    match = CSV_NAME_PATTERN.match(Path(csv_path).stem)
+    return (match.group('symbol'), match.group('timeframe')) if match else None
+
+
+def convert_csv(csv_path: Union[str, Path]) -> Path:
+    """
+    Convert a bar CSV to its Feather sidecar.
+
+    The source size and modification time are stored in the file metadata
+    so a changed CSV is converted again on next use.
+
+    Args:
+        csv_path: CSV file
+
+    Returns:
+        Sidecar path
+    """
+    csv_path = Path(csv_path)
+    stat = csv_path.stat()
+    df = _normalize_bars(pd.read_csv(csv_path))
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        b'source_size': str(stat.st_size).encode(),
+        b'source_mtime_ns': str(stat.st_mtime_ns).encode(),
+    })
+    cache_path = csv_cache_path(csv_path)
+    _write_feather(table, cache_path)
+    return cache_path
+
+
+def _cache_is_current(csv_path: Path, cache_path: Path) -> bool:
+    """Check the sidecar against the CSV's size and modification time."""
+    if not cache_path.exists():
+        return False
+    stat = csv_path.stat()
+    with pa.memory_map(str(cache_path)) as source:
+        metadata = pa.ipc.open_file(source).schema.metadata or {}
+    return (metadata.get(b'source_size') == str(stat.st_size).encode()
+            and metadata.get(b'source_mtime_ns') == str(stat.st_mtime_ns).encode())
+
+
+def _synced_dataset(csv_path: Path) -> Optional[tuple]:
+    """(store, symbol, timeframe) when ``csv_path`` is a canonical CSV backed by a synced store."""
+    if not csv_path.stem.endswith(f"_{CANONICAL_CSV_SUFFIX}"):
+        return None
+    parsed = parse_csv_name(csv_path)
+    if parsed is None:
+        return None
+    store = MarketDataStore(store_root(csv_path.parent))
+    return (store,) + parsed if store.has(*parsed) else None
+
+
+def load_dataset(symbol: str, timeframe: str, data_dir: Union[str, Path] = 'data',
+                 columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Load the synced bars of one symbol and timeframe.
+
+    Reads the partitioned store under ``data_dir`` (see ``download_data``),
+    or the canonical CSV when there is no store.
+
+    Args:
+        symbol: Trading symbol
+        timeframe: Timeframe (e.g. 'M1')
+        data_dir: Download directory
+        columns: Columns to load (all if None)
+
+    Returns:
+        Bars sorted by time with a parsed 'time' column
+    """
+    return load_bars(canonical_csv_path(data_dir, symbol, timeframe), columns)
+
+
+def load_bars(csv_path: Union[str, Path], columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Load a bar CSV through the columnar store.
+
+    A canonical ``{symbol}_{timeframe}_history.csv`` written by a sync is
+    read from the partitioned store next to it. Any other CSV is converted
+    to a sidecar on first use (and again whenever it changes); later loads
+    memory-map the sidecar. Only ``columns`` are read either way. Falls
+    back to parsing the CSV when pyarrow is not installed.
+
+    Args:
+        csv_path: CSV file
+        columns: Columns to load (all if None)
+
+    Returns:
+        Bars sorted by time with a parsed 'time' column
+    """
+    csv_path = Path(csv_path)
+    if not ARROW_AVAILABLE:
+        df = _normalize_bars(pd.read_csv(csv_path))
+        return df[list(columns)] if columns else df
+
+    synced = _synced_dataset(csv_path)
+    if synced is not None:
+        store, symbol, timeframe = synced
+        df = store.read(symbol, timeframe, columns)
+        return df[list(columns)] if columns else df
+
+    cache_path = csv_cache_path(csv_path)
+    if not _cache_is_current(csv_path, cache_path):
+        convert_csv(csv_path)
+    return _read_feather(cache_path, columns).to_pandas()
@@ -0,0 +1,302 @@
+"""Indexed SQLite store for broadcast signal history with incrementally maintained statistics."""
+import csv
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from trading_system.utils.logger import get_logger
+
+
+# Columns returned for history rows, in the order of the legacy CSV log
+HISTORY_COLUMNS = [
+    'timestamp', 'symbol', 'signal_type', 'price', 'ml_score',
+    'tp_price', 'sl_price', 'tp_percent', 'sl_percent',
+    'chat_ids_sent', 'status', 'error_message'
+]
+
+
+def _to_float(value: Any) -> Optional[float]:
+    """Parse a CSV cell as float (None if empty or invalid)."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class SignalHistoryStore:
+    """
+    Signal history in SQLite.
+
+    Rows are indexed by time and by (symbol, time), so "latest N" (overall
+    or per symbol) is an index range scan. Counters per symbol (signals,
+    BUY/SELL, successes, recipients reached, failures) live in a separate
+    table that is updated in the same transaction as every insert, so
+    statistics never rescan the history.
+
+    The connection is shared by all threads of the process behind a lock;
+    WAL mode lets other processes read while a signal is being logged.
+    """
+
+    def __init__(self, db_path: Union[str, Path], legacy_csv: Optional[Union[str, Path]] = None):
+        """
+        Open (and create) the store.
+
+        Args:
+            db_path: SQLite database file
+            legacy_csv: CSV history imported once when the store is empty
+        """
+        self.logger = get_logger()
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=5.0)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+
+        if legacy_csv is not None and Path(legacy_csv).exists() and self.count() == 0:
+            self.import_csv(legacy_csv)
+
+    def _create_tables(self) -> None:
+        """Create tables and indices if they don't exist."""
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS signals (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp REAL NOT NULL,
+                    symbol TEXT NOT NULL,
+                    signal_type TEXT NOT NULL,
+                    price REAL,
+                    ml_score REAL,
+                    tp_price REAL,
+                    sl_price REAL,
+                    tp_percent REAL,
+                    sl_percent REAL,
+                    chat_ids_sent TEXT,
+                    sent_count INTEGER NOT NULL DEFAULT 0,
+                    failed_count INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL,
+                    error_message TEXT
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS signal_stats (
+                    symbol TEXT PRIMARY KEY,
+                    total INTEGER NOT NULL DEFAULT 0,
+                    buys INTEGER NOT NULL DEFAULT 0,
+                    sells INTEGER NOT NULL DEFAULT 0,
+                    successes INTEGER NOT NULL DEFAULT 0,
+                    sent INTEGER NOT NULL DEFAULT 0,
+                    failed INTEGER NOT NULL DEFAULT 0,
+                    errors INTEGER NOT NULL DEFAULT 0,
+                    last_timestamp REAL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_signals_timestamp ON signals(timestamp)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_signals_symbol ON signals(symbol, timestamp)")
+
+    def _insert(self, record: Dict[str, Any]) -> int:
+        """Insert one row and fold it into the symbol counters (caller holds the lock and transaction)."""
+        cursor = self._conn.execute("""
+            INSERT INTO signals (
+                timestamp, symbol, signal_type, price, ml_score, tp_price, sl_price,
+                tp_percent, sl_percent, chat_ids_sent, sent_count, failed_count,
+                status, error_message
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            record['timestamp'], record['symbol'], record['signal_type'],
+            record.get('price'), record.get('ml_score'), record.get('tp_price'), record.get('sl_price'),
+            record.get('tp_percent'), record.get('sl_percent'), record.get('chat_ids_sent', ''),
+            record.get('sent_count', 0), record.get('failed_count', 0),
+            record['status'], record.get('error_message', '')
+        ))
+        self._conn.execute("""
+            INSERT INTO signal_stats (symbol, total, buys, sells, successes, sent, failed, errors, last_timestamp)
+            VALUES (?, 1, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(symbol) DO UPDATE SET
+                total = total + 1,
+                buys = buys + excluded.buys,
+                sells = sells + excluded.sells,
+                successes = successes + excluded.successes,
+                sent = sent + excluded.sent,
+                failed = failed + excluded.failed,
+                errors = errors + excluded.errors,
+                last_timestamp = MAX(COALESCE(last_timestamp, 0), excluded.last_timestamp)
+        """, (
+            record['symbol'],
+            int(record['signal_type'] == 'BUY'),
+            int(record['signal_type'] == 'SELL'),
+            int(record['status'] == 'success'),
+            record.get('sent_count', 0),
+            record.get('failed_count', 0),
+            int(bool(record.get('error_message'))),
+            record['timestamp'],
+        ))
+        return cursor.lastrowid
+
+    def add(self, record: Dict[str, Any]) -> int:
+        """
+        Log one signal.
+
+        Args:
+            record: Signal fields (timestamp as epoch seconds, symbol,
+                signal_type, prices, chat_ids_sent, sent_count, failed_count,
+                status, error_message)
+
+        Returns:
+            Row id
+        """
+        with self._lock, self._conn:
+            return self._insert(record)
+
+    def import_csv(self, csv_path: Union[str, Path]) -> int:
+        """
+        Import a legacy CSV history in one transaction.
+
+        Legacy rows carry no per-recipient counts; the number of ids in
+        their chat_ids_sent column is taken as the sent count.
+
+        Args:
+            csv_path: CSV written by the old SignalBroadcaster
+
+        Returns:
+            Number of rows imported
+        """
+        imported = 0
+        try:
+            with open(csv_path, 'r', newline='') as f, self._lock, self._conn:
+                for row in csv.DictReader(f):
+                    try:
+                        timestamp = datetime.fromisoformat(row['timestamp']).timestamp()
+                    except (KeyError, TypeError, ValueError):
+                        continue
+                    chat_ids = row.get('chat_ids_sent') or ''
+                    self._insert({
+                        'timestamp': timestamp,
+                        'symbol': row.get('symbol', ''),
+                        'signal_type': row.get('signal_type', ''),
+                        'price': _to_float(row.get('price')),
+                        'ml_score': _to_float(row.get('ml_score')),
+                        'tp_price': _to_float(row.get('tp_price')),
+                        'sl_price': _to_float(row.get('sl_price')),
+                        'tp_percent': _to_float(row.get('tp_percent')),
+                        'sl_percent': _to_float(row.get('sl_percent')),
+                        'chat_ids_sent': chat_ids,
+                        'sent_count': len(chat_ids.split(',')) if chat_ids else 0,
+                        'status': row.get('status') or 'partial',
+                        'error_message': row.get('error_message', ''),
+                    })
+                    imported += 1
+        except Exception as e:
+            self.logger.error("Signal history import failed", path=str(csv_path), error=str(e))
+            return 0
+
+        self.logger.info("Imported signal history", path=str(csv_path), rows=imported)
+        return imported
+
+    def count(self) -> int:
+        """Number of logged signals (from the counters, not a table scan)."""
+        with self._lock:
+            row = self._conn.execute("SELECT COALESCE(SUM(total), 0) FROM signal_stats").fetchone()
+        return row[0]
+
+    def latest(self, limit: int = 50, symbol: Optional[str] = None) -> List[Dict[str, str]]:
+        """
+        Get the newest signals, newest first.
+
+        Args:
+            limit: Maximum number of records
+            symbol: Only this symbol (all if None)
+
+        Returns:
+            Records with the legacy CSV columns, formatted as in the CSV
+        """
+        query = "SELECT * FROM signals"
+        params: List[Any] = []
+        if symbol:
+            query += " WHERE symbol = ?"
+            params.append(symbol)
+        query += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [self._format_row(row) for row in rows]
+
+    @staticmethod
+    def _format_row(row: sqlite3.Row) -> Dict[str, str]:
+        """Render a row like the CSV history did."""
+        def fmt(value, digits):
+            return f"{value:.{digits}f}" if value is not None else ""
+
+        return {
+            'timestamp': datetime.fromtimestamp(row['timestamp']).isoformat(),
+            'symbol': row['symbol'],
+            'signal_type': row['signal_type'],
+            'price': fmt(row['price'], 2),
+            'ml_score': fmt(row['ml_score'], 6),
+            'tp_price': fmt(row['tp_price'], 2),
+            'sl_price': fmt(row['sl_price'], 2),
+            'tp_percent': fmt(row['tp_percent'], 2),
+            'sl_percent': fmt(row['sl_percent'], 2),
+            'chat_ids_sent': row['chat_ids_sent'] or '',
+            'status': row['status'],
+            'error_message': row['error_message'] or '',
+            'sent_count': row['sent_count'],
+            'failed_count': row['failed_count'],
+        }
+
+    @staticmethod
+    def _summarize(total: int, buys: int, sells: int, successes: int, sent: int, errors: int) -> Dict[str, Any]:
+        """Statistics dict from counters."""
+        return {
+            'total_signals': total,
+            'buy_signals': buys,
+            'sell_signals': sells,
+            'success_rate': (successes / total * 100) if total > 0 else 0,
+            'total_sent': sent,
+            'total_failed': errors,
+        }
+
+    def get_statistics(self, symbol: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get signal statistics from the maintained counters.
+
+        Args:
+            symbol: Only this symbol (all if None)
+
+        Returns:
+            Dict with total_signals, buy_signals, sell_signals, success_rate,
+            total_sent and total_failed; the overall statistics also carry a
+            by_symbol mapping with the same fields per symbol
+        """
+        with self._lock:
+            if symbol:
+                rows = self._conn.execute("SELECT * FROM signal_stats WHERE symbol = ?", (symbol,)).fetchall()
+            else:
+                rows = self._conn.execute("SELECT * FROM signal_stats ORDER BY symbol").fetchall()
+
+        by_symbol = {
+            row['symbol']: self._summarize(row['total'], row['buys'], row['sells'],
+                                           row['successes'], row['sent'], row['errors'])
+            for row in rows
+        }
+        stats = self._summarize(
+            sum(row['total'] for row in rows),
+            sum(row['buys'] for row in rows),
+            sum(row['sells'] for row in rows),
+            sum(row['successes'] for row in rows),
+            sum(row['sent'] for row in rows),
+            sum(row['errors'] for row in rows),
+        )
+        if not symbol:
+            stats['by_symbol'] = by_symbol
+        return stats
+
+    def close(self) -> None:
+        """Close the connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,777 @@
+"""Background Telegram delivery: rate-aware priority queue, pooled keep-alive HTTP, concurrent fan-out."""
+import asyncio
+import atexit
+import hashlib
+import heapq
+import itertools
+import json
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Set, Tuple
+
+from trading_system.utils.logger import get_logger
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+
+TELEGRAM_API_URL = "https://api.telegram.org"
+DEFAULT_PENDING_FILE = Path('logs') / 'telegram_pending.jsonl'
+
+# Telegram Bot API limits: about 30 messages/s per bot overall, about one
+# message/s to a private chat and 20 messages/min to a group
+GLOBAL_RATE = 30.0
+CHAT_RATE = 1.0
+GROUP_RATE = 20 / 60
+
+# Broadcast batches share one ordering sequence, newest first
+_batch_sequence = itertools.count()
+
+
+def _percentile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of sorted ``values``."""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, math.ceil(q * len(values) / 100.0) - 1))
+    return values[index]
+
+
+def _token_key(bot_token: str) -> str:
+    """Fingerprint identifying a bot token in the pending file without revealing it."""
+    return hashlib.sha256(bot_token.encode('utf-8')).hexdigest()[:16]
+
+
+class TokenBucket:
+    """Token bucket allowing ``rate`` events per second with bursts up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Initialize bucket (full).
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens (default: one second of tokens, at least 1)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.time()
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens accrued since the last update."""
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def ready_at(self, now: float) -> float:
+        """Time at which one token is available (``now`` if one is available already)."""
+        self._refill(now)
+        if self.tokens >= 1.0:
+            return now
+        return now + (1.0 - self.tokens) / self.rate
+
+    def consume(self, now: float) -> None:
+        """Take one token."""
+        self._refill(now)
+        self.tokens -= 1.0
+
+    def idle(self, now: float) -> bool:
+        """Whether the bucket is full again (safe to forget)."""
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+class DeliveryBatch:
+    """Outcome of one message fanned out to several chats."""
+
+    def __init__(self, chat_ids: Sequence[str], on_complete: Optional[Callable[['DeliveryBatch'], None]] = None):
+        """
+        Initialize batch.
+
+        Args:
+            chat_ids: Recipients
+            on_complete: Called (on the delivery thread) once every chat has
+                a final outcome
+        """
+        self.chat_ids = [str(c) for c in chat_ids]
+        self.total = len(self.chat_ids)
+        self.created = time.time()
+        self.sent_ids: List[str] = []
+        self.failed_ids: List[str] = []
+        self.errors: Dict[str, str] = {}
+        self.latencies: List[float] = []
+        self.on_complete = on_complete
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        if self.total == 0:
+            self._done.set()
+
+    def record(self, chat_id: str, ok: bool, error: str = "") -> None:
+        """Record the final outcome for one chat."""
+        with self._lock:
+            if ok:
+                self.sent_ids.append(chat_id)
+                self.latencies.append(time.time() - self.created)
+            else:
+                self.failed_ids.append(chat_id)
+                self.errors[chat_id] = error
+            finished = len(self.sent_ids) + len(self.failed_ids) == self.total
+
+        if finished:
+            self._done.set()
+            if self.on_complete is not None:
+                try:
+                    self.on_complete(self)
+                except Exception as e:
+                    get_logger().error("Delivery completion callback failed", error=str(e))
+
+    @property
+    def done(self) -> bool:
+        """Whether every chat has a final outcome."""
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the batch completes.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits forever)
+
+        Returns:
+            True if the batch completed
+        """
+        return self._done.wait(timeout)
+
+    def result(self) -> Dict[str, Any]:
+        """
+        Summarize the batch.
+
+        Returns:
+            Dict with status (success/partial/failed/queued), sent_count,
+            failed_count, queued_count, total, failed_ids and the delivery
+            latency percentiles latency_p50/p90/p99/max in seconds since
+            submission (0 until something was sent)
+        """
+        with self._lock:
+            sent = len(self.sent_ids)
+            failed = len(self.failed_ids)
+            failed_ids = list(self.failed_ids)
+            latencies = sorted(self.latencies)
+
+        if sent + failed < self.total:
+            status = 'queued'
+        elif failed == 0:
+            status = 'success'
+        elif sent == 0:
+            status = 'failed'
+        else:
+            status = 'partial'
+
+        return {
+            'status': status,
+            'sent_count': sent,
+            'failed_count': failed,
+            'queued_count': self.total - sent - failed,
+            'total': self.total,
+            'failed_ids': failed_ids,
+            'latency_p50': _percentile(latencies, 50),
+            'latency_p90': _percentile(latencies, 90),
+            'latency_p99': _percentile(latencies, 99),
+            'latency_max': latencies[-1] if latencies else 0.0,
+        }
+
+
+@dataclass
+class OutgoingMessage:
+    """One message to one chat."""
+    bot_token: str
+    chat_id: str
+    text: str
+    parse_mode: Optional[str] = "HTML"
+    attempts: int = 0
+    created: float = field(default_factory=time.time)
+    not_before: float = 0.0
+    expires: Optional[float] = None
+    newest_first: bool = False
+    batch: Optional[DeliveryBatch] = field(default=None, repr=False, compare=False)
+    order: Tuple = field(default=(), repr=False, compare=False)
+
+    def to_record(self) -> Dict[str, Any]:
+        """Serializable form for the pending file (the token only as a fingerprint)."""
+        return {
+            'bot': _token_key(self.bot_token),
+            'chat_id': self.chat_id,
+            'text': self.text,
+            'parse_mode': self.parse_mode,
+            'attempts': self.attempts,
+            'created': self.created,
+            'expires': self.expires,
+            'newest_first': self.newest_first,
+        }
+
+    def finish(self, ok: bool, error: str = "") -> None:
+        """Report the final outcome to the owning batch."""
+        if self.batch is not None:
+            self.batch.record(self.chat_id, ok, error)
+
+
+class TelegramDeliveryQueue:
+    """
+    Asynchronous, rate-aware Telegram sender running on its own event loop thread.
+
+    ``submit`` only hands messages to the loop and returns immediately, so
+    trading code never waits on the network. On the loop, one dispatcher
+    releases queued messages as token buckets allow (a global bucket per
+    bot, and one per chat) and sends them concurrently through one pooled
+    keep-alive HTTP session.
+
+    Direct messages are released first, in submission order. Broadcasts
+    (``newest_first``) come next, newest batch first, so a fresh signal is
+    not stuck behind the tail of an older one; broadcast messages can carry
+    a time-to-live after which they are dropped as stale.
+
+    Each chat receives its messages in release order: while a message waits
+    for its chat's rate limit, is in flight or is waiting to be retried,
+    later messages for that chat are held in a per-chat FIFO behind it.
+
+    Failed sends are retried with exponential backoff. A 429 reply blocks
+    only that chat for its ``retry_after`` seconds. Messages that exhaust
+    their attempts, overflow the queue or are still pending at shutdown are
+    appended to a JSON-lines pending file and re-queued on the next start.
+    The file holds a fingerprint of the bot token, not the token itself;
+    persisted messages stay parked until a message for the same bot is
+    submitted, which supplies the token again.
+    """
+
+    def __init__(self, api_url: str = TELEGRAM_API_URL, max_queue: int = 100000, workers: int = 16,
+                 max_attempts: int = 5, retry_delay: float = 1.0, timeout: float = 10.0,
+                 pending_file: Optional[Path] = DEFAULT_PENDING_FILE, global_rate: float = GLOBAL_RATE,
+                 chat_rate: float = CHAT_RATE, group_rate: float = GROUP_RATE):
+        """
+        Initialize delivery queue.
+
+        Args:
+            api_url: Bot API base URL
+            max_queue: Maximum queued messages
+            workers: Concurrent sends (also the connection pool size)
+            max_attempts: Send attempts before a message is persisted
+            retry_delay: Backoff base in seconds (doubled per attempt)
+            timeout: Per-request timeout in seconds
+            pending_file: JSON-lines file for undelivered messages (None disables)
+            global_rate: Messages per second per bot
+            chat_rate: Messages per second to one private chat
+            group_rate: Messages per second to one group (negative chat id)
+        """
+        if not AIOHTTP_AVAILABLE:
+            raise RuntimeError("aiohttp is required for Telegram delivery")
+
+        self.logger = get_logger()
+        self.api_url = api_url.rstrip('/')
+        self.max_queue = max_queue
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+        self.pending_file = Path(pending_file) if pending_file else None
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._start_lock = threading.Lock()
+        self._session: Optional['aiohttp.ClientSession'] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._tasks: List[asyncio.Task] = []
+        self._send_tasks: Set[asyncio.Task] = set()
+        self._heap: List[Tuple[Tuple, OutgoingMessage]] = []
+        self._sequence = itertools.count()
+        self._retry: List[OutgoingMessage] = []
+        self._in_flight: List[OutgoingMessage] = []
+        # Chat -> message it is waiting on, and the later messages held behind it
+        self._chat_owner: Dict[str, OutgoingMessage] = {}
+        self._held: Dict[str, Deque[OutgoingMessage]] = {}
+        self._held_count = 0
+        self._blocked_until: Dict[str, float] = {}
+        self._bot_buckets: Dict[str, TokenBucket] = {}
+        self._chat_buckets: Dict[str, TokenBucket] = {}
+        # Token fingerprint -> token, and pending records whose token is not known yet
+        self._tokens: Dict[str, str] = {}
+        self._parked: List[Dict[str, Any]] = []
+
+        self.stats = {
+            'sent': 0,
+            'failed': 0,
+            'retried': 0,
+            'rate_limited': 0,
+            'expired': 0,
+            'persisted': 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Public API (any thread)
+    # ------------------------------------------------------------------
+
+    @property
+    def running(self) -> bool:
+        """Whether the delivery loop is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the delivery loop thread and re-queue persisted messages."""
+        with self._start_lock:
+            if self.running:
+                return
+            self._ready.clear()
+            self._thread = threading.Thread(target=self._run_loop, name='telegram-delivery', daemon=True)
+            self._thread.start()
+            self._ready.wait()
+
+        records = self._load_pending()
+        if records:
+            self._loop.call_soon_threadsafe(self._restore, records)
+
+    def submit(self, bot_token: str, chat_ids: Sequence[str], text: str, parse_mode: Optional[str] = "HTML",
+               on_complete: Optional[Callable[[DeliveryBatch], None]] = None, newest_first: bool = False,
+               ttl: Optional[float] = None) -> DeliveryBatch:
+        """
+        Queue a message for every chat and return immediately.
+
+        Args:
+            bot_token: Bot token
+            chat_ids: Recipients
+            text: Message text
+            parse_mode: Telegram parse mode
+            on_complete: Called with the batch once all chats are done
+            newest_first: Treat as a broadcast (after direct messages, newest
+                batch first)
+            ttl: Seconds after which unsent messages are dropped as stale
+
+        Returns:
+            DeliveryBatch tracking the outcome
+        """
+        if not self.running:
+            self.start()
+
+        batch = DeliveryBatch(chat_ids, on_complete)
+        if batch.total == 0 and on_complete is not None:
+            on_complete(batch)
+        expires = batch.created + ttl if ttl is not None else None
+        order = (1, -next(_batch_sequence)) if newest_first else (0,)
+        self._loop.call_soon_threadsafe(self._register_token, bot_token)
+        for chat_id in batch.chat_ids:
+            message = OutgoingMessage(bot_token, chat_id, text, parse_mode, created=batch.created,
+                                      expires=expires, newest_first=newest_first, batch=batch, order=order)
+            self._loop.call_soon_threadsafe(self._put, message)
+        return batch
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until nothing is queued, in flight or waiting for retry.
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            True if everything was handled
+        """
+        if not self.running:
+            return True
+        future = asyncio.run_coroutine_threadsafe(self._drain(), self._loop)
+        try:
+            future.result(timeout)
+            return True
+        except Exception:
+            future.cancel()
+            return False
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Drain for up to ``timeout`` seconds, persist what is left and stop.
+
+        Args:
+            timeout: Seconds allowed for in-flight and queued deliveries
+        """
+        if not self.running:
+            return
+        self.flush(timeout)
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._thread = None
+        self._loop = None
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get delivery counters.
+
+        Returns:
+            Sent, failed, retried, rate-limited, expired and persisted counts
+            plus the current queue, retry, held, in-flight and parked sizes
+        """
+        return {
+            **self.stats,
+            'queued': len(self._heap),
+            'retrying': len(self._retry),
+            'held': self._held_count,
+            'in_flight': len(self._in_flight),
+            'parked': len(self._parked),
+        }
+
+    # ------------------------------------------------------------------
+    # Event loop side
+    # ------------------------------------------------------------------
+
+    def _run_loop(self) -> None:
+        """Thread target: own event loop running the dispatcher."""
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self._startup())
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.close()
+
+    async def _startup(self) -> None:
+        """Create the session and the dispatcher tasks."""
+        self._wake = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.workers)
+        connector = aiohttp.TCPConnector(limit=self.workers, keepalive_timeout=60)
+        self._session = aiohttp.ClientSession(
+            connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        self._tasks = [
+            asyncio.create_task(self._dispatch()),
+            asyncio.create_task(self._retry_loop()),
+        ]
+
+    async def _shutdown(self) -> None:
+        """Persist everything undelivered, stop tasks and close the session."""
+        tasks = self._tasks + list(self._send_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        # Sends cancelled mid-flight have no outcome yet and are kept too
+        # Heads (in flight, retrying) before the messages held behind them
+        held = [m for chat in self._held.values() for m in chat]
+        leftover = (list(self._in_flight) + list(self._retry) + held
+                    + [m for _, m in sorted(self._heap, key=lambda e: e[0])])
+        self._in_flight.clear()
+        self._retry.clear()
+        self._heap.clear()
+        self._held.clear()
+        self._held_count = 0
+        self._chat_owner.clear()
+        for message in leftover:
+            self._persist(message, "undelivered at shutdown")
+        # Still waiting for their token: written back unchanged
+        self._append_records(self._parked)
+        self._parked = []
+
+        await self._session.close()
+
+    def _register_token(self, bot_token: str) -> None:
+        """Remember a bot token and queue the pending messages that were waiting for it (loop thread)."""
+        key = _token_key(bot_token)
+        if key in self._tokens:
+            return
+        self._tokens[key] = bot_token
+        resolved = [r for r in self._parked if r.get('bot') == key]
+        if resolved:
+            self._parked = [r for r in self._parked if r.get('bot') != key]
+            for record in resolved:
+                self._put(self._from_record(record, bot_token))
+
+    def _restore(self, records: List[Dict[str, Any]]) -> None:
+        """Queue persisted messages whose token is known, park the rest (loop thread)."""
+        for record in records:
+            # Files written before fingerprints carry the token itself
+            bot_token = record.get('bot_token') or self._tokens.get(record.get('bot'))
+            if bot_token is None:
+                self._parked.append(record)
+            else:
+                self._put(self._from_record(record, bot_token))
+
+    def _push(self, message: OutgoingMessage) -> None:
+        """Add a message to the priority queue (loop thread)."""
+        if not message.order:
+            message.order = (1, -next(_batch_sequence)) if message.newest_first else (0,)
+        heapq.heappush(self._heap, (message.order + (next(self._sequence),), message))
+        self._wake.set()
+
+    def _put(self, message: OutgoingMessage) -> None:
+        """Queue a new message (loop thread); overflow is persisted."""
+        if len(self._heap) + len(self._retry) + self._held_count >= self.max_queue:
+            self._persist(message, "delivery queue full")
+            return
+        self._push(message)
+
+    async def _drain(self) -> None:
+        """Wait until the queue, in-flight sends, retry list and held messages are empty."""
+        while self._heap or self._in_flight or self._retry or self._held:
+            await asyncio.sleep(0.01)
+
+    def _release_chat(self, chat_id: str) -> None:
+        """The chat's current message is done: queue the next held one, if any."""
+        self._chat_owner.pop(chat_id, None)
+        held = self._held.get(chat_id)
+        if not held:
+            return
+        message = held.popleft()
+        self._held_count -= 1
+        if not held:
+            del self._held[chat_id]
+        self._chat_owner[chat_id] = message
+        self._push(message)
+
+    def _chat_bucket(self, chat_id: str) -> TokenBucket:
+        """Per-chat bucket (groups have negative ids and a lower limit)."""
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            rate = self.group_rate if chat_id.startswith('-') else self.chat_rate
+            bucket = self._chat_buckets[chat_id] = TokenBucket(rate, capacity=1.0)
+        return bucket
+
+    def _bot_bucket(self, bot_token: str) -> TokenBucket:
+        """Global bucket of one bot."""
+        bucket = self._bot_buckets.get(bot_token)
+        if bucket is None:
+            bucket = self._bot_buckets[bot_token] = TokenBucket(self.global_rate)
+        return bucket
+
+    async def _dispatch(self) -> None:
+        """Release queued messages as the rate limits allow."""
+        while True:
+            if not self._heap:
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+
+            await self._slots.acquire()
+            if not self._heap:
+                self._slots.release()
+                continue
+
+            now = time.time()
+            _, message = heapq.heappop(self._heap)
+            owner = self._chat_owner.get(message.chat_id)
+            if message.expires is not None and now >= message.expires:
+                self._slots.release()
+                self.stats['expired'] += 1
+                message.finish(False, "expired")
+                if owner is message:
+                    self._release_chat(message.chat_id)
+                continue
+
+            # An earlier message of this chat is not done yet: keep chat order
+            if owner is not None and owner is not message:
+                self._slots.release()
+                self._held.setdefault(message.chat_id, deque()).append(message)
+                self._held_count += 1
+                continue
+            self._chat_owner[message.chat_id] = message
+
+            # A chat that is blocked or over its rate waits aside so other
+            # chats keep flowing
+            chat_bucket = self._chat_bucket(message.chat_id)
+            ready_at = max(self._blocked_until.get(message.chat_id, 0.0), chat_bucket.ready_at(now))
+            if ready_at > now:
+                self._slots.release()
+                message.not_before = ready_at
+                self._retry.append(message)
+                continue
+
+            bot_bucket = self._bot_bucket(message.bot_token)
+            wait = bot_bucket.ready_at(now) - now
+            if wait > 0:
+                self._slots.release()
+                self._push(message)
+                await asyncio.sleep(wait)
+                continue
+
+            bot_bucket.consume(now)
+            chat_bucket.consume(now)
+            self._in_flight.append(message)
+            task = asyncio.create_task(self._send(message))
+            self._send_tasks.add(task)
+            task.add_done_callback(self._send_tasks.discard)
+
+    async def _send(self, message: OutgoingMessage) -> None:
+        """Send one released message and free its slot."""
+        try:
+            finished = await self._deliver(message)
+        except asyncio.CancelledError:
+            # Left in _in_flight for shutdown to persist
+            raise
+        except Exception as e:
+            finished = self._schedule_retry(message, str(e))
+        self._in_flight.remove(message)
+        if finished:
+            self._release_chat(message.chat_id)
+        self._slots.release()
+
+    async def _retry_loop(self) -> None:
+        """Move due retries back onto the queue and forget idle chat state."""
+        last_prune = time.time()
+        while True:
+            await asyncio.sleep(0.05)
+            now = time.time()
+            if now - last_prune > 60:
+                last_prune = now
+                self._chat_buckets = {c: b for c, b in self._chat_buckets.items() if not b.idle(now)}
+                self._blocked_until = {c: t for c, t in self._blocked_until.items() if t > now}
+            if not self._retry:
+                continue
+            due = [m for m in self._retry if m.not_before <= now]
+            if not due:
+                continue
+            self._retry = [m for m in self._retry if m.not_before > now]
+            for message in due:
+                self._push(message)
+
+    async def _deliver(self, message: OutgoingMessage) -> bool:
+        """
+        Send one message.
+
+        Returns:
+            True if the message has a final outcome, False if it waits for a retry
+        """
+        url = f"{self.api_url}/bot{message.bot_token}/sendMessage"
+        payload = {'chat_id': message.chat_id, 'text': message.text}
+        if message.parse_mode:
+            payload['parse_mode'] = message.parse_mode
+
+        try:
+            async with self._session.post(url, json=payload) as response:
+                status = response.status
+                try:
+                    body = await response.json(content_type=None)
+                except Exception:
+                    body = {}
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return self._schedule_retry(message, str(e) or type(e).__name__)
+
+        if status == 200:
+            self.stats['sent'] += 1
+            message.finish(True)
+        elif status == 429:
+            retry_after = float((body.get('parameters') or {}).get('retry_after', 1))
+            self._blocked_until[message.chat_id] = time.time() + retry_after
+            self.stats['rate_limited'] += 1
+            message.not_before = time.time() + retry_after
+            self._retry.append(message)
+            self.logger.warning("Telegram rate limit", chat_id=message.chat_id, retry_after=retry_after)
+            return False
+        elif status >= 500:
+            return self._schedule_retry(message, f"HTTP {status}")
+        else:
+            # Bad request, bot blocked by user, chat not found: retrying cannot help
+            error = body.get('description', f"HTTP {status}") if isinstance(body, dict) else f"HTTP {status}"
+            self.stats['failed'] += 1
+            message.finish(False, error)
+            self.logger.warning("Telegram delivery rejected", chat_id=message.chat_id, error=error)
+        return True
+
+    def _schedule_retry(self, message: OutgoingMessage, error: str) -> bool:
+        """
+        Back off and retry, or persist once attempts are exhausted.
+
+        Returns:
+            True if the message was persisted (final), False if it will be retried
+        """
+        message.attempts += 1
+        if message.attempts >= self.max_attempts:
+            self._persist(message, error)
+            return True
+        self.stats['retried'] += 1
+        message.not_before = time.time() + self.retry_delay * 2 ** (message.attempts - 1)
+        self._retry.append(message)
+        return False
+
+    # ------------------------------------------------------------------
+    # Pending file
+    # ------------------------------------------------------------------
+
+    def _append_records(self, records: List[Dict[str, Any]]) -> bool:
+        """Append records to the pending file (True if written)."""
+        if self.pending_file is None or not records:
+            return False
+        try:
+            self.pending_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.pending_file, 'a', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record) + '\n')
+            return True
+        except Exception as e:
+            self.logger.error("Failed to persist Telegram message", error=str(e))
+            return False
+
+    def _persist(self, message: OutgoingMessage, error: str) -> None:
+        """Append an undelivered message to the pending file."""
+        self.stats['failed'] += 1
+        if self._append_records([{**message.to_record(), 'error': error}]):
+            self.stats['persisted'] += 1
+        self.logger.warning("Telegram message undelivered", chat_id=message.chat_id, error=error)
+        message.finish(False, error)
+
+    @staticmethod
+    def _from_record(record: Dict[str, Any], bot_token: str) -> OutgoingMessage:
+        """Rebuild a message from a pending file record."""
+        return OutgoingMessage(
+            bot_token=bot_token,
+            chat_id=record['chat_id'],
+            text=record['text'],
+            parse_mode=record.get('parse_mode'),
+            created=record.get('created', time.time()),
+            expires=record.get('expires'),
+            newest_first=record.get('newest_first', False),
+        )
+
+    def _load_pending(self) -> List[Dict[str, Any]]:
+        """Read and clear the pending file."""
+        if self.pending_file is None or not self.pending_file.exists():
+            return []
+
+        records = []
+        try:
+            with open(self.pending_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        records.append(json.loads(line))
+            self.pending_file.unlink()
+        except Exception as e:
+            self.logger.error("Failed to load pending Telegram messages", error=str(e))
+            return []
+
+        if records:
+            self.logger.info("Loaded undelivered Telegram messages", count=len(records))
+        return records
+
+
+# Global delivery queue instance
+_delivery_queue: Optional[TelegramDeliveryQueue] = None
+_delivery_lock = threading.Lock()
+
+
+def get_delivery_queue() -> TelegramDeliveryQueue:
+    """
+    Get the global Telegram delivery queue (started on first use).
+
+    Returns:
+        TelegramDeliveryQueue instance
+    """
+    global _delivery_queue
+    with _delivery_lock:
+        if _delivery_queue is None:
+            _delivery_queue = TelegramDeliveryQueue()
+            atexit.register(_delivery_queue.stop)
+    return _delivery_queue